@@ -0,0 +1,80 @@
+"""
+Benchmark: cold-start import time of the PeerLens entry points
+
+Each module is imported in a fresh interpreter with ``-X importtime`` and the
+wall time plus the slowest imported packages are reported, so regressions
+(e.g. a heavy dependency imported at module level again) are easy to spot.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py main rebuttal_ui --repeat 5 --output imports.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+DEFAULT_MODULES = ["main", "rebuttal_ui", "rebuttal_loop", "run_rebuttal", "batch_review"]
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module):
+    """Returns (wall seconds, {directly imported module: cumulative µs}) for one cold import."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    packages = {}
+    for self_us, cumulative_us, indent, name in _IMPORTTIME_RE.findall(result.stderr):
+        # -X importtime indents by nesting depth: 1 space for the entry point
+        # itself, 3 for the modules it imports directly.
+        if len(indent) == 3:
+            packages[name] = max(packages.get(name, 0), int(cumulative_us))
+    return wall, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="Slowest packages to show")
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        walls, packages = [], {}
+        for _ in range(args.repeat):
+            wall, packages = measure(module)
+            walls.append(wall)
+        slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        results[module] = {
+            "wall_seconds_median": statistics.median(walls),
+            "wall_seconds_min": min(walls),
+            "slowest_imports_ms": {name: us / 1000 for name, us in slowest[: args.top]},
+        }
+        print(f"\n{module}: {statistics.median(walls) * 1000:.0f} ms (median of {args.repeat})")
+        for name, us in slowest[: args.top]:
+            print(f"  {name:30} {us / 1000:8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: PDF text extraction backends
+
+Times each extraction backend on a directory of PDFs (cache disabled) and
+measures how closely its output agrees with serial pdfminer, the original
+extractor.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py path/to/pdfs --workers 4 --output extraction.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pdf_utils import extract_text_from_pdf  # noqa: E402
+
+
+def token_agreement(reference, candidate):
+    """F1 overlap of the word multisets of two extractions (1.0 = same words)."""
+    ref, cand = Counter(reference.split()), Counter(candidate.split())
+    common = sum((ref & cand).values())
+    if not ref and not cand:
+        return 1.0
+    if not common:
+        return 0.0
+    precision = common / sum(cand.values())
+    recall = common / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def time_backend(pdf_path, backend, workers):
+    start = time.perf_counter()
+    text = extract_text_from_pdf(
+        pdf_path, use_cache=False, backend=backend, workers=workers
+    )
+    return time.perf_counter() - start, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction backends")
+    parser.add_argument("corpus", help="Directory of PDFs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", help="Write per-file results as JSON")
+    args = parser.parse_args()
+
+    configs = [
+        ("pdfminer-serial", "pdfminer", 1),
+        (f"pdfminer-x{args.workers}", "pdfminer", args.workers),
+        ("fitz", "fitz", 1),
+    ]
+    results = []
+    totals = Counter()
+
+    for pdf_path in sorted(Path(args.corpus).glob("*.pdf")):
+        row = {"file": pdf_path.name}
+        reference = None
+        for label, backend, workers in configs:
+            seconds, text = time_backend(pdf_path, backend, workers)
+            if reference is None:
+                reference = text
+                row["pages"] = text.count("\f")
+            row[label] = {
+                "seconds": round(seconds, 3),
+                "agreement": round(token_agreement(reference, text), 4),
+            }
+            totals[label] += seconds
+        results.append(row)
+        print(
+            f"{pdf_path.name:40} "
+            + "  ".join(f"{label}={row[label]['seconds']:.2f}s" for label, _, _ in configs)
+        )
+
+    print("\nTotal wall time:")
+    for label, _, _ in configs:
+        print(f"  {label:20} {totals[label]:8.2f}s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Benchmark: end-to-end review pipeline against a deterministic fake LLM
+
+Generates a synthetic manuscript corpus (one PDF per --pages value) and,
+for each manuscript and run, times
+
+    structure_output -> run_reviews -> save_reviews_to_pdf -> rebuttal round
+
+with every LLM call answered by a local OpenAI-compatible stand-in
+(fake_backend.FakeLLMServer) that sleeps --latency seconds and returns about
+--response-words words. Extraction and LLM response caches are disabled so
+every run does the full work.
+
+Writes per-stage p50/p95/mean latency, manuscripts per minute and peak RSS
+to --output as JSON (tagged with the current git commit). --compare prints
+the change against an earlier result file.
+
+Usage:
+    python benchmarks/bench_pipeline.py --pages 5 20 60 --runs 3 --latency 0.5
+    python benchmarks/bench_pipeline.py --output new.json --compare old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = Path(tempfile.mkdtemp(prefix="peerlens_bench_"))
+
+# Caches and rate limits are configured from the environment at import time.
+os.environ.update(
+    {
+        "PEERLENS_LLM_CACHE": "off",
+        "PEERLENS_PDF_CACHE": "0",
+        "PEERLENS_LLM_RPM": "0",
+        "PEERLENS_LLM_TPM": "0",
+        "PEERLENS_CACHE_DIR": str(WORK_DIR / "cache"),
+        "PEERLENS_REVIEW_STORE": str(WORK_DIR / "reviews.sqlite"),
+        "AUTOGEN_USE_DOCKER": "False",
+    }
+)
+sys.path.insert(0, str(ROOT / "src"))
+
+from fake_backend import use_fake_llm, write_synthetic_manuscript  # noqa: E402
+from pdf_utils import extract_text_from_pdf, structure_output  # noqa: E402
+from rebuttal_loop import run_rebuttal_round  # noqa: E402
+from report import save_reviews_to_pdf  # noqa: E402
+from review_engine import run_reviews  # noqa: E402
+from reviewers import REVIEWER_ROLES, reviewer_lease  # noqa: E402
+
+STAGES = ("structure_output", "run_reviews", "save_reviews_to_pdf", "rebuttal", "total")
+
+
+def write_rebuttal(path, reviewer_names):
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(str(path), pagesize=LETTER)
+    y = 720
+    for name in reviewer_names:
+        for line in (
+            f"Response to {name}:",
+            "We thank the reviewer and have clarified the methods and added an ablation.",
+            "",
+        ):
+            pdf.drawString(72, y, line)
+            y -= 16
+    pdf.save()
+    return path
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak * scale / 2**20
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_once(pdf_path, rebuttal_path, journal, run_dir):
+    timings = {}
+    start = time.perf_counter()
+
+    t = time.perf_counter()
+    structured = structure_output(pdf_path, run_dir / "images", use_cache=False)
+    timings["structure_output"] = time.perf_counter() - t
+
+    with reviewer_lease(journal=journal) as reviewers:
+        t = time.perf_counter()
+        responses = run_reviews(reviewers, structured)
+        timings["run_reviews"] = time.perf_counter() - t
+
+        report_path = run_dir / "report.pdf"
+        t = time.perf_counter()
+        save_reviews_to_pdf(responses, output_path=str(report_path))
+        timings["save_reviews_to_pdf"] = time.perf_counter() - t
+
+        # The original rebuttal path: reviews are parsed back out of the report PDF.
+        t = time.perf_counter()
+        review_text = extract_text_from_pdf(report_path, use_cache=False)
+        rebuttal_text = extract_text_from_pdf(rebuttal_path, use_cache=False)
+        run_rebuttal_round(structured["text"], review_text, rebuttal_text, reviewers)
+        timings["rebuttal"] = time.perf_counter() - t
+
+    timings["total"] = time.perf_counter() - start
+    return timings
+
+
+def compare(current, previous_path):
+    with open(previous_path) as f:
+        previous = json.load(f)
+    print(f"\nvs {previous_path} (commit {previous.get('commit')}):")
+    for stage in STAGES:
+        old = previous["stages"].get(stage, {}).get("p50")
+        new = current["stages"][stage]["p50"]
+        if old:
+            print(f"  {stage:<20} p50 {old:7.3f}s -> {new:7.3f}s ({(new - old) / old:+.1%})")
+    old_tp, new_tp = previous.get("manuscripts_per_minute"), current["manuscripts_per_minute"]
+    if old_tp:
+        print(f"  throughput {old_tp:.2f} -> {new_tp:.2f} manuscripts/min")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--response-words", type=int, default=300)
+    parser.add_argument("--journal", default="NeurIPS")
+    parser.add_argument("--output", default="bench_pipeline.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    server = use_fake_llm(args.latency, args.response_words, args.jitter)
+    corpus = {}
+    for pages in args.pages:
+        corpus[pages] = write_synthetic_manuscript(
+            WORK_DIR / f"manuscript_{pages}p.pdf", pages, seed=pages
+        )
+    names = [role["name"] for role in REVIEWER_ROLES]
+    rebuttal_path = write_rebuttal(WORK_DIR / "rebuttal.pdf", names)
+
+    samples = {stage: [] for stage in STAGES}
+    per_size = {}
+    wall_start = time.perf_counter()
+    for pages, pdf_path in corpus.items():
+        per_size[pages] = []
+        for run in range(args.runs):
+            run_dir = WORK_DIR / f"run_{pages}p_{run}"
+            run_dir.mkdir()
+            timings = run_once(pdf_path, rebuttal_path, args.journal, run_dir)
+            per_size[pages].append(timings["total"])
+            for stage, seconds in timings.items():
+                samples[stage].append(seconds)
+            print(
+                f"{pages:4d} pages, run {run + 1}: "
+                + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+            )
+    wall = time.perf_counter() - wall_start
+    server.stop()
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "pages": args.pages,
+            "runs": args.runs,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "response_words": args.response_words,
+            "journal": args.journal,
+        },
+        "stages": {
+            stage: {
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "mean": statistics.fmean(values),
+                "n": len(values),
+            }
+            for stage, values in samples.items()
+        },
+        "total_p50_by_pages": {
+            str(pages): percentile(values, 50) for pages, values in per_size.items()
+        },
+        "manuscripts_per_minute": len(samples["total"]) / wall * 60,
+        "llm_requests": server.requests,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+
+    print(
+        f"\n{len(samples['total'])} manuscripts in {wall:.1f}s "
+        f"({result['manuscripts_per_minute']:.2f}/min), {server.requests} LLM requests, "
+        f"peak RSS {result['peak_rss_mb']:.0f} MB"
+    )
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<20} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s")
+    print(f"Results written to {args.output}")
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark: shared LLM rate limiter against a throttling fake endpoint
+
+Starts a local HTTP server that accepts at most --server-rpm requests per
+minute (enforced over a one-second sliding window, so runs stay short) and
+answers the rest with 429 + Retry-After, then sends --requests calls from
+--threads threads through one RateLimiter configured with --client-rpm. A fraction of requests (--slow-fraction)
+stall past the client timeout to exercise timeout retries.
+
+Prints throughput, how often the server throttled, and the limiter's queue
+depth / wait statistics. With --client-rpm above --server-rpm the limiter
+has to adapt; at or below it, 429s should be rare.
+
+Usage:
+    python benchmarks/bench_rate_limit.py --requests 200 --threads 16 \
+        --server-rpm 600 --client-rpm 900
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from rate_limit import RateLimiter  # noqa: E402
+
+
+def make_handler(server_rpm, latency, slow_fraction, slow_latency, counters):
+    window = deque()
+    lock = threading.Lock()
+    per_second = max(1, server_rpm // 60)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            now = time.monotonic()
+            with lock:
+                while window and now - window[0] > 1:
+                    window.popleft()
+                throttled = len(window) >= per_second
+                if throttled:
+                    counters["429"] += 1
+                    retry_after = max(0.05, 1 - (now - window[0]))
+                else:
+                    window.append(now)
+                    counters["200"] += 1
+            if throttled:
+                self.send_response(429)
+                self.send_header("Retry-After", f"{retry_after:.2f}")
+                self.end_headers()
+                return
+            slow = random.random() < slow_fraction
+            time.sleep(slow_latency if slow else latency)
+            body = json.dumps({"content": "ok"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client timed out and will retry
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--server-rpm", type=int, default=600)
+    parser.add_argument("--client-rpm", type=float, default=900)
+    parser.add_argument("--tokens", type=int, default=500, help="estimated tokens per call")
+    parser.add_argument("--client-tpm", type=float, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-fraction", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    counters = {"200": 0, "429": 0}
+    handler = make_handler(
+        args.server_rpm, args.latency, args.slow_fraction, args.timeout * 2, counters
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+
+    limiter = RateLimiter(
+        rpm=args.client_rpm, tpm=args.client_tpm, base_backoff=0.2, max_backoff=5.0
+    )
+
+    def request():
+        data = json.dumps({"messages": [{"role": "user", "content": "hi"}]}).encode()
+        req = urllib.request.Request(url, data=data, method="POST")
+        with urllib.request.urlopen(req, timeout=args.timeout) as response:
+            return json.loads(response.read())
+
+    failures = []
+    start = time.perf_counter()
+
+    def one(_):
+        try:
+            limiter.call(request, tokens=args.tokens)
+        except Exception as exc:
+            failures.append(repr(exc))
+
+    with ThreadPoolExecutor(args.threads) as pool:
+        list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    stats = limiter.stats()
+    print(
+        f"{args.requests} requests in {elapsed:.2f}s "
+        f"({args.requests / elapsed * 60:.0f} req/min effective)"
+    )
+    print(f"server: {counters['200']} accepted, {counters['429']} throttled (429)")
+    print(
+        f"limiter: {stats['retries']} retries ({stats['throttled']} throttled, "
+        f"{stats['timeouts']} timeouts), mean wait {stats['mean_wait'] * 1000:.0f} ms, "
+        f"max wait {stats['max_wait']:.2f}s, max queue depth {stats['max_queue_depth']}, "
+        f"rate scale {stats['rate_scale']:.2f}"
+    )
+    if failures:
+        print(f"{len(failures)} calls failed, e.g. {failures[0]}")
+
+
+if __name__ == "__main__":
+    main()
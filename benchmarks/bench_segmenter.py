@@ -0,0 +1,106 @@
+"""
+Benchmark: reviewer segmentation of review reports and rebuttal letters
+
+Compares the single-pass segmenter with the original per-reviewer regex
+scans on synthetic documents (default: 200 pages, 12 reviewers) and checks
+that both find the same review sections.
+
+Usage:
+    python benchmarks/bench_segmenter.py --pages 200 --reviewers 12 --rounds 3
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from segmenter import rebuttal_segments, review_segments  # noqa: E402
+
+WORDS = "the model results method data we our show table figure error baseline".split()
+CHARS_PER_PAGE = 3000
+
+
+def legacy_get_rebuttals_by_reviewer(rebuttal_text, reviewer_names):
+    rebuttals = {}
+    for name in reviewer_names:
+        pattern = rf"{name}.*?(?=\n[A-Z][a-z]+Reviewer|\Z)"
+        match = re.search(pattern, rebuttal_text, re.DOTALL)
+        rebuttals[name] = (
+            match.group(0).strip() if match else "No specific rebuttal found."
+        )
+    return rebuttals
+
+
+def legacy_extract_reviewer_section(reviewer_name, review_text):
+    pattern = rf"{reviewer_name} Review\n+(.*?)(?=\n\w+Reviewer Review|\Z)"
+    match = re.search(pattern, review_text, re.DOTALL)
+    return match.group(1).strip() if match else "No review found."
+
+
+def synthetic_document(names, pages, heading, rng):
+    per_reviewer = pages * CHARS_PER_PAGE // len(names)
+    parts = []
+    for name in names:
+        body, size = [], 0
+        while size < per_reviewer:
+            line = " ".join(rng.choices(WORDS, k=12))
+            body.append(line)
+            size += len(line) + 1
+        parts.append(f"{heading(name)}\n\n" + "\n".join(body))
+    return "\n\n".join(parts)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark reviewer segmentation")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--reviewers", type=int, default=12)
+    parser.add_argument("--rounds", type=int, default=3, help="Lookups per document")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = [f"Reviewer{chr(65 + i % 26)}{i}Reviewer" for i in range(args.reviewers)]
+    review_text = synthetic_document(names, args.pages, lambda n: f"{n} Review", rng)
+    rebuttal_text = synthetic_document(
+        names, args.pages, lambda n: f"Response to {n}", rng
+    )
+    print(
+        f"{args.pages} pages, {args.reviewers} reviewers, "
+        f"{len(review_text) + len(rebuttal_text):,} characters, {args.rounds} rounds"
+    )
+
+    def legacy():
+        for _ in range(args.rounds):
+            legacy_get_rebuttals_by_reviewer(rebuttal_text, names)
+            sections = {n: legacy_extract_reviewer_section(n, review_text) for n in names}
+        return sections
+
+    def single_pass():
+        review_segments.cache_clear()
+        rebuttal_segments.cache_clear()
+        for _ in range(args.rounds):
+            rebuttals = rebuttal_segments(rebuttal_text)
+            {n: rebuttals.find_inline(n) for n in names}
+            reviews = review_segments(review_text)
+            sections = {n: reviews.get(n, "No review found.") for n in names}
+        return sections
+
+    legacy_seconds, legacy_sections = timed(legacy)
+    new_seconds, new_sections = timed(single_pass)
+    print(f"  per-reviewer regex: {legacy_seconds * 1000:9.1f} ms")
+    print(f"  single pass:        {new_seconds * 1000:9.1f} ms")
+    print(f"  speed-up:           {legacy_seconds / new_seconds:9.1f}x")
+    print(f"  review sections identical: {legacy_sections == new_sections}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark: review service throughput under concurrent submissions
+
+Starts the review service (service.py) in-process on a free port, with every
+LLM call answered by the local fake backend (fake_backend.FakeLLMServer),
+uploads a small synthetic corpus and has --clients threads submit --jobs
+review jobs as fast as the service accepts them, polling each job until it
+finishes. Jobs rejected with 503 (queue full) are retried after a short wait.
+
+Reports jobs per minute, submit-to-done latency and queue wait (p50/p95),
+the number of 503 rejections and how many reviewer agents were built versus
+reused. Run it with different --workers values to size the worker pool.
+
+Usage:
+    python benchmarks/bench_service.py --jobs 40 --clients 8 --workers 4
+    python benchmarks/bench_service.py --latency 1.0 --queue-size 4 --output svc.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORK_DIR = Path(tempfile.mkdtemp(prefix="peerlens_bench_service_"))
+
+# Caches and rate limits are configured from the environment at import time.
+os.environ.update(
+    {
+        "PEERLENS_LLM_CACHE": "off",
+        "PEERLENS_PDF_CACHE": "0",
+        "PEERLENS_LLM_RPM": "0",
+        "PEERLENS_LLM_TPM": "0",
+        "PEERLENS_CACHE_DIR": str(WORK_DIR / "cache"),
+        "PEERLENS_REVIEW_STORE": str(WORK_DIR / "reviews.sqlite"),
+        "AUTOGEN_USE_DOCKER": "False",
+    }
+)
+sys.path.insert(0, str(ROOT / "src"))
+
+from fake_backend import use_fake_llm, write_synthetic_manuscript  # noqa: E402
+from service import ReviewService, create_app  # noqa: E402
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(url, data=None, content_type="application/json"):
+    headers = {"Content-Type": content_type} if data is not None else {}
+    req = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(req, timeout=60) as response:
+        return json.load(response)
+
+
+def start_service(service, port):
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(service), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Review service failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def run_job(base_url, upload, journal, poll_interval, rejections):
+    body = json.dumps({"type": "review", "upload": upload, "journal": journal})
+    while True:
+        try:
+            job = request(f"{base_url}/jobs", body.encode())
+            break
+        except urllib.error.HTTPError as exc:
+            if exc.code != 503:
+                raise
+            rejections.append(1)
+            time.sleep(poll_interval * 5)
+    while job["status"] not in ("done", "failed"):
+        time.sleep(poll_interval)
+        job = request(f"{base_url}/jobs/{job['id']}")
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="service worker pool size")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--manuscripts", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per LLM call")
+    parser.add_argument("--response-words", type=int, default=300)
+    parser.add_argument("--journal", default="NeurIPS")
+    parser.add_argument("--poll-interval", type=float, default=0.1)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    fake_llm = use_fake_llm(args.latency, args.response_words)
+    service = ReviewService(args.workers, args.queue_size, WORK_DIR / "service")
+    port = free_port()
+    start = time.perf_counter()
+    server, thread = start_service(service, port)
+    startup = time.perf_counter() - start
+    base_url = f"http://127.0.0.1:{port}"
+
+    uploads = []
+    for i in range(args.manuscripts):
+        path = write_synthetic_manuscript(
+            WORK_DIR / f"manuscript_{i}.pdf", args.pages, seed=i
+        )
+        uploads.append(
+            request(f"{base_url}/uploads", path.read_bytes(), "application/pdf")["upload"]
+        )
+
+    rejections = []
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as clients:
+        futures = [
+            clients.submit(
+                run_job,
+                base_url,
+                uploads[i % len(uploads)],
+                args.journal,
+                args.poll_interval,
+                rejections,
+            )
+            for i in range(args.jobs)
+        ]
+        jobs = [future.result() for future in futures]
+    wall = time.perf_counter() - wall_start
+    health = request(f"{base_url}/health")
+
+    server.should_exit = True
+    thread.join()
+    fake_llm.stop()
+
+    finished = [job for job in jobs if job["status"] == "done"]
+    latency = [job["finished_at"] - job["submitted_at"] for job in finished]
+    queue_wait = [job["started_at"] - job["submitted_at"] for job in finished]
+    result = {
+        "params": vars(args),
+        "startup_seconds": startup,
+        "jobs_done": len(finished),
+        "jobs_failed": len(jobs) - len(finished),
+        "jobs_per_minute": len(finished) / wall * 60,
+        "rejected_503": len(rejections),
+        "latency": {
+            "p50": percentile(latency, 50),
+            "p95": percentile(latency, 95),
+            "mean": statistics.fmean(latency),
+        }
+        if latency
+        else None,
+        "queue_wait": {
+            "p50": percentile(queue_wait, 50),
+            "p95": percentile(queue_wait, 95),
+        }
+        if queue_wait
+        else None,
+        "llm_requests": fake_llm.requests,
+        "agents_created": health["agents_created"],
+        "agents_reused": health["agents_reused"],
+    }
+
+    print(
+        f"{len(finished)}/{len(jobs)} jobs in {wall:.1f}s "
+        f"({result['jobs_per_minute']:.1f}/min) with {args.workers} workers, "
+        f"{args.clients} clients; startup {startup:.2f}s"
+    )
+    if latency:
+        print(
+            f"  latency p50 {result['latency']['p50']:.2f}s  p95 {result['latency']['p95']:.2f}s"
+            f"  queue wait p50 {result['queue_wait']['p50']:.2f}s"
+            f"  p95 {result['queue_wait']['p95']:.2f}s"
+        )
+    print(
+        f"  {len(rejections)} rejected (queue full), {fake_llm.requests} LLM requests, "
+        f"agents built {health['agents_created']} / reused {health['agents_reused']}"
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
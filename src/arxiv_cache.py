@@ -0,0 +1,171 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import arxiv
+
+from config import ARXIV_QUERY_TTL
+
+
+def short_id(entry_id):
+    """``http://arxiv.org/abs/2101.00001v2`` -> ``2101.00001v2``"""
+    return entry_id.split("/abs/")[-1] if "/abs/" in entry_id else entry_id.split("/")[-1]
+
+
+def _base_id(paper_id):
+    """Strips the version suffix: ``2101.00001v2`` -> ``2101.00001``"""
+    return re.sub(r"v\d+$", "", paper_id)
+
+
+def is_valid_pdf(path):
+    """True if ``path`` looks like a complete PDF (header and end-of-file marker)."""
+    path = Path(path)
+    if not path.is_file():
+        return False
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            return False
+        f.seek(max(0, size - 2048))
+        return b"%%EOF" in f.read()
+
+
+class ArxivCache:
+    """
+    SQLite cache of arXiv search results and paper metadata.
+
+    Query results (query -> IDs) expire after ``query_ttl`` seconds, paper
+    metadata (ID -> title, abstract, authors, date) is kept indefinitely.
+    ``client`` is anything with an ``arxiv.Client``-style ``results(search)``
+    method, so a local stand-in can replace the arXiv API.
+    """
+
+    def __init__(self, db_path, query_ttl=ARXIV_QUERY_TTL, client=None):
+        self.query_ttl = query_ttl
+        self.client = client or arxiv.Client()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                " query TEXT NOT NULL,"
+                " max_results INTEGER NOT NULL,"
+                " ids TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL,"
+                " PRIMARY KEY (query, max_results))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                " id TEXT PRIMARY KEY,"
+                " title TEXT NOT NULL,"
+                " abstract TEXT NOT NULL,"
+                " authors TEXT NOT NULL,"
+                " published TEXT,"
+                " pdf_url TEXT,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def _store_results(self, results, requested=()):
+        """Stores paper metadata and returns the short IDs in result order."""
+        ids, rows = [], []
+        now = time.time()
+        for result in results:
+            paper_id = short_id(result.entry_id)
+            ids.append(paper_id)
+            row = (
+                result.title,
+                result.summary,
+                json.dumps([str(author) for author in result.authors]),
+                result.published.date().isoformat() if result.published else None,
+                result.pdf_url,
+                now,
+            )
+            rows.append((paper_id, *row))
+            # Also store under the ID that was asked for (e.g. without version).
+            for alias in requested:
+                if alias != paper_id and alias == _base_id(paper_id):
+                    rows.append((alias, *row))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO papers"
+                " (id, title, abstract, authors, published, pdf_url, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return ids
+
+    def search(self, query, max_results=3):
+        """Returns the IDs of the top papers for ``query``, from cache when fresh."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ids, fetched_at FROM queries WHERE query = ? AND max_results = ?",
+                (query, max_results),
+            ).fetchone()
+        if row and time.time() - row[1] <= self.query_ttl:
+            return json.loads(row[0])
+
+        search = arxiv.Search(query=query, max_results=max_results)
+        ids = self._store_results(list(self.client.results(search)))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (query, max_results, ids, fetched_at)"
+                " VALUES (?, ?, ?, ?)",
+                (query, max_results, json.dumps(ids), time.time()),
+            )
+        return ids
+
+    def get_paper(self, arxiv_id):
+        """Returns cached metadata for a paper, fetching it once if unknown."""
+        return self.get_papers([arxiv_id])[arxiv_id]
+
+    def get_papers(self, arxiv_ids):
+        """
+        Returns ``{id: metadata or None}`` for several papers.
+
+        Unknown papers are fetched together in a single ``id_list`` query.
+        """
+        papers = {arxiv_id: self.lookup(arxiv_id) for arxiv_id in arxiv_ids}
+        missing = [arxiv_id for arxiv_id, paper in papers.items() if paper is None]
+        if missing:
+            search = arxiv.Search(id_list=missing, max_results=len(missing))
+            self._store_results(list(self.client.results(search)), requested=missing)
+            for arxiv_id in missing:
+                papers[arxiv_id] = self.lookup(arxiv_id)
+        return papers
+
+    def lookup(self, arxiv_id):
+        """Returns cached metadata for a paper without touching the network."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, abstract, authors, published, pdf_url FROM papers"
+                " WHERE id = ?",
+                (arxiv_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        title, abstract, authors, published, pdf_url = row
+        return {
+            "id": arxiv_id,
+            "title": title,
+            "abstract": abstract,
+            "authors": json.loads(authors),
+            "published": published,
+            "pdf_url": pdf_url,
+        }
+
+    def all_papers(self):
+        """Returns every cached paper once (version aliases collapsed), oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, abstract FROM papers ORDER BY fetched_at, id"
+            ).fetchall()
+        papers, seen = [], set()
+        for paper_id, title, abstract in rows:
+            if (title, abstract) in seen:
+                continue
+            seen.add((title, abstract))
+            papers.append({"id": paper_id, "title": title, "abstract": abstract})
+        return papers
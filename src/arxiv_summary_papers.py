@@ -4,11 +4,14 @@ ArXiv Research Summary Workflow
 This script creates an intelligent workflow to:
 1. Search arXiv for papers based on keywords
 2. Retrieve and summarize the most relevant papers
+
+Several keyword sets run concurrently over a pool of warm arXiv MCP servers
+(see mcp_pool.py), so the server start and toolkit setup are paid once per
+server rather than once per query.
 """
 
-from pathlib import Path
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+import argparse
+from mcp import ClientSession
 from autogen.mcp import create_toolkit
 import os
 import copy
@@ -20,6 +23,9 @@ from typing import List
 
 # Autogen imports
 from autogen.agentchat import AssistantAgent, UserProxyAgent, a_initiate_chat
+from config import MCP_POOL_SIZE, MCP_SERVER_URL, MCP_STORAGE_PATH
+from mcp_pool import MCPSessionPool
+from rate_limit import get_rate_limiter
 
 # Configuration for LLM
 default_llm_config = {
@@ -36,9 +42,6 @@ default_llm_config = {
     "timeout": 1200,
 }
 
-# Path to the arxiv MCP server
-mcp_server_path = Path("mcp_arxiv.py")
-
 # Summary Response Model
 from pydantic import BaseModel, Field
 
@@ -120,10 +123,15 @@ def create_arxiv_summary_agents(keywords: str):
         llm_config=summary_config_list,
     )
 
+    # Both agents share the process-wide request and token limits.
+    limiter = get_rate_limiter()
+    limiter.throttle_agent(arxiv_search_agent)
+    limiter.throttle_agent(summary_agent)
+
     return user_proxy, arxiv_search_agent, summary_agent
 
 
-async def create_toolkit_and_run(session: ClientSession, keywords: str) -> None:
+async def create_toolkit_and_run(session: ClientSession, keywords: str):
     """
     Create toolkit and run the ArXiv summary workflow.
 
@@ -133,7 +141,17 @@ async def create_toolkit_and_run(session: ClientSession, keywords: str) -> None:
     """
     # Create a toolkit with available MCP tools
     toolkit = await create_toolkit(session=session)
+    return await run_with_toolkit(toolkit, keywords)
+
+
+async def run_with_toolkit(toolkit, keywords: str):
+    """
+    Run the ArXiv summary workflow with an existing MCP toolkit.
 
+    Args:
+        toolkit: Toolkit of an open MCP session (e.g. from MCPSessionPool)
+        keywords (str): Search keywords for arXiv
+    """
     # Create agents
     user_proxy, arxiv_search_agent, summary_agent = create_arxiv_summary_agents(
         keywords
@@ -144,45 +162,73 @@ async def create_toolkit_and_run(session: ClientSession, keywords: str) -> None:
     toolkit.register_for_execution(arxiv_search_agent)
 
     # Initiate interaction
-    await a_initiate_chat(
+    return await a_initiate_chat(
         arxiv_search_agent,
         user_proxy,
         message=f"Search and summarize research papers about: {keywords}",
     )
 
 
-def main(keywords: str):
+async def summarize_keyword_sets(pool: MCPSessionPool, keyword_sets: List[str]):
+    """
+    Run the workflow for every keyword set concurrently over ``pool``.
+
+    Returns one chat result per keyword set, in order, or the exception if
+    that query failed. Raises ``RuntimeError`` if no MCP server could be
+    started.
+    """
+
+    async def run(session, toolkit, keywords):
+        return await run_with_toolkit(toolkit, keywords)
+
+    return await pool.run_all(run, keyword_sets)
+
+
+def main(
+    keyword_sets: List[str],
+    servers: int = MCP_POOL_SIZE,
+    server_url: str = MCP_SERVER_URL,
+    storage_path: str = MCP_STORAGE_PATH,
+):
     """
     Main function to run the ArXiv summary workflow.
 
     Args:
-        keywords (str): Search keywords for arXiv
+        keyword_sets (List[str]): Search keywords for arXiv, one string per query
+        servers (int): Number of arXiv MCP servers to keep running
+        server_url (str): SSE URL of a shared arXiv MCP server, instead of
+            starting local ones
+        storage_path (str): Where local servers store downloaded papers
     """
-    # Server parameters for MCP
-    server_params = StdioServerParameters(
-        command="python",
-        args=[str(mcp_server_path), "stdio", "--storage-path", "arxiv_papers"],
-    )
+    if isinstance(keyword_sets, str):
+        keyword_sets = [keyword_sets]
 
     # Run async workflow
     async def run_workflow():
-        async with stdio_client(server_params) as (read, write), ClientSession(
-            read, write
-        ) as session:
-            await session.initialize()
-            await create_toolkit_and_run(session, keywords)
+        size = min(servers, len(keyword_sets))
+        async with MCPSessionPool(size, storage_path, server_url) as pool:
+            return await summarize_keyword_sets(pool, keyword_sets)
 
     # Run the async workflow
-    asyncio.run(run_workflow())
+    return asyncio.run(run_workflow())
 
 
 if __name__ == "__main__":
-    # Example usage
-    import sys
-
-    if len(sys.argv) > 1:
-        keywords = " ".join(sys.argv[1:])
-        main(keywords)
+    parser = argparse.ArgumentParser(description="Search and summarize arXiv papers")
+    parser.add_argument("keywords", nargs="*", help="Search keywords (one query)")
+    parser.add_argument("--queries", help="File with one keyword set per line")
+    parser.add_argument("--servers", type=int, default=MCP_POOL_SIZE)
+    parser.add_argument("--server-url", default=MCP_SERVER_URL, help="Shared SSE server")
+    parser.add_argument("--storage-path", default=MCP_STORAGE_PATH)
+    args = parser.parse_args()
+
+    keyword_sets = [" ".join(args.keywords)] if args.keywords else []
+    if args.queries:
+        with open(args.queries) as f:
+            keyword_sets += [line.strip() for line in f if line.strip()]
+    if keyword_sets:
+        main(keyword_sets, args.servers, args.server_url, args.storage_path)
     else:
         print("Please provide search keywords")
         print("Example: python script.py machine learning transformers")
+        print("     or: python script.py --queries keywords.txt --servers 4")
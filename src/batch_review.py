@@ -0,0 +1,241 @@
+"""
+Batch review of a directory (or manifest) of manuscripts.
+
+Every (manuscript, journal, reviewer) unit is checkpointed to disk as soon as
+it completes, so an interrupted run picks up where it left off.
+
+Usage:
+    python batch_review.py drafts/ --journals NeurIPS Nature --workers 4
+    python batch_review.py manifest.txt --checkpoint-dir batch_runs/lab --pdf
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from config import AUTOGEN_USE_DOCKER, JOURNAL_STYLES
+from pdf_utils import structure_output
+from reviewers import reviewer_lease
+from review_engine import run_reviews
+
+
+def collect_manuscripts(source):
+    """
+    Returns the PDF paths to review from a directory or a manifest file.
+
+    A manifest is either a JSON list of paths or a text file with one path per
+    line (blank lines and ``#`` comments are ignored). Relative paths are
+    resolved against the manifest's directory.
+    """
+    source = Path(source)
+    if source.is_dir():
+        return sorted(source.glob("*.pdf"))
+
+    content = source.read_text()
+    if source.suffix == ".json":
+        entries = json.loads(content)
+    else:
+        entries = [
+            line.strip()
+            for line in content.splitlines()
+            if line.strip() and not line.strip().startswith("#")
+        ]
+    return [(source.parent / entry).resolve() for entry in entries]
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", value)
+
+
+class Checkpoint:
+    """One JSON file per completed (manuscript, journal, reviewer) unit."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _path(self, manuscript_hash, journal, reviewer):
+        return (
+            self.directory
+            / "units"
+            / manuscript_hash[:16]
+            / _slug(journal)
+            / f"{_slug(reviewer)}.json"
+        )
+
+    def load(self, manuscript_hash, journal, reviewer):
+        path = self._path(manuscript_hash, journal, reviewer)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)["review"]
+
+    def save(self, manuscript_hash, journal, reviewer, source_file, review):
+        path = self._path(manuscript_hash, journal, reviewer)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "manuscript_hash": manuscript_hash,
+                    "source_file": str(source_file),
+                    "journal": journal,
+                    "reviewer": reviewer,
+                    "review": review,
+                },
+                f,
+            )
+        # Atomic rename so an interrupted write never looks like a finished unit.
+        os.replace(tmp_path, path)
+
+
+def review_job(pdf_path, journal, checkpoint, render_pdf=False):
+    """Reviews one manuscript for one journal, skipping checkpointed reviewers."""
+    structured = structure_output(
+        pdf_path, checkpoint.directory / "images", extract_images=False
+    )
+    manuscript_hash = structured["metadata"]["content_hash"]
+
+    # Pooled agents: setting up reviewers for the next manuscript is free.
+    errors = {}
+    with reviewer_lease(journal, errors=errors) as reviewers:
+        responses, todo = {}, []
+        for agent in reviewers:
+            review = checkpoint.load(manuscript_hash, journal, agent.name)
+            if review is None:
+                todo.append(agent)
+            else:
+                responses[agent.name] = review
+
+        if todo:
+            fresh = run_reviews(todo, structured, errors=errors)
+            for name, review in fresh.items():
+                if name not in errors:
+                    checkpoint.save(manuscript_hash, journal, name, pdf_path, review)
+            responses.update(fresh)
+
+    if render_pdf and not errors:
+        from report import save_reviews_to_pdf
+
+        ordered = {agent.name: responses[agent.name] for agent in reviewers}
+        output_path = checkpoint.directory / "reports" / (
+            f"{Path(pdf_path).stem}__{_slug(journal)}.pdf"
+        )
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        save_reviews_to_pdf(ordered, output_path=str(output_path))
+
+    return {
+        "manuscript": str(pdf_path),
+        "journal": journal,
+        "resumed": len(reviewers) - len(todo),
+        "completed": len(todo) - len(errors),
+        "failed": {name: str(exc) for name, exc in errors.items()},
+    }
+
+
+def run_batch(
+    manuscripts, journals, checkpoint_dir="batch_runs", workers=2, render_pdf=False
+):
+    """
+    Reviews every manuscript for every journal on a bounded worker pool.
+
+    Returns a summary dict with per-job results, unit counts, wall time and
+    throughput (units completed per minute).
+    """
+    unknown = [journal for journal in journals if journal not in JOURNAL_STYLES]
+    if unknown:
+        raise ValueError(f"Unknown journals {unknown}, expected {list(JOURNAL_STYLES)}")
+
+    checkpoint = Checkpoint(checkpoint_dir)
+    jobs = [(pdf, journal) for pdf in manuscripts for journal in journals]
+    results = []
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(review_job, pdf, journal, checkpoint, render_pdf): (pdf, journal)
+            for pdf, journal in jobs
+        }
+        for future in as_completed(futures):
+            pdf, journal = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                # e.g. an unreadable PDF: the whole job fails, other jobs continue.
+                result = {
+                    "manuscript": str(pdf),
+                    "journal": journal,
+                    "resumed": 0,
+                    "completed": 0,
+                    "failed": {"job": str(exc)},
+                }
+            results.append(result)
+            status = "❌" if result["failed"] else "✅"
+            print(f"{status} {Path(pdf).name} [{journal}]")
+
+    elapsed = time.perf_counter() - start
+    completed = sum(r["completed"] for r in results)
+    return {
+        "jobs": results,
+        "completed_units": completed,
+        "resumed_units": sum(r["resumed"] for r in results),
+        "failed_units": sum(len(r["failed"]) for r in results),
+        "seconds": elapsed,
+        "units_per_minute": completed / elapsed * 60 if elapsed else 0.0,
+    }
+
+
+def print_summary(summary):
+    print("\n=== Batch Summary ===")
+    print(f"{'Manuscript':40} {'Journal':10} {'New':>4} {'Resumed':>8} {'Failed':>7}")
+    for job in sorted(summary["jobs"], key=lambda r: (r["manuscript"], r["journal"])):
+        print(
+            f"{Path(job['manuscript']).name[:40]:40} {job['journal'][:10]:10} "
+            f"{job['completed']:>4} {job['resumed']:>8} {len(job['failed']):>7}"
+        )
+    print(
+        f"\nUnits: {summary['completed_units']} new, {summary['resumed_units']} resumed, "
+        f"{summary['failed_units']} failed"
+    )
+    print(
+        f"Wall time: {summary['seconds']:.1f}s "
+        f"({summary['units_per_minute']:.1f} units/min)"
+    )
+    for job in summary["jobs"]:
+        for name, error in job["failed"].items():
+            print(f"⚠️ {Path(job['manuscript']).name} [{job['journal']}] {name}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-review a set of manuscripts")
+    parser.add_argument("source", help="Directory of PDFs or a manifest file")
+    parser.add_argument(
+        "--journals", nargs="+", default=["NeurIPS"], choices=list(JOURNAL_STYLES)
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent jobs")
+    parser.add_argument("--checkpoint-dir", default="batch_runs")
+    parser.add_argument("--pdf", action="store_true", help="Render a PDF report per job")
+    args = parser.parse_args()
+
+    os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
+    manuscripts = collect_manuscripts(args.source)
+    print(f"📚 {len(manuscripts)} manuscripts × {len(args.journals)} journals")
+
+    summary = run_batch(
+        manuscripts,
+        args.journals,
+        checkpoint_dir=args.checkpoint_dir,
+        workers=args.workers,
+        render_pdf=args.pdf,
+    )
+    print_summary(summary)
+    Path(args.checkpoint_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(args.checkpoint_dir) / "summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
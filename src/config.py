@@ -1,4 +1,5 @@
 # === file: config.py ===
+import json
 import os
 from dotenv import load_dotenv
 
@@ -6,17 +7,101 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 AUTOGEN_USE_DOCKER = False
 
-JOURNAL_STYLES = {
-    "Nature": {
-        "tone": "very formal and academic",
-        "focus": "scientific novelty, broad impact, and clarity of communication. you have a clear focus on the natural sciences.",
-    },
-    "NeurIPS": {
-        "tone": "technical and concise",
-        "focus": "experimental rigor, reproducibility, and clarity of claims. You have a clear focus on machine learning and AI.",
-    },
-    "PLoS ONE": {
-        "tone": "neutral and constructive",
-        "focus": "scientific validity regardless of impact or novelty. You have a clear focus on open science and reproducibility.",
-    },
-}
+# Journals (tone and focus) and reviewer roles are data, not code: add a
+# journal by editing journals.json, or point PEERLENS_JOURNALS_FILE elsewhere.
+JOURNALS_FILE = os.getenv(
+    "PEERLENS_JOURNALS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "journals.json"),
+)
+with open(JOURNALS_FILE, encoding="utf-8") as _f:
+    _journal_data = json.load(_f)
+JOURNAL_STYLES = _journal_data["journals"]
+REVIEWER_ROLES = _journal_data["roles"]
+
+# Reviewer calls run concurrently on a bounded thread pool.
+# None means one worker per reviewer / no per-reviewer timeout.
+REVIEW_MAX_WORKERS = int(os.getenv("PEERLENS_REVIEW_MAX_WORKERS", "3")) or None
+REVIEW_TIMEOUT = float(os.getenv("PEERLENS_REVIEW_TIMEOUT", "300")) or None
+
+# On-disk caches (extracted PDF text, LLM responses, ...) live here.
+CACHE_DIR = os.getenv("PEERLENS_CACHE_DIR", ".peerlens_cache")
+PDF_CACHE_ENABLED = os.getenv("PEERLENS_PDF_CACHE", "1") != "0"
+PDF_CACHE_MAX_BYTES = int(os.getenv("PEERLENS_PDF_CACHE_MAX_BYTES", str(256 * 2**20)))
+
+# Reviewer LLM replies are recorded to disk: "off", "record" or "replay".
+# "replay" never calls the API and fails on any unrecorded prompt.
+LLM_CACHE_MODE = os.getenv("PEERLENS_LLM_CACHE", "record")
+LLM_CACHE_TTL = float(os.getenv("PEERLENS_LLM_CACHE_TTL", str(7 * 24 * 3600))) or None
+LLM_CACHE_MAX_BYTES = int(os.getenv("PEERLENS_LLM_CACHE_MAX_BYTES", str(64 * 2**20)))
+
+# PDF text extraction backend: "pdfminer" (page ranges sharded across a
+# process pool) or "fitz" (PyMuPDF, much faster, slightly different layout).
+PDF_BACKEND = os.getenv("PEERLENS_PDF_BACKEND", "pdfminer")
+PDF_WORKERS = int(os.getenv("PEERLENS_PDF_WORKERS", str(os.cpu_count() or 1)))
+PDF_MIN_PAGES_PER_SHARD = int(os.getenv("PEERLENS_PDF_MIN_PAGES_PER_SHARD", "8"))
+
+# Image extraction: images whose shorter side is below IMAGE_MIN_SIZE pixels
+# are skipped, larger ones are recompressed to fit IMAGE_MAX_BYTES, and
+# extraction stops after IMAGE_TOTAL_BYTES per manuscript (0 = no limit).
+IMAGE_EXTRACTION_ENABLED = os.getenv("PEERLENS_EXTRACT_IMAGES", "1") != "0"
+IMAGE_MIN_SIZE = int(os.getenv("PEERLENS_IMAGE_MIN_SIZE", "64"))
+IMAGE_MAX_BYTES = int(os.getenv("PEERLENS_IMAGE_MAX_BYTES", str(512 * 2**10)))
+IMAGE_TOTAL_BYTES = int(os.getenv("PEERLENS_IMAGE_TOTAL_BYTES", str(32 * 2**20)))
+
+# Manuscripts whose prompt exceeds MAX_PROMPT_TOKENS are reviewed chunk by
+# chunk (map) and the per-chunk notes are merged into one review (reduce).
+MAX_PROMPT_TOKENS = int(os.getenv("PEERLENS_MAX_PROMPT_TOKENS", "100000"))
+CHUNK_TOKENS = int(os.getenv("PEERLENS_CHUNK_TOKENS", "16000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("PEERLENS_CHUNK_OVERLAP_TOKENS", "500"))
+
+# arXiv search results are cached for this many seconds; paper metadata is kept.
+ARXIV_QUERY_TTL = float(os.getenv("PEERLENS_ARXIV_QUERY_TTL", str(24 * 3600)))
+
+# Structured review / rebuttal rounds (see review_store.py).
+REVIEW_STORE_PATH = os.getenv("PEERLENS_REVIEW_STORE", "peerlens_reviews.sqlite")
+
+# Revised manuscripts are re-reviewed from a paragraph diff against the
+# previous revision; if more than this fraction of the text changed, the
+# reviewers read the full manuscript again instead.
+REVISION_FULL_REVIEW_RATIO = float(os.getenv("PEERLENS_REVISION_FULL_REVIEW_RATIO", "0.5"))
+
+# Process-wide LLM rate limits shared by every agent (0 disables a limit).
+# Throttled (429) or timed-out calls are retried up to LLM_MAX_RETRIES times
+# with exponential backoff, and the request rate is cut back until calls
+# succeed again.
+LLM_RPM = float(os.getenv("PEERLENS_LLM_RPM", "500"))
+LLM_TPM = float(os.getenv("PEERLENS_LLM_TPM", "200000"))
+LLM_MAX_RETRIES = int(os.getenv("PEERLENS_LLM_MAX_RETRIES", "5"))
+
+# Stage timings, LLM latency / tokens / estimated cost and cache hit rates
+# (see instrumentation.py). Events are appended to METRICS_JSONL and the
+# totals are written to METRICS_PROM in Prometheus text format.
+METRICS_ENABLED = os.getenv("PEERLENS_METRICS", "0") != "0"
+METRICS_JSONL = os.getenv("PEERLENS_METRICS_JSONL", "peerlens_metrics.jsonl")
+METRICS_PROM = os.getenv("PEERLENS_METRICS_PROM", "peerlens_metrics.prom")
+
+# Strip running headers/footers, page and line numbers, hyphenation splits
+# and ligatures from manuscript text before review (see normalize.py).
+NORMALIZE_TEXT = os.getenv("PEERLENS_NORMALIZE_TEXT", "1") != "0"
+
+# Long-lived review service (see service.py): jobs wait in a queue of at most
+# SERVICE_QUEUE_SIZE entries and SERVICE_WORKERS of them run at a time.
+# Uploads, results and the arXiv cache are kept under SERVICE_DATA_DIR.
+SERVICE_HOST = os.getenv("PEERLENS_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.getenv("PEERLENS_SERVICE_PORT", "8000"))
+SERVICE_WORKERS = int(os.getenv("PEERLENS_SERVICE_WORKERS", "2"))
+SERVICE_QUEUE_SIZE = int(os.getenv("PEERLENS_SERVICE_QUEUE_SIZE", "64"))
+SERVICE_MAX_JOBS = int(os.getenv("PEERLENS_SERVICE_MAX_JOBS", "1000"))
+SERVICE_DATA_DIR = os.getenv("PEERLENS_SERVICE_DATA_DIR", "peerlens_service")
+# Larger uploads are rejected with 413.
+SERVICE_MAX_UPLOAD_MB = float(os.getenv("PEERLENS_SERVICE_MAX_UPLOAD_MB", "50"))
+
+# arXiv summary workflow (see mcp_pool.py): MCP_POOL_SIZE arXiv MCP servers
+# are kept running and shared by concurrent keyword queries. With
+# MCP_SERVER_URL set, the pool connects to a shared server over SSE instead
+# (started with ``python mcp_arxiv.py sse --port MCP_PORT``).
+MCP_POOL_SIZE = int(os.getenv("PEERLENS_MCP_POOL_SIZE", "2"))
+MCP_SERVER_URL = os.getenv("PEERLENS_MCP_SERVER_URL", "")
+MCP_STORAGE_PATH = os.getenv("PEERLENS_MCP_STORAGE_PATH", "arxiv_papers")
+MCP_HOST = os.getenv("PEERLENS_MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("PEERLENS_MCP_PORT", "8001"))
@@ -0,0 +1,220 @@
+"""
+Offline stand-ins for benchmarking and tutorials.
+
+- :class:`FakeLLMServer`: a local OpenAI-compatible chat completions endpoint
+  that returns deterministic review-style replies (seeded by the prompt) with
+  configurable latency and length, so the real autogen client code path is
+  exercised without spending API money.
+- :func:`use_fake_llm`: starts one and points the reviewers at it.
+- :func:`write_synthetic_manuscript`: writes a manuscript PDF with standard
+  section headings and an exact page count (needs reportlab).
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "model data results method baseline error training evaluation dataset "
+    "significant analysis approach performance proposed sample effect robust "
+    "variance experiment ablation metric benchmark hypothesis accuracy"
+).split()
+
+SECTION_HEADINGS = [
+    "Abstract",
+    "1 Introduction",
+    "2 Methods",
+    "3 Results",
+    "4 Discussion",
+    "References",
+]
+
+
+def fake_review(prompt, words=300):
+    """Deterministic review-style reply for ``prompt`` (same prompt, same reply)."""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+
+    def sentence():
+        return " ".join(rng.choices(WORDS, k=rng.randint(8, 16))).capitalize() + "."
+
+    per_part = max(1, words // 40)
+    parts = [
+        "Summary\n" + " ".join(sentence() for _ in range(per_part)),
+        "Major Concerns\n" + "\n".join(f"- {sentence()}" for _ in range(per_part)),
+        "Minor Suggestions\n" + "\n".join(f"- {sentence()}" for _ in range(per_part)),
+        f"Score: {rng.randint(3, 9)}/10",
+        f"Final verdict: {rng.choice(['Accept', 'Revise', 'Reject'])}",
+    ]
+    return "\n\n".join(parts)
+
+
+class FakeLLMServer:
+    """
+    Local ``/v1/chat/completions`` endpoint (streaming and non-streaming).
+
+    Each request sleeps ``latency`` seconds (± ``jitter``) and answers with
+    about ``response_words`` words. Runs on a background thread; use as a
+    context manager or call :meth:`start` / :meth:`stop`.
+    """
+
+    def __init__(self, latency=0.5, response_words=300, jitter=0.0, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.response_words = response_words
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                prompt = "\n".join(str(m.get("content") or "") for m in body.get("messages", []))
+                with fake._lock:
+                    fake.requests += 1
+                delay = fake.latency + random.uniform(-fake.jitter, fake.jitter)
+                time.sleep(max(0.0, delay))
+                reply = fake_review(prompt, fake.response_words)
+                model = body.get("model", "fake")
+                if body.get("stream"):
+                    self._stream(reply, model)
+                else:
+                    self._send_json(self._completion(reply, prompt, model))
+
+            def _completion(self, reply, prompt, model):
+                prompt_tokens, completion_tokens = len(prompt) // 4, len(reply) // 4
+                return {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": reply},
+                            "finish_reason": "stop",
+                            "logprobs": None,
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }
+
+            def _send_json(self, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, reply, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                pieces = [reply[i : i + 40] for i in range(0, len(reply), 40)]
+                for i, piece in enumerate(pieces + [None]):
+                    chunk = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": piece} if piece else {},
+                                "finish_reason": None if piece else "stop",
+                            }
+                        ],
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def fake_llm_config(server, model="gpt-4o-mini"):
+    """An autogen ``LLMConfig`` that talks to ``server``."""
+    from autogen import LLMConfig
+
+    return LLMConfig(api_type="openai", model=model, base_url=server.base_url, api_key="fake")
+
+
+def use_fake_llm(latency=0.5, response_words=300, jitter=0.0):
+    """Starts a :class:`FakeLLMServer` and makes new reviewers use it."""
+    from reviewers import set_llm_config
+
+    server = FakeLLMServer(latency, response_words, jitter).start()
+    set_llm_config(fake_llm_config(server))
+    return server
+
+
+def write_synthetic_manuscript(path, pages, seed=0, lines_per_page=48):
+    """Writes a manuscript PDF of exactly ``pages`` pages with the usual sections."""
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.pdfgen import canvas
+
+    rng = random.Random(seed)
+    total_lines = pages * lines_per_page
+    # Headings are spread evenly; the reference list takes the last tenth.
+    heading_at = {0: SECTION_HEADINGS[0]}
+    body_headings = SECTION_HEADINGS[1:-1]
+    for i, heading in enumerate(body_headings):
+        heading_at[2 + i * (total_lines * 9 // 10) // len(body_headings)] = heading
+    heading_at[total_lines * 9 // 10] = SECTION_HEADINGS[-1]
+
+    pdf = canvas.Canvas(str(path), pagesize=LETTER)
+    _, height = LETTER
+    for line_number in range(total_lines):
+        row = line_number % lines_per_page
+        if row == 0 and line_number:
+            pdf.showPage()
+        if line_number in heading_at:
+            pdf.setFont("Helvetica-Bold", 11)
+            text = heading_at[line_number]
+        else:
+            pdf.setFont("Helvetica", 10)
+            text = " ".join(rng.choices(WORDS, k=rng.randint(9, 13)))
+            if rng.random() < 0.15:
+                text = ""  # paragraph break
+        pdf.drawString(72, height - 60 - row * 14, text)
+    pdf.save()
+    return path
@@ -0,0 +1,298 @@
+"""
+Lightweight pipeline instrumentation.
+
+Records wall time per pipeline stage, per-agent LLM latency, prompt and
+completion tokens, estimated cost and cache hit rates. Every measurement is
+appended to a JSON lines file as it happens, and running totals are written
+to a Prometheus text file (on exit, and at most every few seconds while a
+long-running process such as the MCP server is busy).
+
+Instrumentation is off unless ``PEERLENS_METRICS=1`` or :func:`enable` is
+called; when off, :func:`stage` returns a shared no-op context manager and
+the ``record_*`` functions return immediately.
+"""
+
+import atexit
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+from config import METRICS_ENABLED, METRICS_JSONL, METRICS_PROM
+
+# USD per million (prompt, completion) tokens; unknown models are costed at 0.
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# Minimum seconds between rewrites of the Prometheus file.
+PROM_WRITE_INTERVAL = 10.0
+
+_NULL_STAGE = nullcontext()
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_label_value(value)}"' for key, value in labels.items())
+
+
+class Metrics:
+    """Aggregated measurements, plus a JSON lines log of each one."""
+
+    def __init__(self, jsonl_path=None, prom_path=None):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._jsonl = open(jsonl_path, "a", encoding="utf-8") if jsonl_path else None
+        self._last_prom_write = 0.0
+        self.stages = defaultdict(lambda: {"runs": 0, "errors": 0, "seconds": 0.0})
+        self.llm = defaultdict(
+            lambda: {
+                "calls": 0,
+                "cached": 0,
+                "seconds": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+            }
+        )
+        self.caches = defaultdict(lambda: {"hit": 0, "miss": 0})
+
+    def _log(self, event):
+        event["ts"] = time.time()
+        if self._jsonl is not None:
+            self._jsonl.write(json.dumps(event) + "\n")
+            self._jsonl.flush()
+
+    def _maybe_write_prometheus(self):
+        now = time.monotonic()
+        if self.prom_path and now - self._last_prom_write >= PROM_WRITE_INTERVAL:
+            self._last_prom_write = now
+            self._write_prometheus_locked(self.prom_path)
+
+    def stage_done(self, name, seconds, error, labels):
+        with self._lock:
+            totals = self.stages[name]
+            totals["runs"] += 1
+            totals["errors"] += int(error)
+            totals["seconds"] += seconds
+            self._log(
+                {"type": "stage", "stage": name, "seconds": seconds, "error": error, **labels}
+            )
+            self._maybe_write_prometheus()
+
+    def llm_call(self, agent, model, seconds, prompt_tokens, completion_tokens, cached):
+        cost = 0.0 if cached else estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            totals = self.llm[(agent, model)]
+            totals["calls"] += 1
+            totals["cached"] += int(cached)
+            totals["seconds"] += seconds
+            totals["prompt_tokens"] += prompt_tokens
+            totals["completion_tokens"] += completion_tokens
+            totals["cost_usd"] += cost
+            self._log(
+                {
+                    "type": "llm",
+                    "agent": agent,
+                    "model": model,
+                    "seconds": seconds,
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "cached": cached,
+                    "cost_usd": cost,
+                }
+            )
+            self._maybe_write_prometheus()
+
+    def cache_access(self, name, hit):
+        with self._lock:
+            self.caches[name]["hit" if hit else "miss"] += 1
+            self._log({"type": "cache", "cache": name, "hit": hit})
+
+    def to_prometheus(self):
+        with self._lock:
+            return self._prometheus_locked()
+
+    def _prometheus_locked(self):
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{{{labels}}} {value:g}" for labels, value in samples)
+
+        stages = sorted(self.stages.items())
+        metric(
+            "peerlens_stage_runs_total",
+            "counter",
+            "Completed runs per pipeline stage.",
+            [(_labels(stage=name), t["runs"]) for name, t in stages],
+        )
+        metric(
+            "peerlens_stage_errors_total",
+            "counter",
+            "Runs per pipeline stage that raised.",
+            [(_labels(stage=name), t["errors"]) for name, t in stages],
+        )
+        metric(
+            "peerlens_stage_seconds_total",
+            "counter",
+            "Wall time spent per pipeline stage.",
+            [(_labels(stage=name), t["seconds"]) for name, t in stages],
+        )
+
+        llm = sorted(self.llm.items())
+        for key, kind, help_text in (
+            ("calls", "counter", "LLM calls per agent, including cache hits."),
+            ("cached", "counter", "LLM calls served from the response cache."),
+            ("seconds", "counter", "Total LLM call latency per agent."),
+            ("prompt_tokens", "counter", "Prompt tokens sent per agent (estimated)."),
+            ("completion_tokens", "counter", "Completion tokens received per agent (estimated)."),
+            ("cost_usd", "counter", "Estimated LLM cost per agent in USD."),
+        ):
+            metric(
+                f"peerlens_llm_{key}_total",
+                kind,
+                help_text,
+                [(_labels(agent=a, model=m), t[key]) for (a, m), t in llm],
+            )
+
+        metric(
+            "peerlens_cache_requests_total",
+            "counter",
+            "Cache lookups per cache and result.",
+            [
+                (_labels(cache=name, result=result), count)
+                for name, t in sorted(self.caches.items())
+                for result, count in t.items()
+            ],
+        )
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=None):
+        with self._lock:
+            self._write_prometheus_locked(path or self.prom_path)
+
+    def _write_prometheus_locked(self, path):
+        if not path:
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self._prometheus_locked())
+
+    def summary(self):
+        """Human-readable totals, slowest stages first."""
+        with self._lock:
+            lines = ["⏱️ Stage timings:"]
+            for name, t in sorted(self.stages.items(), key=lambda s: -s[1]["seconds"]):
+                lines.append(f"  {name:<24} {t['seconds']:8.2f}s  ({t['runs']} runs)")
+            for (agent, model), t in sorted(self.llm.items()):
+                lines.append(
+                    f"🤖 {agent} ({model}): {t['calls']} calls, {t['cached']} cached, "
+                    f"{t['seconds']:.1f}s, {t['prompt_tokens']}+{t['completion_tokens']} "
+                    f"tokens, ~${t['cost_usd']:.4f}"
+                )
+            for name, t in sorted(self.caches.items()):
+                total = t["hit"] + t["miss"]
+                lines.append(f"💾 {name} cache: {t['hit']}/{total} hits")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            self._write_prometheus_locked(self.prom_path)
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+
+_metrics = None
+
+
+class _Stage:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        metrics = _metrics
+        if metrics is not None:
+            seconds = time.perf_counter() - self.start
+            metrics.stage_done(self.name, seconds, exc_type is not None, self.labels)
+        return False
+
+
+def enabled():
+    return _metrics is not None
+
+
+def enable(jsonl_path=METRICS_JSONL, prom_path=METRICS_PROM):
+    """Starts recording; paths may be None to skip that export."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(jsonl_path, prom_path)
+        atexit.register(_metrics.close)
+    return _metrics
+
+
+def get_metrics():
+    return _metrics
+
+
+def stage(name, **labels):
+    """Times a pipeline stage: ``with stage("pdf_extract", backend="fitz"): ...``."""
+    if _metrics is None:
+        return _NULL_STAGE
+    return _Stage(name, labels)
+
+
+def record_llm_call(agent, message, reply, seconds, cached):
+    """Records one agent call; tokens are counted from the prompt and reply text."""
+    metrics = _metrics
+    if metrics is None:
+        return
+    from llm_cache import llm_fingerprint
+    from tokens import count_tokens
+
+    model, _ = llm_fingerprint(getattr(agent, "llm_config", None))
+    model = model or "unknown"
+    counting_model = model if model in MODEL_PRICES else "gpt-4o-mini"
+    prompt = f"{getattr(agent, 'system_message', '')}\n{message}"
+    metrics.llm_call(
+        agent.name,
+        model,
+        seconds,
+        count_tokens(prompt, counting_model),
+        count_tokens(reply or "", counting_model),
+        cached,
+    )
+
+
+def record_cache(name, hit):
+    metrics = _metrics
+    if metrics is not None:
+        metrics.cache_access(name, hit)
+
+
+def print_summary():
+    if _metrics is not None:
+        print(_metrics.summary())
+
+
+if METRICS_ENABLED:
+    enable()
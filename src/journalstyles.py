@@ -1,14 +1,2 @@
-JOURNAL_STYLES = {
-    "Nature": {
-        "tone": "very formal and academic",
-        "focus": "scientific novelty, broad impact, and clarity of communication. you have a clear focus on the natural sciences.",
-    },
-    "NeurIPS": {
-        "tone": "technical and concise",
-        "focus": "experimental rigor, reproducibility, and clarity of claims. You have a clear focus on machine learning and AI.",
-    },
-    "PLoS ONE": {
-        "tone": "neutral and constructive",
-        "focus": "scientific validity regardless of impact or novelty. You have a clear focus on open science and reproducibility.",
-    },
-}
+# Journal styles now live in journals.json; kept for existing imports.
+from config import JOURNAL_STYLES  # noqa: F401
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+
+from config import CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_MODE, LLM_CACHE_TTL
+from disk_cache import DiskCache
+
+# Sampling parameters that change what a model returns for the same prompt.
+SAMPLING_PARAMS = (
+    "temperature",
+    "top_p",
+    "max_tokens",
+    "seed",
+    "frequency_penalty",
+    "presence_penalty",
+    "response_format",
+)
+
+MODES = ("off", "record", "replay")
+
+
+class ReplayCacheMiss(LookupError):
+    """Raised in replay mode when a response was never recorded."""
+
+
+def _config_dict(llm_config):
+    if llm_config is None or llm_config is False:
+        return {}
+    if isinstance(llm_config, dict):
+        return llm_config
+    if hasattr(llm_config, "model_dump"):
+        return llm_config.model_dump(exclude_none=True)
+    return dict(vars(llm_config))
+
+
+def llm_fingerprint(llm_config):
+    """Returns the model name and sampling parameters of an agent's LLM config."""
+    config = _config_dict(llm_config)
+    entries = config.get("config_list") or [{}]
+    entry = _config_dict(entries[0])
+    params = {}
+    for name in SAMPLING_PARAMS:
+        value = entry.get(name, config.get(name))
+        if value is not None:
+            params[name] = value if isinstance(value, (int, float, str)) else repr(value)
+    return entry.get("model", config.get("model")), params
+
+
+def response_key(agent, message):
+    model, params = llm_fingerprint(getattr(agent, "llm_config", None))
+    payload = {
+        "model": model,
+        "system": agent.system_message,
+        "prompt": hashlib.sha256(message.encode("utf-8")).hexdigest(),
+        "params": params,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+class ResponseCache:
+    """
+    Persistent record/replay cache for single-turn agent replies.
+
+    - ``off``: always call the model.
+    - ``record``: serve hits from disk, call the model and store on a miss.
+    - ``replay``: serve hits from disk, raise :class:`ReplayCacheMiss` on a miss.
+    """
+
+    def __init__(self, path, mode="record", ttl=None, max_bytes=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {MODES}")
+        self.mode = mode
+        self._store = DiskCache(path, max_bytes=max_bytes, ttl=ttl)
+
+    def call(self, agent, message, fn):
+        if self.mode == "off":
+            return fn()
+        key = response_key(agent, message)
+        cached = self._store.get(key)
+        if cached is not None:
+            return cached["content"]
+        if self.mode == "replay":
+            raise ReplayCacheMiss(
+                f"No recorded response for {agent.name} (key {key[:12]})"
+            )
+        content = fn()
+        self._store.set(key, {"agent": agent.name, "content": content})
+        return content
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                os.path.join(CACHE_DIR, "llm_responses.sqlite"),
+                mode=LLM_CACHE_MODE,
+                ttl=LLM_CACHE_TTL,
+                max_bytes=LLM_CACHE_MAX_BYTES,
+            )
+        return _response_cache
+
+
+def set_response_cache_mode(mode):
+    """Switches the process-wide cache mode, e.g. to ``replay`` for offline runs."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown LLM cache mode {mode!r}, expected one of {MODES}")
+    get_response_cache().mode = mode
@@ -1,28 +1,85 @@
 # === file: main.py ===
+import argparse
 import os
 from config import AUTOGEN_USE_DOCKER
+from instrumentation import print_summary
 from pdf_utils import structure_output
-from reviewers import get_all_reviewers
+from reviewers import reviewer_lease
 from review_engine import run_reviews, print_reviews
+from revision import run_revision_reviews
 from report import save_reviews_to_pdf
+from review_store import ReviewStore, session_id
 
-# Disable Docker for AutoGen (if not needed)
-os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
+DEFAULT_PDF = "/Users/taramurphy/Downloads/example.pdf"
 
-# === Load PDF ===
-pdf_file = "/Users/taramurphy/Downloads/example.pdf"
-output_folder = "example_extracted"
 
-structured = structure_output(pdf_file, output_folder)
-manuscript_text = structured["text"]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run PeerLens reviews on a manuscript")
+    parser.add_argument("pdf", nargs="?", default=DEFAULT_PDF)
+    parser.add_argument("--journal", default="NeurIPS")
+    parser.add_argument("--output-folder", default="example_extracted")
+    parser.add_argument("--report", default="peer_review_report.pdf")
+    parser.add_argument(
+        "--revision-of",
+        metavar="SESSION",
+        help="Session of the previous revision; only the changes are re-reviewed",
+    )
+    args = parser.parse_args(argv)
 
-# === Select Journal ===
-journal = "NeurIPS"
-reviewers = get_all_reviewers(journal=journal)
+    # Disable Docker for AutoGen (if not needed)
+    os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
 
-# === Run Reviews ===
-responses = run_reviews(reviewers, manuscript_text)
-print_reviews(responses)
+    # === Load PDF ===
+    structured = structure_output(args.pdf, args.output_folder)
+    normalization = structured["metadata"]["normalization"]
+    if normalization:
+        print(
+            f"🧹 Normalized text: {normalization['tokens_saved']} tokens saved "
+            f"per reviewer ({normalization['tokens_before']} -> "
+            f"{normalization['tokens_after']})"
+        )
 
-# === Export to PDF ===s
-save_reviews_to_pdf(responses)
+    # === Select Journal ===
+    store = ReviewStore()
+    journal, previous_text = args.journal, None
+    if args.revision_of:
+        info = store.session_info(args.revision_of)
+        journal = info["journal"]
+        previous_text = store.get_manuscript(info["manuscript_hash"])
+        if previous_text is None:
+            print(f"⚠️ No text stored for {args.revision_of}, reviewing in full.")
+
+    # === Run Reviews ===
+    errors = {}
+    with reviewer_lease(journal=journal, errors=errors) as reviewers:
+        if previous_text is not None:
+            responses = run_revision_reviews(
+                reviewers,
+                structured,
+                previous_text,
+                store.latest_reviews(args.revision_of),
+                errors=errors,
+            )
+        else:
+            responses = run_reviews(reviewers, structured, errors=errors)
+    print_reviews(responses)
+
+    # === Store Reviews ===
+    # Rebuttal rounds read these records directly; the PDF is for humans only.
+    manuscript_hash = structured["metadata"]["content_hash"]
+    session = session_id(manuscript_hash, journal)
+    store.add_manuscript(manuscript_hash, structured["text"])
+    # Failed reviewers are left out, so later rounds fall back to their last good review.
+    reviews = {name: text for name, text in responses.items() if name not in errors}
+    store.add_round(session, 0, journal, manuscript_hash, reviews)
+    print(f"💾 Reviews stored in session {session}")
+    if errors:
+        print(f"⚠️ Not stored (failed): {', '.join(errors)}")
+
+    # === Export to PDF ===
+    save_reviews_to_pdf(responses, output_path=args.report)
+    print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,182 @@
 import argparse
+import asyncio
+import os
+import sys
 from pathlib import Path
 from typing import List, Dict
-import arxiv
+import httpx
 from mcp.server.fastmcp import FastMCP
+from arxiv_cache import ArxivCache, is_valid_pdf
+from config import MCP_HOST, MCP_PORT
+from instrumentation import stage
+from paper_index import BM25Index
+from pdf_utils import extract_text_from_pdf
 
 # Initialize the MCP server
 mcp = FastMCP("ArxivServer")
 
-parser = argparse.ArgumentParser(description="arXiv MCP Server")
-parser.add_argument(
-    "--storage-path", required=True, help="Path to store downloaded papers"
-)
-args, unknown = parser.parse_known_args()
+# Set by configure(). Nothing is opened at import time: PDF extraction
+# workers may import this module again (see pdf_utils._POOL_START_METHOD).
+STORAGE_PATH = None
+# Query results and paper metadata are cached alongside the downloaded PDFs.
+cache = None
+# Full-text BM25 index over the downloaded PDFs, for offline related-work search.
+index = None
 
-STORAGE_PATH = Path(args.storage_path).resolve()
-STORAGE_PATH.mkdir(parents=True, exist_ok=True)
+# Maximum number of PDFs downloaded at the same time.
+MAX_CONCURRENT_DOWNLOADS = 4
+
+# In-flight fetches keyed by "info:<id>" / "pdf:<id>". Concurrent requests for
+# the same paper await the same task instead of hitting arXiv again.
+_inflight: Dict[str, asyncio.Future] = {}
+_http_client = None
+
+
+def configure(storage_path):
+    """Opens the paper store, caches and index under ``storage_path``."""
+    global STORAGE_PATH, cache, index
+    STORAGE_PATH = Path(storage_path).resolve()
+    STORAGE_PATH.mkdir(parents=True, exist_ok=True)
+    cache = ArxivCache(STORAGE_PATH / "arxiv_cache.sqlite")
+    index = BM25Index(STORAGE_PATH / "bm25_index.sqlite")
+    # Picks up PDFs added or removed while the server was not running. Papers
+    # downloaded by the server are indexed as they are written (_index_paper),
+    # so searches never extract PDFs.
+    with stage("mcp.index_sync"):
+        index.sync_directory(STORAGE_PATH, extract_text_from_pdf)
+
+
+def _get_http_client():
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=60,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_DOWNLOADS),
+        )
+    return _http_client
+
+
+def _track(key, awaitable):
+    future = asyncio.ensure_future(awaitable)
+    _inflight[key] = future
+    future.add_done_callback(lambda _: _inflight.pop(key, None))
+    return future
+
+
+async def _fetch_info(arxiv_ids):
+    """Returns ``{id: metadata or None}``, fetching all unknown IDs in one query."""
+    arxiv_ids = list(dict.fromkeys(arxiv_ids))
+    new = [arxiv_id for arxiv_id in arxiv_ids if f"info:{arxiv_id}" not in _inflight]
+    if new:
+        batch = asyncio.ensure_future(asyncio.to_thread(cache.get_papers, new))
+
+        async def pick(arxiv_id):
+            return (await batch)[arxiv_id]
+
+        for arxiv_id in new:
+            _track(f"info:{arxiv_id}", pick(arxiv_id))
+
+    futures = [_inflight[f"info:{arxiv_id}"] for arxiv_id in arxiv_ids]
+    results = await asyncio.gather(*(asyncio.shield(f) for f in futures))
+    return dict(zip(arxiv_ids, results))
+
+
+async def _download_one(arxiv_id, paper):
+    file_path = STORAGE_PATH / f"{arxiv_id}.pdf"
+    # Pooled servers share the storage path; each writes its own partial file.
+    tmp_path = Path(f"{file_path}.{os.getpid()}.part")
+    response = await _get_http_client().get(paper["pdf_url"])
+    response.raise_for_status()
+    await asyncio.to_thread(tmp_path.write_bytes, response.content)
+    os.replace(tmp_path, file_path)
+    await asyncio.to_thread(_index_paper, arxiv_id, file_path)
+    return f"Downloaded {arxiv_id} to {file_path.name}"
+
+
+def _index_paper(arxiv_id, file_path):
+    try:
+        text = extract_text_from_pdf(file_path)
+    except Exception as exc:
+        # stdout is the JSON-RPC channel in stdio mode.
+        print(f"⚠️ Could not index {file_path.name}: {exc}", file=sys.stderr)
+        return
+    index.add(arxiv_id, text, mtime=file_path.stat().st_mtime)
+
+
+async def _download(arxiv_ids):
+    """Downloads several papers concurrently; returns ``{id: status message}``."""
+    arxiv_ids = list(dict.fromkeys(arxiv_ids))
+    messages = {}
+    for arxiv_id in arxiv_ids:
+        file_path = STORAGE_PATH / f"{arxiv_id}.pdf"
+        if f"pdf:{arxiv_id}" not in _inflight and is_valid_pdf(file_path):
+            messages[arxiv_id] = f"Already downloaded {arxiv_id} to {file_path.name}"
+            if arxiv_id not in index:  # copied in after the startup sync
+                await asyncio.to_thread(_index_paper, arxiv_id, file_path)
+
+    # Capture in-flight downloads now: they may finish (and leave _inflight)
+    # while this request is awaiting metadata below.
+    downloads = {}
+    for arxiv_id in arxiv_ids:
+        if arxiv_id not in messages and f"pdf:{arxiv_id}" in _inflight:
+            downloads[arxiv_id] = _inflight[f"pdf:{arxiv_id}"]
+
+    new = [a for a in arxiv_ids if a not in messages and a not in downloads]
+    papers = await _fetch_info(new) if new else {}
+    for arxiv_id in new:
+        if f"pdf:{arxiv_id}" in _inflight:
+            # Another request started it while we were fetching metadata.
+            downloads[arxiv_id] = _inflight[f"pdf:{arxiv_id}"]
+        elif papers[arxiv_id] is None:
+            messages[arxiv_id] = f"Paper {arxiv_id} not found"
+        else:
+            downloads[arxiv_id] = _track(
+                f"pdf:{arxiv_id}", _download_one(arxiv_id, papers[arxiv_id])
+            )
+
+    pending = list(downloads)
+    results = await asyncio.gather(
+        *(asyncio.shield(downloads[arxiv_id]) for arxiv_id in pending),
+        return_exceptions=True,
+    )
+    for arxiv_id, result in zip(pending, results):
+        if isinstance(result, Exception):
+            result = f"Failed to download {arxiv_id}: {result}"
+        messages[arxiv_id] = result
+    return {arxiv_id: messages[arxiv_id] for arxiv_id in arxiv_ids}
+
+
+def _format_info(arxiv_id, paper):
+    if paper is None:
+        return {"error": f"Paper {arxiv_id} not found"}
+    return {
+        "title": paper["title"],
+        "abstract": paper["abstract"],
+        "authors": ", ".join(paper["authors"]),
+        "published": paper["published"] or "",
+    }
 
 
 @mcp.tool()
-def search_arxiv(query: str, max_results: int = 3) -> List[str]:
+async def search_arxiv(query: str, max_results: int = 3) -> List[str]:
     """Search arXiv and return IDs of top papers."""
-    results = arxiv.Search(query=query, max_results=max_results)
-    return [result.entry_id.split("/")[-1] for result in results.results()]
+    with stage("mcp.search_arxiv"):
+        return await asyncio.to_thread(cache.search, query, max_results)
 
 
 @mcp.tool()
-def download_paper(arxiv_id: str) -> str:
+async def download_paper(arxiv_id: str) -> str:
     """Download paper from arXiv and store it."""
-    search = arxiv.Search(id_list=[arxiv_id])
-    paper = next(search.results(), None)
-    if paper:
-        file_path = STORAGE_PATH / f"{arxiv_id}.pdf"
-        paper.download_pdf(dirpath=STORAGE_PATH, filename=file_path.name)
-        return f"Downloaded {arxiv_id} to {file_path.name}"
-    else:
-        return f"Paper {arxiv_id} not found"
+    with stage("mcp.download_paper"):
+        return (await _download([arxiv_id]))[arxiv_id]
+
+
+@mcp.tool()
+async def download_papers(arxiv_ids: List[str]) -> Dict[str, str]:
+    """Download several papers from arXiv concurrently and store them."""
+    with stage("mcp.download_papers", papers=len(arxiv_ids)):
+        return await _download(arxiv_ids)
 
 
 @mcp.tool()
@@ -44,20 +186,67 @@ def list_papers() -> List[str]:
 
 
 @mcp.tool()
-def get_paper_info(arxiv_id: str) -> Dict[str, str]:
+async def search_local_papers(query: str, k: int = 5) -> List[Dict[str, str]]:
+    """Full-text search over already downloaded papers (offline, BM25 ranked)."""
+    with stage("mcp.search_local_papers"):
+        hits = await asyncio.to_thread(index.search, query, k)
+    results = []
+    for arxiv_id, score in hits:
+        paper = await asyncio.to_thread(cache.lookup, arxiv_id)
+        results.append(
+            {
+                "arxiv_id": arxiv_id,
+                "title": paper["title"] if paper else "",
+                "score": f"{score:.3f}",
+            }
+        )
+    return results
+
+
+@mcp.tool()
+async def find_overlapping_papers(
+    manuscript_text: str, threshold: float = 0.3, top_k: int = 3
+) -> List[Dict[str, str]]:
+    """Flag manuscript paragraphs that overlap with abstracts of known arXiv papers."""
+
+    def score():
+        from novelty import EmbeddingStore  # NumPy is only needed for this tool
+
+        store = EmbeddingStore.sync_from_arxiv_cache(STORAGE_PATH / "embeddings", cache)
+        return store.find_overlaps(manuscript_text, threshold=threshold, top_k=top_k)
+
+    with stage("mcp.find_overlapping_papers"):
+        hits = await asyncio.to_thread(score)
+    return [{key: str(value) for key, value in hit.items()} for hit in hits]
+
+
+@mcp.tool()
+async def get_paper_info(arxiv_id: str) -> Dict[str, str]:
     """Extract and return title and abstract of a paper from arXiv."""
-    search = arxiv.Search(id_list=[arxiv_id])
-    paper = next(search.results(), None)
-    if paper:
-        return {"title": paper.title, "abstract": paper.summary}
-    else:
-        return {"error": f"Paper {arxiv_id} not found"}
+    with stage("mcp.get_paper_info"):
+        papers = await _fetch_info([arxiv_id])
+    return _format_info(arxiv_id, papers[arxiv_id])
+
+
+@mcp.tool()
+async def get_papers_info(arxiv_ids: List[str]) -> Dict[str, Dict[str, str]]:
+    """Return title and abstract for several arXiv papers using a single query."""
+    with stage("mcp.get_papers_info", papers=len(arxiv_ids)):
+        papers = await _fetch_info(arxiv_ids)
+    return {arxiv_id: _format_info(arxiv_id, paper) for arxiv_id, paper in papers.items()}
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="arXiv MCP Server")
     parser.add_argument("transport", choices=["stdio", "sse"], help="Transport mode")
     parser.add_argument("--storage-path", required=True, help="Path to store papers")
+    parser.add_argument("--host", default=MCP_HOST, help="SSE host")
+    parser.add_argument("--port", type=int, default=MCP_PORT, help="SSE port")
     args = parser.parse_args()
+    configure(args.storage_path)
 
+    # Over SSE one server (and its download coalescing and caches) can be
+    # shared by many clients, e.g. MCPSessionPool(url="http://host:port/sse").
+    mcp.settings.host = args.host
+    mcp.settings.port = args.port
     mcp.run(transport=args.transport)
@@ -0,0 +1,230 @@
+"""
+Pool of warm MCP client sessions for the arXiv server (mcp_arxiv.py).
+
+Starting ``mcp_arxiv.py`` and running the MCP handshake and ``create_toolkit``
+costs seconds, so the pool does it once per server and hands the open
+session and its toolkit to one query at a time:
+
+    async with MCPSessionPool(size=2) as pool:
+        async with pool.lease() as (session, toolkit):
+            toolkit.register_for_llm(agent)
+            ...
+
+Each server is owned by its own task (the MCP transports must be closed by
+the task that opened them). A server that crashed is noticed by a ping when
+it is leased, when a query fails or, while it sits idle, every
+HEALTH_CHECK_INTERVAL seconds, and the owning task restarts it. With
+``url`` set, the sessions connect to one shared server over SSE instead of
+spawning ``stdio`` subprocesses.
+"""
+
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from config import MCP_POOL_SIZE, MCP_SERVER_URL, MCP_STORAGE_PATH
+
+MCP_SERVER_PATH = Path(__file__).resolve().parent / "mcp_arxiv.py"
+# Seconds to wait for a ping before treating a server as dead.
+PING_TIMEOUT = 5.0
+# Seconds between pings of a running server, so one that dies while idle is
+# restarted before the next query needs it.
+HEALTH_CHECK_INTERVAL = 30.0
+# Seconds to wait before starting a server again after it failed.
+RESTART_BACKOFF = 1.0
+# A server that fails this many times in a row without starting is given up.
+# Crashes of a server that had started do not count.
+MAX_START_FAILURES = 3
+
+
+class MCPServerCrashed(Exception):
+    """The MCP server stopped responding while a query was using it."""
+
+
+class NoMCPServer(RuntimeError):
+    """Every server in the pool has failed to start."""
+
+
+class _Server:
+    def __init__(self, index):
+        self.index = index
+        self.session = None
+        self.toolkit = None
+        self.restart = asyncio.Event()
+        # Bumped on every (re)start, so queue entries from before a restart
+        # are recognised as stale and the server is never handed out twice.
+        self.generation = 0
+        self.failures = 0
+        self.failed = False
+
+
+class MCPSessionPool:
+    """
+    ``size`` MCP sessions with their toolkits, kept open until :meth:`close`.
+    :meth:`lease` hands out one session at a time; :meth:`run_all` runs many
+    queries concurrently over the pool.
+    """
+
+    def __init__(
+        self, size=MCP_POOL_SIZE, storage_path=MCP_STORAGE_PATH, url=MCP_SERVER_URL
+    ):
+        self.size = size
+        self.storage_path = storage_path
+        self.url = url
+        self.servers = [_Server(i) for i in range(size)]
+        self._idle = None
+        self._tasks = []
+        self._closing = False
+
+    def _connect(self):
+        if self.url:
+            from mcp.client.sse import sse_client
+
+            return sse_client(self.url)
+
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        args = [str(MCP_SERVER_PATH), "stdio", "--storage-path", str(self.storage_path)]
+        return stdio_client(StdioServerParameters(command=sys.executable, args=args))
+
+    async def _keep_open(self, server):
+        """Opens ``server`` and reopens it whenever a restart is requested."""
+        from autogen.mcp import create_toolkit
+        from mcp import ClientSession
+
+        while not self._closing:
+            # Cleared before opening, so a close() during startup is not lost.
+            server.restart.clear()
+            started = False
+            try:
+                async with self._connect() as (read, write), ClientSession(
+                    read, write
+                ) as session:
+                    await session.initialize()
+                    server.toolkit = await create_toolkit(session=session)
+                    server.session = session
+                    server.generation += 1
+                    server.failures = 0
+                    started = True
+                    self._idle.put_nowait((server, server.generation))
+                    await self._watch(server)
+            except Exception as exc:
+                print(f"⚠️ MCP server {server.index} failed: {exc}")
+                # A server that crashed after starting is restarted right away.
+                if not started:
+                    server.failures += 1
+                    if server.failures >= MAX_START_FAILURES:
+                        server.failed = True
+                        # Wake a waiting lease so it can notice if every server is gone.
+                        self._idle.put_nowait((server, None))
+                        return
+                    await asyncio.sleep(RESTART_BACKOFF)
+            finally:
+                server.session = server.toolkit = None
+            if not self._closing:
+                print(f"🔄 Restarting MCP server {server.index}")
+
+    async def _watch(self, server):
+        """Returns when a restart is requested or ``server`` stops answering pings."""
+        while True:
+            try:
+                await asyncio.wait_for(server.restart.wait(), HEALTH_CHECK_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            if not await self._alive(server):
+                print(f"⚠️ MCP server {server.index} stopped responding while idle")
+                server.restart.set()  # its queue entry is now stale
+                return
+
+    async def start(self):
+        self._idle = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._keep_open(server)) for server in self.servers
+        ]
+
+    async def close(self):
+        self._closing = True
+        for server in self.servers:
+            server.restart.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _alive(self, server):
+        try:
+            await asyncio.wait_for(server.session.send_ping(), PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def _acquire(self):
+        while True:
+            server, generation = await self._idle.get()
+            if server.failed:
+                if all(other.failed for other in self.servers):
+                    self._idle.put_nowait((server, generation))  # wake other waiters
+                    raise NoMCPServer("No MCP server could be started")
+                continue
+            if generation != server.generation or server.session is None:
+                continue  # stale entry; the server is requeued once restarted
+            if await self._alive(server):
+                return server, generation
+            server.restart.set()
+
+    def _release(self, server, generation):
+        if generation == server.generation and not server.restart.is_set():
+            self._idle.put_nowait((server, generation))
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Yields ``(session, toolkit)`` of a live server for exclusive use.
+        Raises :class:`MCPServerCrashed` if the body fails and the server no
+        longer answers pings; the server is then restarted.
+        """
+        server, generation = await self._acquire()
+        try:
+            yield server.session, server.toolkit
+        except Exception as exc:
+            if not await self._alive(server):
+                server.restart.set()
+                raise MCPServerCrashed(
+                    f"MCP server {server.index} stopped responding"
+                ) from exc
+            raise
+        finally:
+            self._release(server, generation)
+
+    async def run_all(self, fn, items, retries=1):
+        """
+        Runs ``await fn(session, toolkit, item)`` for every item, at most one
+        per server at a time, and returns the results in order. A query whose
+        server crashed is retried up to ``retries`` times on a live server;
+        other errors are returned in place of its result. Raises
+        :class:`NoMCPServer` (a ``RuntimeError``) once every server has failed.
+        """
+
+        async def run(item):
+            for attempt in range(retries + 1):
+                try:
+                    async with self.lease() as (session, toolkit):
+                        return await fn(session, toolkit, item)
+                except MCPServerCrashed as exc:
+                    if attempt == retries:
+                        print(f"⚠️ Query {item!r} failed: {exc}")
+                        return exc
+                except NoMCPServer:
+                    raise
+                except Exception as exc:
+                    print(f"⚠️ Query {item!r} failed: {exc}")
+                    return exc
+
+        return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,159 @@
+"""
+Clean-up of extracted manuscript text before it is sent to reviewers.
+
+pdfminer output repeats running headers and footers on every page, keeps
+page numbers, line-number margins of review copies, hyphenation splits,
+ligature glyphs and long whitespace runs. All of it is paid for once per
+reviewer. :func:`normalize_text` removes it while keeping the form feeds
+between pages, so section and page indexing still work.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+
+from tokens import count_tokens
+
+# Lines within this many non-empty lines of a page's top or bottom are
+# candidates for running headers and footers.
+EDGE_LINES = 3
+# Bare numbers are only taken for page numbers on a page's first or last
+# non-empty line; elsewhere they are list items or table cells.
+PAGE_NUMBER_EDGE_LINES = 1
+# A line is a running header/footer if it appears (digits ignored) on at
+# least this share of pages, and on at least MIN_REPEATED_PAGES pages.
+REPEATED_LINE_RATIO = 0.5
+MIN_REPEATED_PAGES = 3
+# A page has a line-number margin if at least this many of its lines carry
+# consecutive leading numbers.
+MIN_NUMBERED_LINES = 10
+
+_INVISIBLE_RE = re.compile("[\u00ad\u200b\u200c\u200d\u2060\ufeff]")
+_CID_RE = re.compile(r"\(cid:\d+\)")
+_PAGE_NUMBER_RE = re.compile(
+    r"^\s*(?:page\s+)?[-–]?\s*\d{1,4}\s*[-–]?(?:\s*(?:of|/)\s*\d{1,4})?\s*$", re.IGNORECASE
+)
+_LINE_NUMBER_RE = re.compile(r"^\s*(\d{1,4})(?:\s+(.*))?$")
+_HYPHEN_BREAK_RE = re.compile(r"([A-Za-z]{2,})-\n[ \t]*([a-z]{2,})(-?)")
+_WORD_RE = re.compile(r"[a-z]+(?:-[a-z]+)*")
+# Left parts that usually start a hyphenated compound ("self-\nsupervised").
+COMPOUND_PREFIXES = frozenset(
+    "all cross data end fine half high large long low non one quasi real self "
+    "semi short small state task three two well".split()
+)
+_SPACES_RE = re.compile(r"[ \t]+")  # NFKC has already mapped other spaces to " "
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _edge_indices(lines, count=EDGE_LINES):
+    """Indices of the first and last ``count`` non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:count] + filled[-count:])
+
+
+def _line_key(line):
+    # Running headers often carry the page number: "Smith et al. | 12".
+    return re.sub(r"\d+", "#", " ".join(line.split()).lower())
+
+
+def _strip_line_numbers(lines):
+    """
+    Removes a review-copy line-number margin: leading numbers that increase
+    by one from line to line, or runs of lines holding only such numbers.
+    """
+    numbered = []
+    for i, line in enumerate(lines):
+        match = _LINE_NUMBER_RE.match(line)
+        if match:
+            numbered.append((i, int(match.group(1))))
+    consecutive = set()
+    for (i, n), (j, m) in zip(numbered, numbered[1:]):
+        if m == n + 1:
+            consecutive.update((i, j))
+    if len(consecutive) < MIN_NUMBERED_LINES:
+        return lines, 0
+    cleaned = []
+    for i, line in enumerate(lines):
+        if i in consecutive:
+            rest = _LINE_NUMBER_RE.match(line).group(2)
+            if rest:
+                cleaned.append(rest)
+            continue
+        cleaned.append(line)
+    return cleaned, len(consecutive)
+
+
+def _join_hyphen_breaks(text):
+    """
+    Rejoins words split across lines by hyphenation. The hyphen is kept when
+    the word is a compound: it continues with another hyphen
+    ("state-\nof-the-art"), the manuscript spells it with a hyphen elsewhere
+    and never without, or the left part is in ``COMPOUND_PREFIXES``.
+    """
+    words = set(_WORD_RE.findall(text.lower()))
+
+    def join(match):
+        left, right, continues = match.groups()
+        left_lower = left.lower()
+        if continues:
+            keep = True
+        elif left_lower + right in words:
+            keep = False
+        else:
+            keep = f"{left_lower}-{right}" in words or left_lower in COMPOUND_PREFIXES
+        return f"{left}{'-' if keep else ''}{right}{continues}"
+
+    return _HYPHEN_BREAK_RE.sub(join, text)
+
+
+def normalize_text(text):
+    """
+    Returns ``(normalized_text, stats)``.
+
+    ``stats`` counts the lines removed by kind and the characters and tokens
+    before and after.
+    """
+    stats = {"header_footer_lines": 0, "page_number_lines": 0, "line_number_lines": 0}
+    cleaned = unicodedata.normalize("NFKC", text)  # ligatures: "ﬁ" -> "fi"
+    cleaned = _CID_RE.sub("", _INVISIBLE_RE.sub("", cleaned))
+
+    pages = [page.split("\n") for page in cleaned.split("\f")]
+    edges = [_edge_indices(lines) for lines in pages]
+    page_edges = [_edge_indices(lines, PAGE_NUMBER_EDGE_LINES) for lines in pages]
+
+    key_pages = Counter()
+    for lines, edge in zip(pages, edges):
+        # Bare numbers all share one key; only PAGE_NUMBER_EDGE_LINES may drop them.
+        key_pages.update(
+            {_line_key(lines[i]) for i in edge if not _PAGE_NUMBER_RE.match(lines[i])}
+        )
+    threshold = max(MIN_REPEATED_PAGES, REPEATED_LINE_RATIO * len(pages))
+    repeated = {key for key, count in key_pages.items() if count >= threshold}
+
+    result_pages = []
+    for lines, edge, page_edge in zip(pages, edges, page_edges):
+        kept = []
+        for i, line in enumerate(lines):
+            if i in page_edge and _PAGE_NUMBER_RE.match(line):
+                stats["page_number_lines"] += 1
+            elif i in edge and _line_key(line) in repeated:
+                stats["header_footer_lines"] += 1
+            else:
+                kept.append(line)
+        kept, removed = _strip_line_numbers(kept)
+        stats["line_number_lines"] += removed
+        result_pages.append("\n".join(kept))
+    cleaned = "\f".join(result_pages)
+
+    cleaned = _join_hyphen_breaks(cleaned)
+    cleaned = _SPACES_RE.sub(" ", cleaned)
+    # strip(" ") rather than strip(): the form feeds between pages must stay.
+    cleaned = "\n".join(line.strip(" ") for line in cleaned.split("\n"))
+    cleaned = _BLANK_LINES_RE.sub("\n\n", cleaned)
+
+    stats["chars_before"] = len(text)
+    stats["chars_after"] = len(cleaned)
+    stats["tokens_before"] = count_tokens(text)
+    stats["tokens_after"] = count_tokens(cleaned)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    return cleaned, stats
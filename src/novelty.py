@@ -0,0 +1,238 @@
+"""
+Overlap scoring between a manuscript and stored prior work.
+
+Manuscript paragraphs and stored abstracts are embedded as hashed TF-IDF
+vectors (no vocabulary or model download needed). The abstract embeddings
+live in a memory-mapped ``.npy`` matrix on disk, and all paragraph × paper
+cosine similarities are computed with batched matrix products.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from paper_index import tokenize
+from sections import index_sections, select_sections
+
+DEFAULT_DIM = 2048
+# New papers are embedded with the stored IDF weights; once the store has
+# grown by this factor since they were computed, it is rebuilt from scratch.
+IDF_REFRESH_GROWTH = 2.0
+# Paragraphs shorter than this many words (headings, captions) are ignored.
+MIN_PARAGRAPH_WORDS = 30
+
+# Serialises sync_from_arxiv_cache within a process (service and MCP threads).
+_sync_lock = threading.Lock()
+
+
+def _hash_counts(texts, dim):
+    """Term counts per text, with each term hashed into one of ``dim`` buckets."""
+    counts = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        buckets = [zlib.crc32(token.encode("utf-8")) % dim for token in tokenize(text)]
+        if buckets:
+            np.add.at(counts[row], buckets, 1.0)
+    return counts
+
+
+def _weight(counts, idf):
+    vectors = np.log1p(counts) * idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _replace_file(path, write):
+    """Calls ``write(tmp_path)`` and moves the result over ``path`` atomically."""
+    # A unique name, so concurrent writers never share a temporary file.
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{path.stem}.", suffix=f".tmp{path.suffix}", dir=path.parent
+    )
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_json(path, data):
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+
+    _replace_file(path, write)
+
+
+def _write_vectors(path, blocks, shape):
+    """Writes the row ``blocks`` to a new memory-mapped ``.npy`` matrix at ``path``."""
+
+    def write(tmp_path):
+        vectors = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=shape
+        )
+        row = 0
+        for block in blocks:
+            vectors[row : row + len(block)] = block
+            row += len(block)
+        vectors.flush()
+        del vectors
+
+    _replace_file(path, write)
+
+
+def split_paragraphs(text, min_words=MIN_PARAGRAPH_WORDS):
+    """Splits a manuscript into paragraphs, leaving out the reference list."""
+    body = select_sections(text, index_sections(text))
+    paragraphs = [" ".join(p.split()) for p in body.replace("\f", "\n\n").split("\n\n")]
+    return [p for p in paragraphs if len(p.split()) >= min_words]
+
+
+class EmbeddingStore:
+    """
+    Hashed TF-IDF embeddings of stored abstracts, persisted in ``directory``:
+
+    - ``vectors.npy``: L2-normalised ``(n_papers, dim)`` float32 matrix (memory-mapped)
+    - ``idf.npy``: IDF weights, reused to embed manuscript paragraphs
+    - ``papers.json``: paper IDs and titles, in matrix row order
+    - ``meta.json``: how many papers the IDF weights were computed from
+
+    Every file is written to a temporary path and moved into place, so a
+    reader never maps a half-written matrix.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.idf = np.load(self.directory / "idf.npy")
+        with open(self.directory / "papers.json") as f:
+            self.papers = json.load(f)
+        meta_path = self.directory / "meta.json"
+        if meta_path.exists():
+            with open(meta_path) as f:
+                self.idf_papers = json.load(f)["idf_papers"]
+        else:
+            self.idf_papers = len(self.papers)
+        if self.papers:
+            # papers.json is replaced last, so the matrix may briefly hold
+            # rows for papers this reader does not know about yet.
+            vectors = np.load(self.directory / "vectors.npy", mmap_mode="r")
+            self.vectors = vectors[: len(self.papers)]
+        else:
+            # An empty file cannot be memory-mapped.
+            self.vectors = np.zeros((0, len(self.idf)), dtype=np.float32)
+
+    @classmethod
+    def build(cls, directory, papers, dim=DEFAULT_DIM):
+        """Embeds ``papers`` (dicts with ``id``, ``title``, ``abstract``) and saves the store."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        texts = [f"{paper['title']}\n{paper['abstract']}" for paper in papers]
+        counts = _hash_counts(texts, dim)
+        df = (counts > 0).sum(axis=0)
+        idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+        if papers:
+            _write_vectors(directory / "vectors.npy", [_weight(counts, idf)], counts.shape)
+        _replace_file(directory / "idf.npy", lambda path: np.save(path, idf))
+        _write_json(directory / "meta.json", {"idf_papers": len(papers)})
+        _write_json(
+            directory / "papers.json", [{"id": p["id"], "title": p["title"]} for p in papers]
+        )
+        return cls(directory)
+
+    def append(self, papers, batch_rows=8192):
+        """
+        Embeds ``papers`` with the stored IDF weights and adds them as new
+        rows; the existing rows are copied over, not re-embedded.
+        """
+        texts = [f"{paper['title']}\n{paper['abstract']}" for paper in papers]
+        new_rows = self.embed(texts)
+        old_rows = (
+            self.vectors[start : start + batch_rows]
+            for start in range(0, len(self.papers), batch_rows)
+        )
+        shape = (len(self.papers) + len(papers), self.vectors.shape[1])
+        _write_vectors(self.directory / "vectors.npy", [*old_rows, new_rows], shape)
+        _write_json(
+            self.directory / "papers.json",
+            self.papers + [{"id": p["id"], "title": p["title"]} for p in papers],
+        )
+        return type(self)(self.directory)
+
+    @classmethod
+    def sync_from_arxiv_cache(cls, directory, arxiv_cache, dim=DEFAULT_DIM):
+        """
+        Opens the store, first adding any papers the arXiv cache has gained.
+        It is rebuilt instead if papers were removed or the IDF weights are
+        stale (see ``IDF_REFRESH_GROWTH``).
+
+        Syncs are serialised, so two threads never interleave their writes
+        of the matrix and ``papers.json``.
+        """
+        with _sync_lock:
+            return cls._sync(Path(directory), arxiv_cache, dim)
+
+    @classmethod
+    def _sync(cls, directory, arxiv_cache, dim):
+        papers = arxiv_cache.all_papers()
+        if not (directory / "papers.json").exists():
+            return cls.build(directory, papers, dim=dim)
+
+        store = cls(directory)
+        stored = {p["id"] for p in store.papers}
+        cached = {p["id"] for p in papers}
+        idf_stale = len(cached) > IDF_REFRESH_GROWTH * max(store.idf_papers, 1)
+        if idf_stale or not stored <= cached:
+            return cls.build(directory, papers, dim=dim)
+        new = [p for p in papers if p["id"] not in stored]
+        return store.append(new) if new else store
+
+    def embed(self, texts):
+        return _weight(_hash_counts(texts, self.vectors.shape[1]), self.idf)
+
+    def find_overlaps(self, manuscript_text, threshold=0.3, top_k=3, batch_rows=8192):
+        """
+        Returns the stored papers most similar to each manuscript paragraph.
+
+        Each hit is a dict with the paragraph index, a snippet, the paper ID
+        and title and the cosine similarity; only hits at or above
+        ``threshold`` are kept (at most ``top_k`` per paragraph), sorted by
+        similarity.
+        """
+        paragraphs = split_paragraphs(manuscript_text)
+        if not paragraphs or not len(self.papers):
+            return []
+        queries = self.embed(paragraphs)
+
+        # Similarities are computed in row blocks so the memory-mapped matrix
+        # never has to be fully resident.
+        similarities = np.empty((len(paragraphs), len(self.papers)), dtype=np.float32)
+        for start in range(0, len(self.papers), batch_rows):
+            block = self.vectors[start : start + batch_rows]
+            similarities[:, start : start + len(block)] = queries @ block.T
+
+        k = min(top_k, similarities.shape[1])
+        best = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        hits = []
+        for para_index, columns in enumerate(best):
+            for column in columns:
+                score = float(similarities[para_index, column])
+                if score < threshold:
+                    continue
+                paper = self.papers[column]
+                hits.append(
+                    {
+                        "paragraph": para_index,
+                        "snippet": paragraphs[para_index][:200],
+                        "arxiv_id": paper["id"],
+                        "title": paper["title"],
+                        "similarity": round(score, 4),
+                    }
+                )
+        return sorted(hits, key=lambda hit: hit["similarity"], reverse=True)
@@ -0,0 +1,146 @@
+import math
+import re
+import sqlite3
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was we were which with".split()
+)
+
+
+def tokenize(text):
+    return [
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Incrementally maintained BM25 inverted index stored in SQLite.
+
+    Postings are kept on disk, indexed by term, so a query only reads the
+    postings of its own terms. Document lengths and mtimes are read from the
+    database too, so several processes (e.g. pooled MCP servers sharing a
+    storage path) can index into and search the same file.
+    """
+
+    def __init__(self, db_path, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                " id TEXT PRIMARY KEY, length INTEGER NOT NULL, mtime REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                " term TEXT NOT NULL, doc TEXT NOT NULL, tf INTEGER NOT NULL,"
+                " PRIMARY KEY (term, doc)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc)")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def __contains__(self, doc_id):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM docs WHERE id = ?", (doc_id,)).fetchone()
+        return row is not None
+
+    def mtimes(self):
+        """Returns ``{doc_id: mtime}`` of every indexed document."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT id, mtime FROM docs"))
+
+    def add(self, doc_id, text, mtime=None):
+        """Indexes ``text`` under ``doc_id``, replacing any previous version."""
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        with self._lock, self._conn:
+            # Another process may have indexed the same document meanwhile.
+            self._remove_locked(doc_id)
+            self._conn.execute(
+                "INSERT INTO docs (id, length, mtime) VALUES (?, ?, ?)",
+                (doc_id, length, mtime),
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                ((term, doc_id, tf) for term, tf in counts.items()),
+            )
+
+    def remove(self, doc_id):
+        with self._lock, self._conn:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id):
+        self._conn.execute("DELETE FROM postings WHERE doc = ?", (doc_id,))
+        self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def search(self, query, k=10):
+        """Returns the top ``k`` ``(doc_id, score)`` pairs for ``query``."""
+        scores = Counter()
+        with self._lock, self._conn:
+            # One read transaction, so the counts match the postings read below.
+            self._conn.execute("BEGIN")
+            n_docs, total_length = self._conn.execute(
+                "SELECT COUNT(*), SUM(length) FROM docs"
+            ).fetchone()
+            if not n_docs:
+                return []
+            avg_length = total_length / n_docs or 1.0
+            for term in set(tokenize(query)):
+                postings = self._conn.execute(
+                    "SELECT p.doc, p.tf, d.length FROM postings p"
+                    " JOIN docs d ON d.id = p.doc WHERE p.term = ?",
+                    (term,),
+                ).fetchall()
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in postings:
+                    norm = 1 - self.b + self.b * length / avg_length
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return scores.most_common(k)
+
+    def sync_directory(self, directory, extract_text):
+        """
+        Brings the index in line with the ``*.pdf`` files in ``directory``.
+
+        New or modified PDFs (by mtime) are extracted with ``extract_text``
+        and indexed, PDFs that were deleted are dropped. Returns the number of
+        documents (re)indexed.
+        """
+        present = {}
+        for path in Path(directory).glob("*.pdf"):
+            present[path.stem] = path
+
+        indexed = self.mtimes()
+        for doc_id in [d for d in indexed if d not in present]:
+            self.remove(doc_id)
+
+        updated = 0
+        for doc_id, path in present.items():
+            mtime = path.stat().st_mtime
+            if indexed.get(doc_id) == mtime:
+                continue
+            try:
+                text = extract_text(path)
+            except Exception as exc:
+                # Index it as empty so an unreadable PDF is not retried on every sync.
+                print(f"⚠️ Could not index {path.name}: {exc}", file=sys.stderr)
+                text = ""
+            self.add(doc_id, text, mtime=mtime)
+            updated += 1
+        return updated
@@ -1,47 +1,307 @@
 # === file: pdf_utils.py ===
+import hashlib
+import io
+import multiprocessing
 import os
-import fitz  # PyMuPDF
-from pdfminer.high_level import extract_text
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
+from config import (
+    CACHE_DIR,
+    IMAGE_EXTRACTION_ENABLED,
+    IMAGE_MAX_BYTES,
+    IMAGE_MIN_SIZE,
+    IMAGE_TOTAL_BYTES,
+    NORMALIZE_TEXT,
+    PDF_BACKEND,
+    PDF_CACHE_ENABLED,
+    PDF_CACHE_MAX_BYTES,
+    PDF_MIN_PAGES_PER_SHARD,
+    PDF_WORKERS,
+)
+from disk_cache import DiskCache
+from instrumentation import record_cache, stage
+from normalize import normalize_text
+from sections import index_sections
 
-def extract_text_from_pdf(pdf_path):
-    """Extracts text from a PDF using pdfminer.six"""
-    return extract_text(pdf_path)
+# Bump a backend's version when its output changes so stale cache entries are ignored.
+EXTRACTOR_VERSIONS = {"pdfminer": "pdfminer-1", "fitz": "fitz-1"}
+BACKENDS = tuple(EXTRACTOR_VERSIONS)
 
+# fitz (PyMuPDF) and pdfminer are imported inside the functions that use them,
+# so importing this module stays cheap for callers that only hit the cache.
 
-def extract_images_from_pdf(pdf_path, output_folder):
-    """Extracts images using PyMuPDF and saves them."""
-    os.makedirs(output_folder, exist_ok=True)
-    doc = fitz.open(pdf_path)
-    image_paths = []
-
-    for page_number in range(len(doc)):
-        for img_index, img in enumerate(doc[page_number].get_images(full=True)):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            image_ext = base_image["ext"]
-            image_path = os.path.join(
-                output_folder, f"page{page_number+1}_img{img_index+1}.{image_ext}"
+# pdfminer shards run in worker processes. They are never forked from this
+# process, since fork copies locks held by other threads (structure_output may
+# run on worker threads) and can deadlock the child. "forkserver" (Linux,
+# macOS) or "spawn" (Windows) workers import the entry script again as
+# ``__mp_main__``: scripts that extract PDFs must keep their work under
+# ``if __name__ == "__main__":`` and have no other import-time side effects
+# (see main.py, mcp_arxiv.py).
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _POOL_START_METHOD = "forkserver"
+else:
+    _POOL_START_METHOD = "spawn"
+
+_text_cache = None
+_text_cache_lock = threading.Lock()
+
+
+def _get_text_cache():
+    global _text_cache
+    with _text_cache_lock:
+        if _text_cache is None:
+            _text_cache = DiskCache(
+                os.path.join(CACHE_DIR, "pdf_text.sqlite"), max_bytes=PDF_CACHE_MAX_BYTES
             )
-            with open(image_path, "wb") as f:
-                f.write(image_bytes)
-            image_paths.append(image_path)
+        return _text_cache
+
+
+def read_pdf_bytes(pdf):
+    """Returns the raw bytes of a PDF given a path or a file-like object."""
+    if isinstance(pdf, (str, os.PathLike)):
+        with open(pdf, "rb") as f:
+            return f.read()
+    # File-like objects (e.g. Streamlit's UploadedFile) may already have been read.
+    if hasattr(pdf, "getvalue"):
+        return pdf.getvalue()
+    pdf.seek(0)
+    data = pdf.read()
+    pdf.seek(0)
+    return data
+
+
+def pdf_content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_pages_pdfminer(data, page_numbers):
+    from pdfminer.high_level import extract_text
+
+    return extract_text(io.BytesIO(data), page_numbers=page_numbers)
+
+
+def _extract_text_pdfminer(data, workers=PDF_WORKERS):
+    """Runs pdfminer, sharding contiguous page ranges across a process pool."""
+    import fitz  # PyMuPDF
+    from pdfminer.high_level import extract_text
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        page_count = doc.page_count
+
+    shard_count = min(workers or 1, page_count // PDF_MIN_PAGES_PER_SHARD)
+    if shard_count < 2:
+        return extract_text(io.BytesIO(data))
+
+    shard_size = -(-page_count // shard_count)
+    shards = [
+        list(range(start, min(start + shard_size, page_count)))
+        for start in range(0, page_count, shard_size)
+    ]
+    context = multiprocessing.get_context(_POOL_START_METHOD)
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context) as pool:
+        # map() yields in submission order, so pages come back in order.
+        parts = pool.map(_extract_pages_pdfminer, [data] * len(shards), shards)
+        return "".join(parts)
+
+
+def _extract_text_fitz(data):
+    """Fast path using PyMuPDF; pages are separated by form feeds like pdfminer."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return "".join(page.get_text() + "\f" for page in doc)
+
+
+def _extract(pdf, use_cache=PDF_CACHE_ENABLED, backend=PDF_BACKEND, workers=PDF_WORKERS):
+    """Returns ``{"text": ..., "metadata": {...}}``, using the on-disk cache if enabled."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend {backend!r}, expected one of {BACKENDS}")
+
+    data = read_pdf_bytes(pdf)
+    content_hash = pdf_content_hash(data)
+    key = f"{EXTRACTOR_VERSIONS[backend]}:{content_hash}"
+
+    if use_cache:
+        cached = _get_text_cache().get(key)
+        record_cache("pdf_text", cached is not None)
+        if cached is not None:
+            return cached
+
+    with stage("pdf_extract", backend=backend, bytes=len(data)):
+        if backend == "fitz":
+            text = _extract_text_fitz(data)
+        else:
+            text = _extract_text_pdfminer(data, workers=workers)
+    entry = {
+        "text": text,
+        "metadata": {
+            "content_hash": content_hash,
+            "backend": backend,
+            "extractor": EXTRACTOR_VERSIONS[backend],
+            "page_count": text.count("\f") or 1,
+            "char_count": len(text),
+        },
+    }
+    if use_cache:
+        _get_text_cache().set(key, entry)
+    return entry
+
+
+def extract_text_from_pdf(
+    pdf_path, use_cache=PDF_CACHE_ENABLED, backend=PDF_BACKEND, workers=PDF_WORKERS
+):
+    """Extracts text from a PDF (path or file-like) with pdfminer.six or PyMuPDF, with caching."""
+    extracted = _extract(pdf_path, use_cache=use_cache, backend=backend, workers=workers)
+    return extracted["text"]
+
+
+def _open_pdf(pdf):
+    import fitz  # PyMuPDF
+
+    if isinstance(pdf, (str, os.PathLike)):
+        return fitz.open(pdf)
+    return fitz.open(stream=read_pdf_bytes(pdf), filetype="pdf")
+
+
+def _shrink_image(doc, xref, max_bytes):
+    """Re-encodes an image as JPEG, lowering quality then halving its size until it fits."""
+    import fitz  # PyMuPDF
+
+    pix = fitz.Pixmap(doc, xref)
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.colorspace is None or pix.colorspace.n not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+
+    quality = 85
+    data = pix.tobytes("jpeg", jpg_quality=quality)
+    while len(data) > max_bytes:
+        if quality > 40:
+            quality -= 15
+        elif min(pix.width, pix.height) > 64:
+            pix.shrink(1)
+        else:
+            return None
+        data = pix.tobytes("jpeg", jpg_quality=quality)
+    return data
+
+
+def _write_file(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def iter_images_from_pdf(
+    pdf_path,
+    output_folder,
+    min_size=IMAGE_MIN_SIZE,
+    max_image_bytes=IMAGE_MAX_BYTES,
+    max_total_bytes=IMAGE_TOTAL_BYTES,
+):
+    """
+    Extracts unique images using PyMuPDF, yielding each saved path once written.
+
+    Images are deduplicated by xref and by content hash, images whose shorter
+    side is below ``min_size`` pixels are skipped, and images larger than
+    ``max_image_bytes`` are downscaled and recompressed as JPEG. Extraction
+    stops once ``max_total_bytes`` have been written. Files are written on a
+    background thread while the next images are decoded.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    seen_xrefs, seen_hashes = set(), set()
+    total_bytes = 0
+    budget_reached = False
+    writes = deque()
+
+    with _open_pdf(pdf_path) as doc, ThreadPoolExecutor(max_workers=1) as writer:
+        for page_number, page in enumerate(doc):
+            for img in page.get_images(full=True):
+                xref, width, height = img[0], img[2], img[3]
+                if xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
+                if min(width, height) < min_size:
+                    continue
+
+                base_image = doc.extract_image(xref)
+                image_bytes, image_ext = base_image["image"], base_image["ext"]
+                digest = hashlib.sha1(image_bytes).hexdigest()
+                if digest in seen_hashes:
+                    continue
+                seen_hashes.add(digest)
+
+                if max_image_bytes and len(image_bytes) > max_image_bytes:
+                    image_bytes = _shrink_image(doc, xref, max_image_bytes)
+                    image_ext = "jpg"
+                    if image_bytes is None:
+                        continue
+                if max_total_bytes and total_bytes + len(image_bytes) > max_total_bytes:
+                    budget_reached = True
+                    break
+                total_bytes += len(image_bytes)
+
+                image_path = os.path.join(
+                    output_folder, f"page{page_number+1}_{digest[:12]}.{image_ext}"
+                )
+                if os.path.exists(image_path):
+                    # Already written by an earlier run on the same manuscript.
+                    done = Future()
+                    done.set_result(image_path)
+                    writes.append(done)
+                else:
+                    writes.append(writer.submit(_write_file, image_path, image_bytes))
+                while writes and writes[0].done():
+                    yield writes.popleft().result()
+            if budget_reached:
+                break
+
+        while writes:
+            yield writes.popleft().result()
+
+
+def extract_images_from_pdf(pdf_path, output_folder, **kwargs):
+    """Extracts images using PyMuPDF and saves them."""
+    return list(iter_images_from_pdf(pdf_path, output_folder, **kwargs))
 
-    return image_paths
 
+def structure_output(
+    pdf_path,
+    image_output_dir,
+    use_cache=PDF_CACHE_ENABLED,
+    backend=PDF_BACKEND,
+    workers=PDF_WORKERS,
+    extract_images=IMAGE_EXTRACTION_ENABLED,
+    normalize=NORMALIZE_TEXT,
+):
+    """
+    Combines text and images into a structured dictionary for AI processing.
 
-def structure_output(pdf_path, image_output_dir):
-    """Combines text and images into a structured dictionary for AI processing."""
-    text = extract_text_from_pdf(pdf_path)
-    # images = extract_images_from_pdf(pdf_path, image_output_dir)
+    With ``normalize`` the text is cleaned up first (see ``normalize.py``)
+    and ``metadata["normalization"]`` reports what was removed and the
+    tokens saved.
+    """
+    extracted = _extract(pdf_path, use_cache=use_cache, backend=backend, workers=workers)
+    text, normalization = extracted["text"], None
+    if normalize:
+        with stage("normalize"):
+            text, normalization = normalize_text(text)
+    images = []
+    if extract_images:
+        with stage("pdf_images"):
+            images = extract_images_from_pdf(pdf_path, image_output_dir)
 
     structured_data = {
         "text": text,
-        # "images": images,
+        "sections": index_sections(text),
+        "images": images,
         "metadata": {
-            "source_file": str(pdf_path),
+            **extracted["metadata"],
+            "source_file": str(getattr(pdf_path, "name", pdf_path)),
             "image_directory": str(image_output_dir),
+            "normalization": normalization,
         },
     }
     return structured_data
@@ -0,0 +1,277 @@
+"""
+Process-wide rate limiting and retries for LLM calls.
+
+Every agent call goes through one :class:`RateLimiter`, which holds two token
+buckets: requests per minute and (estimated) tokens per minute. A call that
+fails with a 429 or a timeout is retried with exponential backoff. While the
+provider is throttling, every caller waits and the allowed rate is reduced;
+the rate recovers as calls succeed again.
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+from config import LLM_MAX_RETRIES, LLM_RPM, LLM_TPM
+from tokens import count_tokens
+
+# Completion tokens assumed when the agent's config does not set max_tokens.
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a call is still throttled after all retries."""
+
+
+def _status_code(exc):
+    for source in (exc, getattr(exc, "response", None)):
+        for attr in ("status_code", "status", "code"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_throttled(exc):
+    """True for 429 / rate-limit errors from openai, httpx, urllib or autogen."""
+    if _status_code(exc) == 429:
+        return True
+    name = type(exc).__name__.lower()
+    return "ratelimit" in name or "rate limit" in str(exc).lower()
+
+
+def is_timeout(exc):
+    # urllib wraps socket timeouts in URLError(reason=TimeoutError(...)).
+    for error in (exc, getattr(exc, "reason", None), exc.__cause__):
+        if isinstance(error, BaseException) and (
+            isinstance(error, TimeoutError)
+            or any("timeout" in cls.__name__.lower() for cls in type(error).__mro__)
+        ):
+            return True
+    return False
+
+
+def retry_after(exc):
+    """Seconds requested by a ``Retry-After`` header, if the error carries one."""
+    for source in (exc, getattr(exc, "response", None)):
+        headers = getattr(source, "headers", None)
+        if not headers:
+            continue
+        try:
+            return float(headers.get("retry-after") or headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def estimate_tokens(agent, message, model="gpt-4o-mini"):
+    """Prompt tokens (system message + message) plus the expected completion."""
+    from llm_cache import llm_fingerprint
+
+    llm_model, params = llm_fingerprint(getattr(agent, "llm_config", None))
+    prompt = f"{getattr(agent, 'system_message', '')}\n{message}"
+    completion = params.get("max_tokens")
+    if not isinstance(completion, int):
+        completion = DEFAULT_COMPLETION_TOKENS
+    return count_tokens(prompt, llm_model or model) + completion
+
+
+class _Bucket:
+    def __init__(self, per_minute, burst_seconds):
+        self.rate = per_minute / 60.0
+        # Providers enforce limits over windows shorter than a minute, so
+        # only ``burst_seconds`` worth of calls may be sent back to back.
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now, scale):
+        elapsed = now - self.updated
+        self.level = min(self.capacity, self.level + elapsed * self.rate * scale)
+        self.updated = now
+
+    def wait_time(self, amount, scale):
+        """Seconds until ``amount`` is available (0 if it is now)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / (self.rate * scale))
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler shared by all LLM calls in the process.
+
+    ``rpm`` and ``tpm`` are the request and token limits per minute (0 or
+    None disables a limit); at most ``burst_seconds`` worth of either is
+    let through at once. After a throttled call the allowed rate is halved
+    (down to ``min_scale``) and all callers pause for the backoff; every
+    successful call restores 10% of the rate.
+    """
+
+    def __init__(
+        self,
+        rpm=LLM_RPM,
+        tpm=LLM_TPM,
+        max_retries=LLM_MAX_RETRIES,
+        base_backoff=1.0,
+        max_backoff=60.0,
+        min_scale=0.1,
+        burst_seconds=1.0,
+    ):
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_scale = min_scale
+        self._requests = _Bucket(rpm, burst_seconds) if rpm else None
+        self._tokens = _Bucket(tpm, burst_seconds) if tpm else None
+        self._scale = 1.0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiting = 0
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "timeouts": 0,
+            "retries": 0,
+            "total_wait": 0.0,
+            "max_wait": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    def acquire(self, tokens=0):
+        """Blocks until a request of ``tokens`` estimated tokens may be sent."""
+        start = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            self._stats["max_queue_depth"] = max(
+                self._stats["max_queue_depth"], self._waiting
+            )
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._paused_until - now
+                    for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                        if bucket is not None:
+                            bucket.refill(now, self._scale)
+                            delay = max(delay, bucket.wait_time(amount, self._scale))
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                if self._requests is not None:
+                    self._requests.level -= 1
+                if self._tokens is not None:
+                    self._tokens.level -= min(tokens, self._tokens.capacity)
+            finally:
+                self._waiting -= 1
+            waited = time.monotonic() - start
+            self._stats["requests"] += 1
+            self._stats["total_wait"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        return waited
+
+    def _backoff(self, attempt, exc):
+        delay = retry_after(exc)
+        if delay is None:
+            delay = self.base_backoff * 2**attempt * random.uniform(0.5, 1.5)
+        delay = min(delay, self.max_backoff)
+        with self._cond:
+            if is_throttled(exc):
+                self._stats["throttled"] += 1
+                self._scale = max(self.min_scale, self._scale / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            else:
+                self._stats["timeouts"] += 1
+            self._stats["retries"] += 1
+            self._cond.notify_all()
+        return delay
+
+    def _succeeded(self):
+        with self._cond:
+            if self._scale < 1.0:
+                self._scale = min(1.0, self._scale + 0.1)
+                self._cond.notify_all()
+
+    def call(self, fn, tokens=0):
+        """
+        Runs ``fn()`` once the limits allow it, retrying throttled or timed-out
+        calls. Other errors are raised immediately.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as exc:
+                if not (is_throttled(exc) or is_timeout(exc)):
+                    raise
+                if attempt == self.max_retries:
+                    if is_throttled(exc):
+                        raise RateLimitExceeded(
+                            f"Still throttled after {self.max_retries} retries: {exc}"
+                        ) from exc
+                    raise
+                delay = self._backoff(attempt, exc)
+                if not is_throttled(exc):
+                    # Throttling pauses everyone in acquire(); a timeout only
+                    # delays this caller's retry.
+                    time.sleep(delay)
+                continue
+            self._succeeded()
+            return result
+
+    def stats(self):
+        """Queue depth, wait times and retry counts so far."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._waiting
+            stats["rate_scale"] = self._scale
+        requests = stats["requests"]
+        stats["mean_wait"] = stats["total_wait"] / requests if requests else 0.0
+        return stats
+
+    def throttle_agent(self, agent):
+        """
+        Makes an autogen agent wait for the limiter before each reply it
+        generates, for multi-turn chats whose model calls autogen makes itself.
+        In async chats the wait runs in a worker thread, so other chats on the
+        event loop keep going.
+        """
+        from autogen import Agent
+
+        def tokens_for(messages):
+            text = "\n".join(str(m.get("content") or "") for m in messages or [])
+            return estimate_tokens(agent, text)
+
+        def wait_for_slot(recipient, messages=None, sender=None, config=None):
+            # a_generate_reply also runs sync reply functions; leave it to the async one.
+            if not _in_event_loop():
+                self.acquire(tokens_for(messages))
+            return False, None
+
+        async def a_wait_for_slot(recipient, messages=None, sender=None, config=None):
+            await asyncio.to_thread(self.acquire, tokens_for(messages))
+            return False, None
+
+        # Registered last, so they run before the agent's own reply functions.
+        agent.register_reply([Agent, None], wait_for_slot)
+        agent.register_reply([Agent, None], a_wait_for_slot, ignore_async_in_sync_chat=True)
+        return agent
+
+
+def _in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
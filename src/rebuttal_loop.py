@@ -1,43 +1,43 @@
 # === file: rebuttal_loop.py ===
-from pdf_utils import extract_text_from_pdf
-from reviewers import get_all_reviewers
-import re
+# Importing this module has no side effects: PDFs are only read by main().
+import argparse
+import hashlib
+
+from config import REVIEW_MAX_WORKERS, REVIEW_TIMEOUT
+from instrumentation import print_summary, stage
+from review_store import ReviewStore, session_id
+from reviewers import REVIEWER_ROLES, reviewer_lease
+from review_engine import run_agent, run_concurrently
+from segmenter import rebuttal_segments, review_segments
+
 
 # === Step 1: Load Inputs ===
-paper_path = "/Users/taramurphy/Downloads/example.pdf"
-review_path = (
-    "/Users/taramurphy/Documents/2025/code/mcp_tara/src/peer_review_report.pdf"
-)
-rebuttal_path = "/Users/taramurphy/Downloads/example.pdf"
+def load_inputs(paper_path, review_path, rebuttal_path):
+    """
+    Extracts the text of the paper, review report and rebuttal PDFs.
 
-paper_text = extract_text_from_pdf(paper_path)
-review_text = extract_text_from_pdf(review_path)
-rebuttal_text = extract_text_from_pdf(rebuttal_path)
+    ``review_path`` may be None when prior reviews come from the review store.
+    """
+    from pdf_utils import extract_text_from_pdf
+
+    return (
+        extract_text_from_pdf(paper_path),
+        extract_text_from_pdf(review_path) if review_path else None,
+        extract_text_from_pdf(rebuttal_path),
+    )
 
 
 # === Step 2: Identify Rebuttals Per Reviewer ===
 def get_rebuttals_by_reviewer(rebuttal_text, reviewer_names):
-    rebuttals = {}
-    for name in reviewer_names:
-        pattern = rf"{name}.*?(?=\n[A-Z][a-z]+Reviewer|\Z)"
-        match = re.search(pattern, rebuttal_text, re.DOTALL)
-        rebuttals[name] = (
-            match.group(0).strip() if match else "No specific rebuttal found."
-        )
-    return rebuttals
+    segments = rebuttal_segments(rebuttal_text)
+    return {
+        name: segments.find_inline(name, "No specific rebuttal found.")
+        for name in reviewer_names
+    }
 
 
 # === Step 3: Reviewer Re-Evaluation ===
-def run_rebuttal_round(paper_text, review_text, rebuttal_text, reviewers):
-    responses = {}
-    reviewer_names = [agent.name for agent in reviewers]
-    rebuttals = get_rebuttals_by_reviewer(rebuttal_text, reviewer_names)
-
-    for agent in reviewers:
-        original = extract_reviewer_section(agent.name, review_text)
-        rebuttal = rebuttals.get(agent.name, "No rebuttal provided.")
-
-        prompt = f"""
+REBUTTAL_PROMPT = """
 You previously reviewed a manuscript with this feedback:
 
 --- Original Review ---
@@ -54,44 +54,200 @@ Return a revised review with:
 - Remaining Concerns
 - Final Verdict: Accept / Revise / Reject
 """
-        response = agent.run(message=prompt, max_turns=1, user_input=False)
-        response.process()
-        responses[agent.name] = response.messages[-1]["content"]
 
+
+def reviewer_input_hash(original, rebuttal, paper_text):
+    """Hash of everything a reviewer's re-evaluation depends on."""
+    digest = hashlib.sha256()
+    for part in (original, rebuttal, paper_text):
+        digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+def run_rebuttal_round(
+    paper_text,
+    review_text,
+    rebuttal_text,
+    reviewers,
+    max_workers=REVIEW_MAX_WORKERS,
+    timeout=REVIEW_TIMEOUT,
+    store=None,
+    session=None,
+    on_token=None,
+    errors=None,
+):
+    """
+    Asks each reviewer to re-evaluate its review in light of the rebuttal.
+
+    ``review_text`` is either the text of a review report or a
+    ``{reviewer: review}`` dict. With ``store`` and ``session`` set,
+    ``review_text=None`` reads the original (round 0) reviews from the review
+    store, and the new round is written back to it. In that mode a reviewer
+    whose original review, rebuttal section and manuscript are unchanged since
+    the previous round is not re-queried; its previous verdict is carried over.
+
+    ``on_token(reviewer, text)`` receives each reviewer's reply as it streams
+    in (see ``run_agent``); it is called from the worker threads.
+
+    A failed reviewer raises :class:`CallsFailed` unless ``errors`` is a dict,
+    in which case its exception is stored there, and it is left out of the
+    stored round (see ``run_concurrently``).
+    """
+    if review_text is None:
+        if store is None or session is None:
+            raise ValueError("Pass review_text, or a store and session to read it from")
+        review_text = store.original_reviews(session)
+
+    info, previous = None, {}
+    if store is not None and session is not None:
+        info = store.session_info(session)
+        if info["round"] > 0:
+            previous = store.get_round(session, info["round"])
+
+    reviewer_names = [agent.name for agent in reviewers]
+    rebuttals = get_rebuttals_by_reviewer(rebuttal_text, reviewer_names)
+    calls, carried, input_hashes = {}, {}, {}
+
+    for agent in reviewers:
+        if isinstance(review_text, dict):
+            original = review_text.get(agent.name, "No review found.")
+        else:
+            original = extract_reviewer_section(agent.name, review_text)
+        rebuttal = rebuttals.get(agent.name, "No rebuttal provided.")
+
+        input_hash = reviewer_input_hash(original, rebuttal, paper_text)
+        input_hashes[agent.name] = input_hash
+        prior = previous.get(agent.name)
+        if prior is not None and prior["input_hash"] == input_hash:
+            carried[agent.name] = prior["text"]
+            continue
+
+        prompt = REBUTTAL_PROMPT.format(original=original, rebuttal=rebuttal)
+        stream = None
+        if on_token is not None:
+            stream = lambda text, name=agent.name: on_token(name, text)
+        calls[agent.name] = lambda agent=agent, prompt=prompt, stream=stream: run_agent(
+            agent, prompt, on_token=stream
+        )
+
+    if carried:
+        print(f"♻️ Unchanged since last round, not re-queried: {', '.join(carried)}")
+    with stage("rebuttal_round", queried=len(calls), carried=len(carried)):
+        fresh = run_concurrently(
+            calls, max_workers=max_workers, timeout=timeout, errors=errors
+        )
+    responses = {
+        name: carried[name] if name in carried else fresh[name] for name in reviewer_names
+    }
+
+    if info is not None:
+        failed = errors or {}
+        store.add_round(
+            session,
+            info["round"] + 1,
+            info["journal"],
+            info["manuscript_hash"],
+            {name: text for name, text in responses.items() if name not in failed},
+            input_hashes=input_hashes,
+        )
     return responses
 
 
 # === Helper: Extract Individual Review Section ===
 def extract_reviewer_section(reviewer_name, review_text):
-    import re
+    return review_segments(review_text).get(reviewer_name, "No review found.")
+
+
+# === Command Line Entry Point ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run PeerLens rebuttal rounds")
+    parser.add_argument("--paper", required=True, help="Original paper PDF")
+    parser.add_argument("--rebuttal", required=True, help="Rebuttal PDF")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--session", help="Review session stored by main.py")
+    source.add_argument("--review", help="Review report PDF (parsed back into text)")
+    parser.add_argument("--journal", default="NeurIPS")
+    parser.add_argument("--max-rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    paper_text, review_text, rebuttal_text = load_inputs(
+        args.paper, args.review, args.rebuttal
+    )
+    store = ReviewStore()
+    session = args.session
+    if session:
+        journal = store.session_info(session)["journal"]
+    else:
+        # Import the PDF report once as round 0 of a session, so later rounds
+        # can be incremental like sessions created by main.py. The session is
+        # keyed by the file hashes of the paper (as in main.py) and of the
+        # report, so a different report never reuses another one's rounds.
+        from pdf_utils import pdf_content_hash
+
+        journal = args.journal
+        with open(args.paper, "rb") as f:
+            manuscript_hash = pdf_content_hash(f.read())
+        with open(args.review, "rb") as f:
+            review_hash = pdf_content_hash(f.read())
+        session = f"{session_id(manuscript_hash, journal)}-pdf{review_hash[:8]}"
+        if store.latest_round(session) is None:
+            original = {
+                role["name"]: extract_reviewer_section(role["name"], review_text)
+                for role in REVIEWER_ROLES
+            }
+            store.add_manuscript(manuscript_hash, paper_text)
+            store.add_round(session, 0, journal, manuscript_hash, original)
+
+    # Reviewers that failed in any round are not returned to the pool.
+    failed = {}
+    with reviewer_lease(journal=journal, errors=failed) as reviewers:
+        for round_num in range(1, args.max_rounds + 1):
+            print(f"\n===== ROUND {round_num} =====")
+            errors = {}
+            feedback = run_rebuttal_round(
+                paper_text,
+                None,
+                rebuttal_text,
+                reviewers,
+                store=store,
+                session=session,
+                errors=errors,
+            )
+            failed.update(errors)
+
+            # A failed reviewer keeps its last stored verdict and is asked again next round.
+            all_accept = not errors
+            for name, review in feedback.items():
+                if name in errors:
+                    print(f"\n⚠️ {name} failed: {errors[name]}")
+                    continue
+                print(f"\n--- {name} ---\n{review}\n")
+                if "accept" not in review.lower():
+                    all_accept = False
+
+            if all_accept:
+                print(
+                    "\n✅ All reviewers have accepted. The paper is ready for publication!"
+                )
+                break
+            print(
+                "\n🔁 Some reviewers still have concerns. "
+                "Please revise and upload a new rebuttal."
+            )
+            if round_num == args.max_rounds:
+                break
+            answer = input(
+                f"Update {args.rebuttal} (and/or {args.paper}), then press Enter for "
+                "the next round, or type q to stop: "
+            )
+            if answer.strip().lower() == "q":
+                break
+            # Unchanged PDFs come from the extraction cache; only reviewers whose
+            # inputs changed are re-queried.
+            paper_text, _, rebuttal_text = load_inputs(args.paper, None, args.rebuttal)
 
-    pattern = rf"{reviewer_name} Review\n+(.*?)(?=\n\w+Reviewer Review|\Z)"
-    match = re.search(pattern, review_text, re.DOTALL)
-    return match.group(1).strip() if match else "No review found."
+    print_summary()
 
 
-# === Example Usage ===
 if __name__ == "__main__":
-    reviewers = get_all_reviewers(journal="NeurIPS")
-    round_num = 1
-    while True:
-        print(f"\n===== ROUND {round_num} =====")
-        feedback = run_rebuttal_round(paper_text, review_text, rebuttal_text, reviewers)
-
-        all_accept = True
-        for name, review in feedback.items():
-            print(f"\n--- {name} ---\n{review}\n")
-            if "accept" not in review.lower():
-                all_accept = False
-
-        if all_accept:
-            print(
-                "\n✅ All reviewers have accepted. The paper is ready for publication!"
-            )
-            break
-        else:
-            print(
-                "\n🔁 Some reviewers still have concerns. Please revise and upload a new rebuttal."
-            )
-            break  # or allow user input to continue loop
-        round_num += 1
+    main()
@@ -1,36 +1,136 @@
 # === file: rebuttal_ui.py ===
+import hashlib
+import io
+import queue
+import threading
+
 import streamlit as st
+from config import JOURNAL_STYLES
 from pdf_utils import extract_text_from_pdf
-from reviewers import get_all_reviewers
+from reviewers import REVIEWER_ROLES, reviewer_lease
 from rebuttal_loop import run_rebuttal_round
+from review_engine import STREAM_RESTART
 
 st.set_page_config(page_title="PeerLens Rebuttal Loop", layout="wide")
 st.title("📝 PeerLens Rebuttal Loop")
 
+
+# === Cached Helpers ===
+# Streamlit reruns this script on every interaction; extraction and reviewer
+# results are keyed on the uploads' content hashes so reruns reuse them.
+def upload_hash(upload):
+    return hashlib.sha256(upload.getvalue()).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def extract_pdf_text(content_hash, _data):
+    return extract_text_from_pdf(io.BytesIO(_data))
+
+
+def show_review(panel, review):
+    panel.markdown(f"```\n{review}\n```")
+
+
+def stream_rebuttal_round(paper_text, review_text, rebuttal_text, journal, panels):
+    """
+    Runs the reviewers concurrently on a background thread and streams each
+    reply into its panel. Streamlit elements may only be updated from the
+    script thread, so tokens are passed over a queue.
+
+    Returns ``(feedback, errors)``; ``errors`` maps each failed reviewer to
+    its exception, and those reviewers are left out of ``feedback``.
+    """
+    tokens = queue.Queue()
+    outcome = {}
+    errors = {}
+
+    def worker():
+        try:
+            with reviewer_lease(journal=journal, stream=True, errors=errors) as reviewers:
+                outcome["feedback"] = run_rebuttal_round(
+                    paper_text,
+                    review_text,
+                    rebuttal_text,
+                    reviewers,
+                    on_token=lambda name, text: tokens.put((name, text)),
+                    errors=errors,
+                )
+        except Exception as exc:
+            outcome["error"] = exc
+        finally:
+            tokens.put(None)
+
+    threading.Thread(target=worker, daemon=True).start()
+    streamed = {name: "" for name in panels}
+    done = False
+    while not done:
+        # Drain everything queued since the last redraw, then redraw once.
+        updated = set()
+        item = tokens.get()
+        while True:
+            if item is None:
+                done = True
+                break
+            name, text = item
+            # A retried call streams its reply again from the start.
+            streamed[name] = "" if text is STREAM_RESTART else streamed[name] + text
+            updated.add(name)
+            try:
+                item = tokens.get_nowait()
+            except queue.Empty:
+                break
+        for name in updated:
+            show_review(panels[name], streamed[name])
+
+    if "error" in outcome:
+        raise outcome["error"]
+    feedback = {
+        name: review for name, review in outcome["feedback"].items() if name not in errors
+    }
+    return feedback, errors
+
+
 # === Upload Inputs ===
 paper_file = st.file_uploader("Upload Original Paper PDF", type="pdf")
 review_file = st.file_uploader("Upload Review Report PDF", type="pdf")
 rebuttal_file = st.file_uploader("Upload Rebuttal PDF", type="pdf")
-journal = st.selectbox("Select Journal", ["NeurIPS", "Nature", "PLoS ONE"])
+journal = st.selectbox("Select Journal", list(JOURNAL_STYLES))
 
 if paper_file and review_file and rebuttal_file:
     st.success("All files uploaded. Ready to run rebuttal loop.")
 
     # Extract text from each file
+    hashes = [upload_hash(f) for f in (paper_file, review_file, rebuttal_file)]
     with st.spinner("Extracting PDFs..."):
-        paper_text = extract_text_from_pdf(paper_file)
-        review_text = extract_text_from_pdf(review_file)
-        rebuttal_text = extract_text_from_pdf(rebuttal_file)
+        paper_text, review_text, rebuttal_text = (
+            extract_pdf_text(content_hash, f.getvalue())
+            for content_hash, f in zip(hashes, (paper_file, review_file, rebuttal_file))
+        )
 
-    reviewers = get_all_reviewers(journal=journal)
-    st.write("Running rebuttal loop...")
+    panels = {}
+    for role in REVIEWER_ROLES:
+        st.subheader(f"{role['name']} Verdict")
+        panels[role["name"]] = st.empty()
 
-    feedback = run_rebuttal_round(paper_text, review_text, rebuttal_text, reviewers)
+    results = st.session_state.setdefault("rebuttal_results", {})
+    key = (*hashes, journal)
+    errors = {}
+    if key in results:
+        feedback = results[key]
+    else:
+        st.write("Running rebuttal loop...")
+        feedback, errors = stream_rebuttal_round(
+            paper_text, review_text, rebuttal_text, journal, panels
+        )
+        # Only complete rounds are kept, so a rerun retries failed reviewers.
+        if not errors:
+            results[key] = feedback
 
-    all_accept = True
+    all_accept = not errors
+    for name, exc in errors.items():
+        panels[name].error(f"{name} failed: {exc}")
     for name, review in feedback.items():
-        st.subheader(f"{name} Verdict")
-        st.markdown(f"```\n{review}\n```")
+        show_review(panels[name], review)
         if "accept" not in review.lower():
             all_accept = False
 
@@ -38,6 +138,10 @@ if paper_file and review_file and rebuttal_file:
         st.success(
             "🎉 All reviewers have accepted! Your paper is ready for submission."
         )
+    elif errors:
+        st.warning(
+            f"Some reviewers failed ({', '.join(errors)}). Rerun to try them again."
+        )
     else:
         st.warning(
             "Some reviewers still have concerns. Please revise your rebuttal and try again."
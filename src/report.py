@@ -1,10 +1,7 @@
 # === file: report.py ===
-from reportlab.lib.pagesizes import LETTER
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
 from datetime import datetime
 import re
+from instrumentation import stage
 
 
 def strip_markdown(md_text):
@@ -17,6 +14,12 @@ def strip_markdown(md_text):
 
 
 def save_reviews_to_pdf(responses, output_path="peer_review_report.pdf"):
+    # reportlab is only needed here; importing it lazily keeps startup fast.
+    from reportlab.lib.pagesizes import LETTER
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+
     doc = SimpleDocTemplate(output_path, pagesize=LETTER)
     story = []
 
@@ -40,5 +43,6 @@ def save_reviews_to_pdf(responses, output_path="peer_review_report.pdf"):
         story.append(Spacer(1, 0.2 * inch))
 
     # Build PDF
-    doc.build(story)
+    with stage("report_pdf", reviewers=len(responses)):
+        doc.build(story)
     print(f"✅ PDF saved to: {output_path}")
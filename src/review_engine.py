@@ -1,14 +1,340 @@
 # === file: review_engine.py ===
-def run_reviews(reviewers, manuscript_text):
-    review_prompt = f"Please review the following manuscript:\n\n{manuscript_text}"
-    responses = {}
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
-    for agent in reviewers:
-        response = agent.run(message=review_prompt, max_turns=1, user_input=False)
-        response.process()
-        responses[agent.name] = response.messages[-1]["content"]
+from config import (
+    CHUNK_OVERLAP_TOKENS,
+    CHUNK_TOKENS,
+    MAX_PROMPT_TOKENS,
+    REVIEW_MAX_WORKERS,
+    REVIEW_TIMEOUT,
+)
+from instrumentation import record_cache, record_llm_call, stage
+from llm_cache import ReplayCacheMiss, get_response_cache, llm_fingerprint
+from rate_limit import estimate_tokens, get_rate_limiter
+from reviewers import clone_reviewer, release_reviewers
+from sections import index_sections, select_sections
+from tokens import chunk_text, count_tokens
+
+REVIEW_PROMPT = "Please review the following manuscript:\n\n{manuscript}"
+
+CHUNK_PROMPT = (
+    "You are reviewing part {part} of {total} of a long manuscript. "
+    "Write concise notes on this part only: key claims, methodological or "
+    "factual concerns, and minor issues. Do not score it yet.\n\n{chunk}"
+)
+
+REDUCE_PROMPT = (
+    "You reviewed a long manuscript in {total} parts. Your notes on each part "
+    "are below. Merge them into a single review of the whole manuscript, "
+    "removing duplicates, with:\n"
+    "- Summary\n"
+    "- Major Concerns\n"
+    "- Minor Suggestions\n"
+    "- Score (0–10)\n\n{notes}"
+)
+
+
+# Passed to ``on_token`` when a streamed call is retried: the chunks streamed
+# so far belong to the failed attempt and should be discarded.
+STREAM_RESTART = object()
+
+
+def _run_agent_uncached(agent, message, on_token=None):
+    attempts = []
+
+    def call():
+        if on_token is not None and attempts:
+            on_token(STREAM_RESTART)
+        attempts.append(True)
+        response = agent.run(message=message, max_turns=1, user_input=False)
+        if on_token is None:
+            response.process()
+        else:
+            # Stream events are only emitted when the agent's LLM config has stream=True.
+            for event in response.events:
+                if event.type == "stream":
+                    on_token(event.content.content)
+        return response.messages[-1]["content"]
+
+    # Shared RPM/TPM limits and 429/timeout retries (see rate_limit.py).
+    return get_rate_limiter().call(call, tokens=estimate_tokens(agent, message))
+
+
+def with_role(agent, message):
+    """Appends the agent's reviewer role after the (shared) message content."""
+    role_desc = getattr(agent, "role_desc", None)
+    if not role_desc:
+        return message
+    return f"{message}\n\nYou are acting as a {role_desc}."
+
+
+def run_agent(agent, message, on_token=None):
+    """Runs a single-turn chat with one agent and returns its reply text.
+
+    The agent's role is appended to ``message`` (see ``with_role``), and
+    replies go through the persistent response cache (see ``llm_cache``).
+    ``on_token`` is called with each chunk of the reply as it streams in, and
+    with ``STREAM_RESTART`` when the call is retried; a reply that was not
+    streamed (cache hit, non-streaming config) is passed to it whole.
+    """
+    message = with_role(agent, message)
+    streamed, called = [], []
+
+    def forward(text):
+        streamed.append(text)
+        on_token(text)
+
+    def call():
+        called.append(True)
+        return _run_agent_uncached(agent, message, forward if on_token else None)
+
+    start = time.perf_counter()
+    content = get_response_cache().call(agent, message, call)
+    record_cache("llm_responses", not called)
+    record_llm_call(agent, message, content, time.perf_counter() - start, not called)
+    if on_token is not None and not streamed:
+        on_token(content)
+    return content
+
+
+class CallsFailed(Exception):
+    """
+    Raised by :func:`run_concurrently` when calls failed and no ``errors``
+    dict was passed. ``results`` holds the calls that succeeded and
+    ``errors`` the exception of each one that failed.
+    """
+
+    def __init__(self, results, errors):
+        self.results = results
+        self.errors = errors
+        details = "; ".join(f"{name}: {exc}" for name, exc in errors.items())
+        total = len(results) + len(errors)
+        super().__init__(f"{len(errors)} of {total} calls failed: {details}")
+
+
+def run_concurrently(
+    calls, max_workers=REVIEW_MAX_WORKERS, timeout=REVIEW_TIMEOUT, errors=None
+):
+    """
+    Runs ``{name: callable}`` on a bounded thread pool.
+
+    Returns ``{name: result}`` in the same order as ``calls``. A call fails if
+    it raises or runs longer than ``timeout`` seconds (counted from when it
+    starts, not from when it was queued); the other calls still complete.
 
-    return responses
+    Without ``errors``, failures raise :class:`CallsFailed` once every call
+    has finished. If ``errors`` is a dict, the exception for each failed call
+    is stored in it instead, and the result holds an error string in place of
+    the failed call's result (so callers must filter on ``errors`` before
+    storing results). A :class:`ReplayCacheMiss` is always re-raised, since an
+    offline replay cannot continue without the response.
+    """
+    if not calls:
+        return {}
+
+    started = {}
+
+    def timed(name, fn):
+        started[name] = time.monotonic()
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or len(calls))
+    futures = {name: pool.submit(timed, name, fn) for name, fn in calls.items()}
+    timed_out = set()
+    pending = set(futures.values())
+
+    try:
+        while pending:
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                for name, future in futures.items():
+                    if future in pending and name in started and not future.done():
+                        if now - started[name] >= timeout:
+                            timed_out.add(name)
+                            pending.discard(future)
+                deadlines = [
+                    started[name] + timeout - now
+                    for name, future in futures.items()
+                    if future in pending and name in started
+                ]
+                # Queued calls have no deadline yet; poll until one starts.
+                wait_for = max(min(deadlines), 0) if deadlines else 0.05
+            if pending:
+                done, pending = wait(
+                    pending, timeout=wait_for, return_when=FIRST_COMPLETED
+                )
+    finally:
+        # Don't block on calls that overran their deadline.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    results, failed = {}, {}
+    for name, future in futures.items():
+        if name in timed_out:
+            print(f"⚠️ {name} timed out after {timeout}s")
+            results[name] = f"[{name} timed out after {timeout}s]"
+            failed[name] = TimeoutError(f"timed out after {timeout}s")
+            continue
+        try:
+            results[name] = future.result()
+        except ReplayCacheMiss:
+            raise
+        except Exception as exc:
+            print(f"⚠️ {name} failed: {exc}")
+            results[name] = f"[{name} failed: {exc}]"
+            failed[name] = exc
+
+    if errors is None:
+        if failed:
+            succeeded = {name: r for name, r in results.items() if name not in failed}
+            raise CallsFailed(succeeded, failed)
+    else:
+        errors.update(failed)
+    return results
+
+
+def call_with_timeout(fn, timeout=REVIEW_TIMEOUT):
+    """
+    Runs one blocking call and raises TimeoutError if it has not returned
+    after ``timeout`` seconds. The call itself cannot be interrupted and
+    keeps running in the background.
+    """
+    if timeout is None:
+        return fn()
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(fn)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        raise TimeoutError(f"timed out after {timeout}s") from None
+    finally:
+        pool.shutdown(wait=False)
+
+
+def manuscript_for_reviewer(manuscript, agent):
+    """
+    Returns the manuscript text a reviewer should see.
+
+    ``manuscript`` is either plain text or the dict from ``structure_output``.
+    Only the sections listed in the agent's ``review_sections`` are kept, and
+    the reference list is dropped by default.
+    """
+    if isinstance(manuscript, dict):
+        text = manuscript["text"]
+        index = manuscript.get("sections") or index_sections(text)
+    else:
+        text = manuscript
+        index = index_sections(text)
+    return select_sections(text, index, getattr(agent, "review_sections", None))
+
+
+def review_in_chunks(
+    agent,
+    text,
+    chunk_tokens=CHUNK_TOKENS,
+    overlap_tokens=CHUNK_OVERLAP_TOKENS,
+    max_workers=REVIEW_MAX_WORKERS,
+    timeout=REVIEW_TIMEOUT,
+):
+    """
+    Map-reduce review for manuscripts that do not fit in one prompt.
+
+    The text is split into overlapping chunks, each chunk is reviewed by its
+    own copy of ``agent`` concurrently, and ``agent`` then merges the notes
+    into the usual Summary / Major Concerns / Minor Suggestions / Score review.
+    ``timeout`` applies to each LLM call. If any part fails, :class:`CallsFailed`
+    is raised rather than merging incomplete notes into a complete-looking review.
+    """
+    model, _ = llm_fingerprint(getattr(agent, "llm_config", None))
+    chunks = chunk_text(text, chunk_tokens, overlap_tokens, model=model or "gpt-4o-mini")
+
+    def review_part(prompt):
+        clone = clone_reviewer(agent)
+        try:
+            return run_agent(clone, prompt)
+        finally:
+            # Runs once the call has really finished, even if it overran.
+            release_reviewers([clone])
+
+    calls = {}
+    for i, chunk in enumerate(chunks, start=1):
+        prompt = CHUNK_PROMPT.format(part=i, total=len(chunks), chunk=chunk)
+        calls[f"part {i}"] = lambda prompt=prompt: review_part(prompt)
+    # No errors dict: a failed or timed-out part raises CallsFailed.
+    notes = run_concurrently(calls, max_workers=max_workers, timeout=timeout)
+
+    merged = "\n\n".join(f"--- Notes on {part} ---\n{note}" for part, note in notes.items())
+    prompt = REDUCE_PROMPT.format(total=len(chunks), notes=merged)
+    return call_with_timeout(lambda: run_agent(agent, prompt), timeout)
+
+
+def review_manuscript(
+    agent,
+    text,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    chunk_tokens=CHUNK_TOKENS,
+    on_token=None,
+    timeout=REVIEW_TIMEOUT,
+):
+    """
+    Reviews ``text`` in a single call, or in chunks if it exceeds the token
+    budget. ``on_token`` receives the final review as it streams in.
+    ``timeout`` applies to each LLM call, so long manuscripts reviewed in
+    several rounds of calls are not cut off as a whole.
+    """
+    prompt = REVIEW_PROMPT.format(manuscript=text)
+    model, _ = llm_fingerprint(getattr(agent, "llm_config", None))
+    if count_tokens(prompt, model or "gpt-4o-mini") <= max_prompt_tokens:
+        return call_with_timeout(
+            lambda: run_agent(agent, prompt, on_token=on_token), timeout
+        )
+    return review_in_chunks(agent, text, chunk_tokens=chunk_tokens, timeout=timeout)
+
+
+def run_reviews(
+    reviewers,
+    manuscript,
+    max_workers=REVIEW_MAX_WORKERS,
+    timeout=REVIEW_TIMEOUT,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    errors=None,
+    on_token=None,
+):
+    """
+    Runs every reviewer on ``manuscript`` concurrently and returns
+    ``{reviewer: review}``. ``on_token(reviewer, text)`` receives each review
+    as it streams in; it is called from the worker threads.
+
+    If a reviewer fails or times out, :class:`CallsFailed` is raised (its
+    ``results`` hold the reviews that finished) unless ``errors`` is a dict:
+    then the exception is stored there under the reviewer's name and the
+    reviewer gets a placeholder text in the result.
+    """
+    if not isinstance(manuscript, dict):
+        manuscript = {"text": manuscript, "sections": index_sections(manuscript)}
+
+    calls = {}
+    for agent in reviewers:
+        text = manuscript_for_reviewer(manuscript, agent)
+        stream = None
+        if on_token is not None:
+            stream = lambda text, name=agent.name: on_token(name, text)
+        calls[agent.name] = lambda agent=agent, text=text, stream=stream: (
+            review_manuscript(
+                agent,
+                text,
+                max_prompt_tokens=max_prompt_tokens,
+                on_token=stream,
+                timeout=timeout,
+            )
+        )
+    # ``timeout`` is applied per LLM call inside review_manuscript.
+    with stage("reviews", reviewers=len(calls)):
+        return run_concurrently(
+            calls, max_workers=max_workers, timeout=None, errors=errors
+        )
 
 
 def print_reviews(responses):
@@ -0,0 +1,191 @@
+import re
+import sqlite3
+import threading
+import time
+
+from config import REVIEW_STORE_PATH
+
+# "Score (0–10)" is echoed from the prompt; strip the range before matching.
+_SCORE_RANGE_RE = re.compile(r"\(\s*0\s*[–-]\s*10\s*\)")
+_SCORE_RE = re.compile(
+    r"score[^0-9\n]{0,30}?(\d+(?:\.\d+)?)\s*(?:/\s*10|out of 10)?", re.IGNORECASE
+)
+_VERDICT_RE = re.compile(
+    r"(?:final\s+)?verdict[^A-Za-z\n]{0,10}(accept|revise|reject)", re.IGNORECASE
+)
+
+
+def parse_score(review):
+    """Returns the 0–10 score given in a review (the last one mentioned), or None."""
+    matches = _SCORE_RE.findall(_SCORE_RANGE_RE.sub("", review))
+    if not matches:
+        return None
+    score = float(matches[-1])
+    return score if 0 <= score <= 10 else None
+
+
+def parse_verdict(review):
+    """Returns "Accept", "Revise" or "Reject" from a review's final verdict, or None."""
+    matches = _VERDICT_RE.findall(review)
+    return matches[-1].capitalize() if matches else None
+
+
+def session_id(manuscript_hash, journal):
+    """Default session name: one session per (manuscript, journal)."""
+    return f"{manuscript_hash[:12]}-{re.sub(r'[^A-Za-z0-9]+', '', journal)}"
+
+
+class ReviewStore:
+    """
+    Local SQLite store of structured review and rebuttal rounds.
+
+    Round 0 holds the initial reviews; round N > 0 holds the reviewers'
+    re-evaluations after the N-th rebuttal. PDFs are rendered from these
+    records and never need to be parsed back.
+    """
+
+    def __init__(self, path=REVIEW_STORE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS reviews ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " session TEXT NOT NULL,"
+                " round INTEGER NOT NULL,"
+                " reviewer TEXT NOT NULL,"
+                " journal TEXT NOT NULL,"
+                " manuscript_hash TEXT NOT NULL,"
+                " text TEXT NOT NULL,"
+                " score REAL,"
+                " verdict TEXT,"
+                " created_at REAL NOT NULL,"
+                " input_hash TEXT,"
+                " UNIQUE (session, round, reviewer))"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(reviews)")]
+            if "input_hash" not in columns:  # stores created before incremental rounds
+                self._conn.execute("ALTER TABLE reviews ADD COLUMN input_hash TEXT")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS manuscripts ("
+                " hash TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    def add_round(
+        self, session, round_num, journal, manuscript_hash, responses, input_hashes=None
+    ):
+        """
+        Stores ``{reviewer: review text}`` as one round of a session.
+
+        ``input_hashes`` optionally maps reviewers to a hash of the inputs the
+        review was produced from, so later rounds can skip unchanged reviewers.
+        """
+        input_hashes = input_hashes or {}
+        now = time.time()
+        rows = [
+            (
+                session,
+                round_num,
+                reviewer,
+                journal,
+                manuscript_hash,
+                review,
+                parse_score(review),
+                parse_verdict(review),
+                now,
+                input_hashes.get(reviewer),
+            )
+            for reviewer, review in responses.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reviews (session, round, reviewer, journal,"
+                " manuscript_hash, text, score, verdict, created_at, input_hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def add_manuscript(self, manuscript_hash, text):
+        """Keeps a reviewed revision's text so the next revision can be diffed against it."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO manuscripts (hash, text, created_at)"
+                " VALUES (?, ?, ?)",
+                (manuscript_hash, text, time.time()),
+            )
+
+    def get_manuscript(self, manuscript_hash):
+        """Returns the stored text of a revision, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM manuscripts WHERE hash = ?", (manuscript_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_round(self, session, round_num):
+        """Returns ``{reviewer: record}`` for one round, in insertion order."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT * FROM reviews WHERE session = ? AND round = ? ORDER BY id",
+                (session, round_num),
+            )
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        records = [dict(zip(columns, row)) for row in rows]
+        return {record["reviewer"]: record for record in records}
+
+    def latest_round(self, session):
+        """Returns the highest round number stored for a session, or None."""
+        with self._lock:
+            (round_num,) = self._conn.execute(
+                "SELECT MAX(round) FROM reviews WHERE session = ?", (session,)
+            ).fetchone()
+        return round_num
+
+    def session_info(self, session):
+        """Returns the journal, manuscript hash and latest round of a session."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT journal, manuscript_hash, round FROM reviews WHERE session = ?"
+                " ORDER BY round DESC, id DESC LIMIT 1",
+                (session,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No reviews stored for session {session!r}")
+        journal, manuscript_hash, round_num = row
+        return {"journal": journal, "manuscript_hash": manuscript_hash, "round": round_num}
+
+    def original_reviews(self, session):
+        """Returns ``{reviewer: review text}`` from round 0 of a session."""
+        reviews = self.get_round(session, 0)
+        if not reviews:
+            raise KeyError(f"No initial reviews stored for session {session!r}")
+        return {reviewer: record["text"] for reviewer, record in reviews.items()}
+
+    def latest_reviews(self, session):
+        """
+        Returns ``{reviewer: review text}`` with each reviewer's most recent
+        review; a reviewer missing from the latest round (e.g. because it
+        failed) keeps its review from the last round it completed.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT reviewer, text FROM reviews WHERE session = ? ORDER BY round, id",
+                (session,),
+            ).fetchall()
+        if not rows:
+            raise KeyError(f"No reviews stored for session {session!r}")
+        return dict(rows)
+
+    def sessions(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session, journal, MAX(round) FROM reviews"
+                " GROUP BY session ORDER BY MAX(created_at) DESC"
+            ).fetchall()
+        return [
+            {"session": session, "journal": journal, "rounds": last_round + 1}
+            for session, journal, last_round in rows
+        ]
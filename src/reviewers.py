@@ -1,18 +1,71 @@
 # === file: reviewers.py ===
-from autogen import ConversableAgent, LLMConfig
-from config import JOURNAL_STYLES
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
 
-llm_config = LLMConfig(api_type="openai", model="gpt-4o-mini")
+from config import JOURNAL_STYLES, REVIEWER_ROLES
 
+# autogen is imported on first use so that importing this module stays cheap.
+_llm_configs = {}
+_llm_override = None
+# Per-``stream`` copies of the override, built on first use.
+_override_configs = {}
 
-def create_reviewer(name, role_desc, journal="Nature"):
+# Idle agents kept per (journal, role, model, stream, generation); extra ones are dropped.
+MAX_IDLE_PER_KEY = 16
+
+
+def set_llm_config(llm_config):
+    """
+    Makes reviewers created from now on use ``llm_config`` (e.g. a local
+    stand-in, see ``fake_backend.py``); ``None`` restores the default. Its
+    ``stream`` setting is replaced per reviewer, as for the default config.
+    Pooled agents built with the previous config are discarded.
+    """
+    global _llm_override
+    _llm_override = llm_config
+    _override_configs.clear()
+    if _registry is not None:
+        _registry.clear()
+
+
+def _with_stream(llm_config, stream):
+    """Returns a copy of ``llm_config`` with ``stream`` set on every entry."""
+    from autogen import LLMConfig
+
+    data = llm_config.model_dump() if hasattr(llm_config, "model_dump") else dict(llm_config)
+    data["config_list"] = [{**entry, "stream": stream} for entry in data["config_list"]]
+    return LLMConfig(**data)
+
+
+def get_llm_config(stream=False):
+    """Shared LLM config; ``stream=True`` makes replies arrive token by token."""
+    if _llm_override is not None:
+        if stream not in _override_configs:
+            _override_configs[stream] = _with_stream(_llm_override, stream)
+        return _override_configs[stream]
+    if stream not in _llm_configs:
+        from autogen import LLMConfig
+
+        _llm_configs[stream] = LLMConfig(
+            api_type="openai", model="gpt-4o-mini", stream=stream
+        )
+    return _llm_configs[stream]
+
+
+def journal_system_message(journal):
+    """
+    System message shared by all reviewers of a journal. The reviewer's role
+    is given at the end of each request instead (see ``run_agent``), so the
+    system message and manuscript form a prefix that is identical across
+    reviewers and can be served from the provider's prompt cache.
+    """
     tone = JOURNAL_STYLES[journal]["tone"]
     focus = JOURNAL_STYLES[journal]["focus"]
-
-    prompt = (
+    return (
         f"You are a peer reviewer for the journal {journal}. "
         f"Your tone should be {tone}. Focus on {focus}. "
-        f"You are acting as a {role_desc}.\n\n"
+        "Your reviewer role is stated at the end of each request.\n\n"
         "Provide a structured review with:\n"
         "- Summary\n"
         "- Major Concerns\n"
@@ -20,16 +73,161 @@ def create_reviewer(name, role_desc, journal="Nature"):
         "- Score (0–10)"
     )
 
-    return ConversableAgent(name=name, system_message=prompt, llm_config=llm_config)
 
+class ReviewerRegistry:
+    """
+    Journals and reviewer roles (from journals.json, see config.py) with
+    precompiled system prompts, and a pool of reviewer agents.
+
+    Agents are pooled per (journal, role, model, stream, generation).
+    :meth:`acquire` hands out agents for exclusive use; :meth:`release` clears
+    their chat history and returns them to the pool for the next manuscript.
+    :meth:`clear` starts a new generation, so agents leased before it are
+    dropped when released instead of being pooled again.
+    """
+
+    def __init__(self, journals=JOURNAL_STYLES, roles=REVIEWER_ROLES):
+        self.journals = journals
+        self.roles = {role["name"]: role for role in roles}
+        self.system_prompts = {name: journal_system_message(name) for name in journals}
+        self._lock = threading.Lock()
+        self._idle = defaultdict(list)
+        self.generation = 0
+        self.created = 0
+        self.reused = 0
+
+    def _key(self, journal, role_name, stream):
+        from llm_cache import llm_fingerprint
+
+        if journal not in self.system_prompts:
+            raise ValueError(
+                f"Unknown journal {journal!r}, expected one of {list(self.journals)}"
+            )
+        model, _ = llm_fingerprint(get_llm_config(stream))
+        return (journal, role_name, model, stream, self.generation)
+
+    def _create(self, key):
+        from autogen import ConversableAgent
+
+        journal, role_name, _, stream, _ = key
+        role = self.roles[role_name]
+        agent = ConversableAgent(
+            name=role_name,
+            system_message=self.system_prompts[journal],
+            llm_config=get_llm_config(stream),
+        )
+        agent.role_desc = role["role_desc"]
+        agent.review_sections = role["sections"]
+        agent.pool_key = key
+        return agent
+
+    def acquire_one(self, journal, role_name, stream=False):
+        key = self._key(journal, role_name, stream)
+        with self._lock:
+            if self._idle[key]:
+                self.reused += 1
+                return self._idle[key].pop()
+            self.created += 1
+        return self._create(key)
+
+    def acquire(self, journal, stream=False):
+        """Returns one agent per reviewer role, for exclusive use until released."""
+        return [self.acquire_one(journal, name, stream) for name in self.roles]
+
+    def release(self, agents):
+        """
+        Returns agents to the pool. Only release agents that are no longer in
+        use: an agent whose call timed out may still be running.
+        """
+        for agent in agents:
+            key = getattr(agent, "pool_key", None)
+            if key is None:
+                continue
+            agent.clear_history()
+            with self._lock:
+                stale = key[-1] != self.generation  # built before clear()
+                if not stale and len(self._idle[key]) < MAX_IDLE_PER_KEY:
+                    self._idle[key].append(agent)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+            self.generation += 1
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ReviewerRegistry()
+        return _registry
+
+
+def create_reviewer(name, role_desc, journal="Nature", sections=None, stream=False):
+    """Builds a standalone (unpooled) reviewer agent."""
+    from autogen import ConversableAgent
+
+    agent = ConversableAgent(
+        name=name,
+        system_message=get_registry().system_prompts[journal],
+        llm_config=get_llm_config(stream),
+    )
+    agent.role_desc = role_desc
+    agent.review_sections = sections
+    return agent
+
+
+def get_all_reviewers(journal="Nature", stream=False):
+    """
+    Returns one pooled agent per reviewer role. Pass them to
+    :func:`release_reviewers` when done so the next manuscript can reuse
+    them, or use :func:`reviewer_lease`.
+    """
+    return get_registry().acquire(journal, stream)
+
+
+def release_reviewers(agents):
+    get_registry().release(agents)
+
+
+@contextmanager
+def reviewer_lease(journal="Nature", stream=False, errors=None):
+    """
+    ``with reviewer_lease("Nature") as reviewers: ...`` acquires the reviewers
+    and releases them afterwards, except those named in ``errors`` or in a
+    ``CallsFailed`` raised from the body (failed or timed-out calls may still
+    be using them).
+    """
+    from review_engine import CallsFailed
 
-def get_all_reviewers(journal="Nature"):
-    return [
-        create_reviewer(
-            "MethodologistReviewer", "methodology and reproducibility expert", journal
-        ),
-        create_reviewer("DomainExpertReviewer", "domain-specific evaluator", journal),
-        create_reviewer(
-            "ContrarianReviewer", "skeptical and critical reviewer", journal
-        ),
-    ]
+    agents = get_all_reviewers(journal, stream)
+    failed = {}
+    try:
+        yield agents
+    except CallsFailed as exc:
+        failed = exc.errors
+        raise
+    finally:
+        failed = {**failed, **(errors or {})}
+        release_reviewers([agent for agent in agents if agent.name not in failed])
+
+
+def clone_reviewer(agent):
+    """Returns another agent with the same role, for running calls in parallel."""
+    key = getattr(agent, "pool_key", None)
+    if key is not None:
+        journal, role_name, _, stream, _ = key
+        return get_registry().acquire_one(journal, role_name, stream)
+
+    from autogen import ConversableAgent
+
+    clone = ConversableAgent(
+        name=agent.name, system_message=agent.system_message, llm_config=agent.llm_config
+    )
+    clone.role_desc = getattr(agent, "role_desc", None)
+    clone.review_sections = getattr(agent, "review_sections", None)
+    return clone
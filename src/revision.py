@@ -0,0 +1,215 @@
+"""
+Revision-aware re-review.
+
+A revised manuscript is diffed paragraph by paragraph against the previous
+revision, and each reviewer is sent only the changed paragraphs in its own
+sections together with its prior review. Diffs are cached by the content
+hashes of both revisions; the re-review replies go through the LLM response
+cache like every other prompt.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from bisect import bisect_right
+from difflib import SequenceMatcher
+
+from config import (
+    CACHE_DIR,
+    MAX_PROMPT_TOKENS,
+    REVIEW_MAX_WORKERS,
+    REVIEW_TIMEOUT,
+    REVISION_FULL_REVIEW_RATIO,
+)
+from disk_cache import DiskCache
+from review_engine import (
+    call_with_timeout,
+    manuscript_for_reviewer,
+    review_manuscript,
+    run_agent,
+    run_concurrently,
+)
+from sections import DEFAULT_EXCLUDED, index_sections
+
+# Bump when the diff format changes so stale cache entries are ignored.
+DIFF_VERSION = "revision-diff-1"
+
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n\s*|\f\s*")
+
+REVISION_PROMPT = (
+    "You reviewed an earlier revision of this manuscript. Your review of that "
+    "revision is below, followed by every passage the authors changed in the "
+    "sections you review (text that did not change is not shown).\n\n"
+    "Update your review for the revised manuscript: say which of your "
+    "concerns the changes resolve, which remain, and any new issues they "
+    "introduce. Keep the same format:\n"
+    "- Summary\n"
+    "- Major Concerns\n"
+    "- Minor Suggestions\n"
+    "- Score (0–10)\n\n"
+    "=== Your previous review ===\n{prior_review}\n\n"
+    "=== Changes in this revision ===\n{changes}"
+)
+
+_diff_cache = None
+_diff_cache_lock = threading.Lock()
+
+
+def _get_diff_cache():
+    global _diff_cache
+    with _diff_cache_lock:
+        if _diff_cache is None:
+            _diff_cache = DiskCache(
+                os.path.join(CACHE_DIR, "revision_diffs.sqlite"), max_bytes=64 * 2**20
+            )
+        return _diff_cache
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_paragraphs(text):
+    """
+    Returns ``(offset, paragraph)`` pairs, with whitespace inside each
+    paragraph collapsed so re-extraction noise does not show up as edits.
+    """
+    paragraphs, start = [], 0
+    for match in list(_PARAGRAPH_BREAK_RE.finditer(text)) + [None]:
+        end = match.start() if match else len(text)
+        paragraph = " ".join(text[start:end].split())
+        if paragraph:
+            paragraphs.append((start, paragraph))
+        start = match.end() if match else end
+    return paragraphs
+
+
+def _compute_diff(old_text, new_text):
+    old = [p for _, p in split_paragraphs(old_text)]
+    new_pairs = split_paragraphs(new_text)
+    new = [p for _, p in new_pairs]
+
+    index = index_sections(new_text)
+    starts = [span["start"] for span in index]
+
+    def section_at(position):
+        offset = new_pairs[position][0] if position < len(new_pairs) else len(new_text)
+        return index[max(bisect_right(starts, offset) - 1, 0)]["name"]
+
+    regions, changed = [], 0
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        region = {"section": section_at(j1), "old": old[i1:i2], "new": new[j1:j2]}
+        changed += sum(map(len, region["old"])) + sum(map(len, region["new"]))
+        regions.append(region)
+
+    total = sum(map(len, old)) + sum(map(len, new))
+    return {"regions": regions, "changed_ratio": changed / total if total else 0.0}
+
+
+def diff_revisions(old_text, new_text):
+    """
+    Paragraph-level diff of two manuscript revisions.
+
+    Returns ``{"regions": [...], "changed_ratio": float}``. Each region is a
+    dict with the ``section`` it falls in (in the new revision) and the
+    ``old`` and ``new`` paragraphs; one side is empty for pure insertions or
+    deletions. ``changed_ratio`` is the share of characters in changed
+    paragraphs across both revisions.
+    """
+    key = f"{DIFF_VERSION}:{text_hash(old_text)}:{text_hash(new_text)}"
+    cache = _get_diff_cache()
+    diff = cache.get(key)
+    if diff is None:
+        diff = _compute_diff(old_text, new_text)
+        cache.set(key, diff)
+    return diff
+
+
+def regions_for_reviewer(regions, index, sections=None, exclude=DEFAULT_EXCLUDED):
+    """Keeps the regions in the sections a reviewer reads (as ``select_sections`` does)."""
+    detected = {span["name"] for span in index}
+    if sections is not None and detected & set(sections):
+        return [region for region in regions if region["section"] in sections]
+    return [region for region in regions if region["section"] not in exclude]
+
+
+def format_changes(regions):
+    blocks = []
+    for region in regions:
+        lines = [f"[{region['section'].capitalize()}]"]
+        if region["old"] and region["new"]:
+            lines.append("Before:\n" + "\n\n".join(region["old"]))
+            lines.append("After:\n" + "\n\n".join(region["new"]))
+        elif region["new"]:
+            lines.append("Added:\n" + "\n\n".join(region["new"]))
+        else:
+            lines.append("Removed:\n" + "\n\n".join(region["old"]))
+        blocks.append("\n".join(lines))
+    return "\n\n---\n\n".join(blocks)
+
+
+def run_revision_reviews(
+    reviewers,
+    manuscript,
+    previous_text,
+    prior_reviews,
+    max_workers=REVIEW_MAX_WORKERS,
+    timeout=REVIEW_TIMEOUT,
+    max_prompt_tokens=MAX_PROMPT_TOKENS,
+    full_review_ratio=REVISION_FULL_REVIEW_RATIO,
+    errors=None,
+):
+    """
+    Re-reviews a revised manuscript against the previous revision.
+
+    ``manuscript`` is the revised text or the dict from ``structure_output``;
+    ``prior_reviews`` maps reviewer names to their review of
+    ``previous_text``. Each reviewer gets its prior review plus the changes in
+    its sections. Reviewers whose sections did not change keep their prior
+    review without being queried. Reviewers without a prior review, and all
+    reviewers when more than ``full_review_ratio`` of the text changed, review
+    the full manuscript as ``run_reviews`` would.
+    """
+    if not isinstance(manuscript, dict):
+        manuscript = {"text": manuscript, "sections": index_sections(manuscript)}
+    index = manuscript.get("sections") or index_sections(manuscript["text"])
+    diff = diff_revisions(previous_text, manuscript["text"])
+    full_review = diff["changed_ratio"] > full_review_ratio
+    print(
+        f"🧾 Revision diff: {len(diff['regions'])} changed regions, "
+        f"{diff['changed_ratio']:.0%} of the text"
+        + (" (full re-review)" if full_review else "")
+    )
+
+    responses, calls = {}, {}
+    for agent in reviewers:
+        prior = prior_reviews.get(agent.name)
+        if full_review or prior is None:
+            text = manuscript_for_reviewer(manuscript, agent)
+            calls[agent.name] = lambda agent=agent, text=text: review_manuscript(
+                agent, text, max_prompt_tokens=max_prompt_tokens, timeout=timeout
+            )
+            continue
+        regions = regions_for_reviewer(
+            diff["regions"], index, getattr(agent, "review_sections", None)
+        )
+        if not regions:
+            print(f"♻️ No changes in {agent.name}'s sections, keeping its prior review.")
+            responses[agent.name] = prior
+            continue
+        prompt = REVISION_PROMPT.format(
+            prior_review=prior, changes=format_changes(regions)
+        )
+        calls[agent.name] = lambda agent=agent, prompt=prompt: call_with_timeout(
+            lambda: run_agent(agent, prompt), timeout
+        )
+
+    # ``timeout`` is applied per LLM call, as in run_reviews.
+    responses.update(
+        run_concurrently(calls, max_workers=max_workers, timeout=None, errors=errors)
+    )
+    return {agent.name: responses[agent.name] for agent in reviewers}
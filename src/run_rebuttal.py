@@ -1,55 +1,94 @@
 # === file: run_rebuttal.py ===
+import argparse
 import os
+from instrumentation import print_summary
 from pdf_utils import extract_text_from_pdf
-from reviewers import get_all_reviewers
+from reviewers import reviewer_lease
 from rebuttal_loop import run_rebuttal_round
 from report import save_reviews_to_pdf
+from review_store import ReviewStore
 
 # === CONFIGURATION ===
-paper_path = "/Users/taramurphy/Downloads/example.pdf"
-review_path = (
+DEFAULT_PAPER_PATH = "/Users/taramurphy/Downloads/example.pdf"
+DEFAULT_REVIEW_PATH = (
     "/Users/taramurphy/Documents/2025/code/mcp_tara/src/peer_review_report.pdf"
 )
-rebuttal_path = "/Users/taramurphy/Downloads/example.pdf"
-journal = "NeurIPS"
-output_dir = "rebuttal_outputs"
-
-# === Load Inputs ===
-print("📄 Extracting PDF text...")
-paper_text = extract_text_from_pdf(paper_path)
-review_text = extract_text_from_pdf(review_path)
-rebuttal_text = extract_text_from_pdf(rebuttal_path)
-
-# === Run Rebuttal Round ===
-print("🤖 Getting reviewers...")
-reviewers = get_all_reviewers(journal=journal)
-
-print("🧠 Running rebuttal evaluation...")
-feedback = run_rebuttal_round(paper_text, review_text, rebuttal_text, reviewers)
-
-# === Display & Save ===
-os.makedirs(output_dir, exist_ok=True)
-round_num = 1
-text_output = os.path.join(output_dir, f"rebuttal_round_{round_num}.txt")
-pdf_output = os.path.join(output_dir, f"rebuttal_round_{round_num}.pdf")
-
-all_accept = True
-with open(text_output, "w") as f:
-    for name, review in feedback.items():
-        print(f"\n--- {name} ---\n{review}\n")
-        f.write(f"--- {name} ---\n{review}\n\n")
-        if "accept" not in review.lower():
-            all_accept = False
-
-print(f"💾 Text feedback saved to {text_output}")
-
-# Save to PDF
-save_reviews_to_pdf(feedback, output_path=pdf_output)
-print(f"📄 PDF feedback saved to {pdf_output}")
-
-if all_accept:
-    print("\n✅ All reviewers have accepted. The paper is ready for publication!")
-else:
-    print(
-        "\n🔁 Some reviewers still have concerns. Please revise and run again with a new rebuttal."
+DEFAULT_REBUTTAL_PATH = "/Users/taramurphy/Downloads/example.pdf"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one PeerLens rebuttal round")
+    parser.add_argument("--paper", default=DEFAULT_PAPER_PATH)
+    parser.add_argument("--review", default=DEFAULT_REVIEW_PATH)
+    parser.add_argument(
+        "--session",
+        help="Read prior reviews from the review store instead of the --review PDF",
     )
+    parser.add_argument("--rebuttal", default=DEFAULT_REBUTTAL_PATH)
+    parser.add_argument("--journal", default="NeurIPS")
+    parser.add_argument("--output-dir", default="rebuttal_outputs")
+    args = parser.parse_args(argv)
+
+    # === Load Inputs ===
+    print("📄 Extracting PDF text...")
+    paper_text = extract_text_from_pdf(args.paper)
+    rebuttal_text = extract_text_from_pdf(args.rebuttal)
+    store, journal, round_num = None, args.journal, 1
+    if args.session:
+        # Structured reviews: no need to parse the review PDF back.
+        store = ReviewStore()
+        info = store.session_info(args.session)
+        journal, round_num = info["journal"], info["round"] + 1
+        review_text = None
+    else:
+        review_text = extract_text_from_pdf(args.review)
+
+    # === Run Rebuttal Round ===
+    print("🤖 Getting reviewers...")
+    errors = {}
+    with reviewer_lease(journal=journal, errors=errors) as reviewers:
+        print("🧠 Running rebuttal evaluation...")
+        feedback = run_rebuttal_round(
+            paper_text,
+            review_text,
+            rebuttal_text,
+            reviewers,
+            store=store,
+            session=args.session,
+            errors=errors,
+        )
+    # Failed reviewers are reported, not saved as feedback.
+    for name, exc in errors.items():
+        print(f"⚠️ {name} failed: {exc}")
+    feedback = {name: review for name, review in feedback.items() if name not in errors}
+
+    # === Display & Save ===
+    os.makedirs(args.output_dir, exist_ok=True)
+    text_output = os.path.join(args.output_dir, f"rebuttal_round_{round_num}.txt")
+    pdf_output = os.path.join(args.output_dir, f"rebuttal_round_{round_num}.pdf")
+
+    all_accept = True
+    with open(text_output, "w") as f:
+        for name, review in feedback.items():
+            print(f"\n--- {name} ---\n{review}\n")
+            f.write(f"--- {name} ---\n{review}\n\n")
+            if "accept" not in review.lower():
+                all_accept = False
+
+    print(f"💾 Text feedback saved to {text_output}")
+
+    # Save to PDF
+    save_reviews_to_pdf(feedback, output_path=pdf_output)
+    print(f"📄 PDF feedback saved to {pdf_output}")
+
+    if all_accept:
+        print("\n✅ All reviewers have accepted. The paper is ready for publication!")
+    else:
+        print(
+            "\n🔁 Some reviewers still have concerns. Please revise and run again with a new rebuttal."
+        )
+    print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import re
+from bisect import bisect_left
+
+# Canonical section names and the headings that map onto them.
+SECTION_ALIASES = {
+    "abstract": ["abstract", "summary"],
+    "introduction": ["introduction", "background", "motivation"],
+    "methods": [
+        "methods",
+        "method",
+        "methodology",
+        "materials and methods",
+        "methods and materials",
+        "approach",
+        "experimental setup",
+        "experimental design",
+    ],
+    "results": [
+        "results",
+        "experiments",
+        "experimental results",
+        "evaluation",
+        "results and discussion",
+    ],
+    "discussion": [
+        "discussion",
+        "conclusion",
+        "conclusions",
+        "discussion and conclusions",
+        "limitations",
+        "future work",
+    ],
+    "references": ["references", "bibliography", "works cited", "literature cited"],
+    "appendix": ["appendix", "appendices", "supplementary material"],
+}
+SECTION_NAMES = ("front",) + tuple(SECTION_ALIASES)
+
+# Sections left out of every reviewer prompt unless explicitly requested.
+DEFAULT_EXCLUDED = ("references",)
+
+_ALIAS_TO_NAME = {
+    alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases
+}
+_HEADING_RE = re.compile(
+    r"(?:^|(?<=\f))[ \t]*(?:(?:\d{1,2}|[IVX]{1,4})\.?[ \t]+)?("
+    + "|".join(
+        re.escape(alias).replace(r"\ ", r"\s+")
+        for alias in sorted(_ALIAS_TO_NAME, key=len, reverse=True)
+    )
+    + r")[ \t]*(?:[:.—-][^\n\f]*)?(?=[\n\f]|\Z)",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def index_sections(text):
+    """
+    Splits manuscript text into canonical sections in a single pass.
+
+    Returns a list of ``{"name", "start", "end", "page_start", "page_end"}``
+    spans in document order. Character offsets index into ``text``; pages are
+    1-based and counted from the form feeds the PDF extractors emit. Text
+    before the first recognised heading is reported as ``front``.
+    """
+    page_breaks = [m.start() for m in re.finditer("\f", text)]
+    boundaries = [("front", 0)]
+    for match in _HEADING_RE.finditer(text):
+        heading = re.sub(r"\s+", " ", match.group(1).lower())
+        name = _ALIAS_TO_NAME[heading]
+        # Inline text after a heading is only allowed for "Abstract— ...".
+        if match.end() - match.end(1) > 2 and name != "abstract":
+            continue
+        if name != boundaries[-1][0]:
+            boundaries.append((name, match.start()))
+
+    index = []
+    for i, (name, start) in enumerate(boundaries):
+        end = boundaries[i + 1][1] if i + 1 < len(boundaries) else len(text)
+        if end <= start:
+            continue
+        index.append(
+            {
+                "name": name,
+                "start": start,
+                "end": end,
+                "page_start": bisect_left(page_breaks, start) + 1,
+                "page_end": bisect_left(page_breaks, max(start, end - 1)) + 1,
+            }
+        )
+    return index
+
+
+def select_sections(text, index, sections=None, exclude=DEFAULT_EXCLUDED):
+    """
+    Returns the manuscript text restricted to ``sections``.
+
+    With ``sections=None`` everything except ``exclude`` is kept. If none of
+    the requested sections were detected (e.g. a manuscript without standard
+    headings), the full text minus ``exclude`` is returned instead.
+    """
+    if sections is None:
+        keep = [span for span in index if span["name"] not in exclude]
+    else:
+        keep = [span for span in index if span["name"] in sections]
+        if not keep:
+            keep = [span for span in index if span["name"] not in exclude]
+    if not keep:
+        return text
+    return "\n".join(text[span["start"] : span["end"]].strip() for span in keep)
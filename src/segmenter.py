@@ -0,0 +1,65 @@
+"""
+Single-pass segmentation of review reports and rebuttal letters by reviewer.
+
+Both documents are scanned once for reviewer headings, producing an index of
+reviewer name -> text span. Indexes are memoised per document, so repeated
+lookups (every reviewer, every round) never rescan the text.
+"""
+
+import re
+from functools import lru_cache
+
+# Headings emitted by report.save_reviews_to_pdf: "<Name>Reviewer Review".
+REVIEW_HEADING_RE = re.compile(r"^[ \t]*([A-Z]\w*Reviewer) Review[ \t]*$", re.MULTILINE)
+
+# Rebuttal letters address reviewers by name at the start of a line,
+# e.g. "MethodologistReviewer", "Response to ContrarianReviewer:".
+REBUTTAL_HEADING_RE = re.compile(
+    r"^[ \t]*(?:(?:Response|Reply)\s+to\s+)?([A-Z]\w*Reviewer)\b", re.MULTILINE
+)
+
+
+class ReviewerSegments:
+    """Maps reviewer names to their section of a document."""
+
+    def __init__(self, text, heading_re, include_heading):
+        self.text = text
+        self.spans = {}
+        matches = list(heading_re.finditer(text))
+        for i, match in enumerate(matches):
+            start = match.start() if include_heading else match.end()
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            # A reviewer addressed twice keeps its first section, like re.search did.
+            self.spans.setdefault(match.group(1), (start, end))
+        self._heading_starts = [match.start() for match in matches]
+
+    def get(self, name, default=None):
+        span = self.spans.get(name)
+        if span is None:
+            return default
+        start, end = span
+        return self.text[start:end].strip()
+
+    def find_inline(self, name, default=None):
+        """
+        Falls back to the first mention of ``name`` anywhere in the text, up to
+        the next heading, for letters that do not put names at line starts.
+        """
+        section = self.get(name)
+        if section is not None:
+            return section
+        start = self.text.find(name)
+        if start < 0:
+            return default
+        end = next((h for h in self._heading_starts if h > start), len(self.text))
+        return self.text[start:end].strip()
+
+
+@lru_cache(maxsize=32)
+def review_segments(review_text):
+    return ReviewerSegments(review_text, REVIEW_HEADING_RE, include_heading=False)
+
+
+@lru_cache(maxsize=32)
+def rebuttal_segments(rebuttal_text):
+    return ReviewerSegments(rebuttal_text, REBUTTAL_HEADING_RE, include_heading=True)
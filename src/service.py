@@ -0,0 +1,509 @@
+"""
+Long-lived review service: a local HTTP API in front of a job queue.
+
+The PDF backends, reportlab, autogen and one set of reviewer agents per
+journal are loaded once at startup, so a job only pays for its own work.
+Submitted jobs wait in a bounded asyncio queue and SERVICE_WORKERS worker
+tasks take them one at a time, running the (blocking) pipeline in a thread.
+Reviews go to the review store (see review_store.py) like main.py's, so
+rebuttal jobs and the CLI tools can pick up sessions created here.
+
+Endpoints:
+    POST /uploads             PDF as the request body -> {"upload": id}
+                              (413 above PEERLENS_SERVICE_MAX_UPLOAD_MB)
+    POST /jobs                {"type": "review", "upload": id, "journal": "NeurIPS"}
+                              {"type": "rebuttal", "session": s, "upload": id}
+                              {"type": "arxiv", "query": q, "session": s}
+    GET  /jobs/{id}           status, and the result once the job is done
+    GET  /jobs/{id}/events    server-sent events: status changes and review tokens
+                              ("restart" events mean a reviewer's call was retried)
+    GET  /health              queue depth, job counts and reviewer pool counts
+    GET  /metrics             Prometheus text (with PEERLENS_METRICS=1)
+
+Usage:
+    python service.py --workers 4 --port 8000
+    curl --data-binary @paper.pdf localhost:8000/uploads
+    curl -d '{"type": "review", "upload": "<id>"}' localhost:8000/jobs
+    curl -N localhost:8000/jobs/<job id>/events
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from config import (
+    AUTOGEN_USE_DOCKER,
+    JOURNAL_STYLES,
+    SERVICE_DATA_DIR,
+    SERVICE_HOST,
+    SERVICE_MAX_JOBS,
+    SERVICE_MAX_UPLOAD_MB,
+    SERVICE_PORT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_WORKERS,
+)
+from instrumentation import enabled, get_metrics, stage
+from pdf_utils import extract_text_from_pdf, pdf_content_hash, structure_output
+from rebuttal_loop import run_rebuttal_round
+from report import save_reviews_to_pdf
+from review_engine import STREAM_RESTART, run_reviews
+from review_store import ReviewStore, session_id
+from reviewers import get_all_reviewers, get_registry, release_reviewers, reviewer_lease
+
+JOB_TYPES = ("review", "rebuttal", "arxiv")
+FINISHED = ("done", "failed")
+
+# Imported lazily elsewhere to keep the CLI tools fast; the service pays once.
+WARM_MODULES = ("autogen", "fitz", "pdfminer.high_level", "reportlab.platypus")
+
+
+class JobError(Exception):
+    """A job request that cannot be run (unknown upload, session or journal)."""
+
+
+class Job:
+    """
+    One submitted job. ``events`` is the log streamed by ``/jobs/{id}/events``;
+    it is only touched from the event loop thread. Once the job has finished
+    only its status events are kept (the result holds the reviews).
+    """
+
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex[:16]
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events = []
+        # Created by a waiting follower, so emits without followers are cheap.
+        self._wakeup = None
+
+    def emit(self, event, **data):
+        self.events.append({"event": event, **data})
+        if self._wakeup is not None:
+            self._wakeup.set()  # wakes every waiting follower
+            self._wakeup = None
+
+    def set_status(self, status):
+        self.status = status
+        if status == "running":
+            self.started_at = time.time()
+        elif status in FINISHED:
+            self.finished_at = time.time()
+        self.emit("status", status=status)
+        if status in FINISHED:
+            # A new list: followers still reading the old one see every event.
+            self.events = [event for event in self.events if event["event"] == "status"]
+
+    async def follow(self):
+        """Yields every event, past and future, until the job has finished."""
+        events = self.events
+        i = 0
+        while True:
+            while i < len(events):
+                yield events[i]
+                i += 1
+            if self.status in FINISHED:
+                return
+            if self._wakeup is None:
+                self._wakeup = asyncio.Event()
+            await self._wakeup.wait()
+
+    def to_dict(self):
+        info = {
+            "id": self.id,
+            "type": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == "done":
+            info["result"] = self.result
+        if self.error is not None:
+            info["error"] = self.error
+        return info
+
+
+class ReviewService:
+    """
+    Job queue and worker pool. Call :meth:`start` from the event loop that
+    will serve requests, then :meth:`submit` jobs.
+    """
+
+    def __init__(
+        self,
+        workers=SERVICE_WORKERS,
+        queue_size=SERVICE_QUEUE_SIZE,
+        data_dir=SERVICE_DATA_DIR,
+        max_jobs=SERVICE_MAX_JOBS,
+        max_upload_bytes=int(SERVICE_MAX_UPLOAD_MB * 1024 * 1024),
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.data_dir = Path(data_dir)
+        self.max_jobs = max_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self.jobs = OrderedDict()
+        self.counts = Counter()
+        self.running = 0
+        self.store = None
+        self._arxiv = None
+        self._queue = None
+        self._tasks = []
+        self._loop = None
+
+    # === Startup ===
+    def warm_up(self):
+        """Imports the heavy dependencies and builds the reviewer agents once."""
+        os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
+        for name in WARM_MODULES:
+            importlib.import_module(name)
+        for folder in ("uploads", "reports", "arxiv"):
+            (self.data_dir / folder).mkdir(parents=True, exist_ok=True)
+        self.store = ReviewStore()
+        # Created here rather than on the first search, so concurrent
+        # arxiv_search jobs share one cache.
+        from arxiv_cache import ArxivCache
+
+        self._arxiv = ArxivCache(self.data_dir / "arxiv" / "arxiv_cache.sqlite")
+        # One reviewer set per journal and worker, so concurrent jobs for the
+        # same journal don't have to build agents either.
+        for journal in JOURNAL_STYLES:
+            leased = [
+                get_all_reviewers(journal, stream=True) for _ in range(self.workers)
+            ]
+            for agents in leased:
+                release_reviewers(agents)
+
+    async def start(self):
+        with stage("service_warm_up"):
+            await asyncio.to_thread(self.warm_up)
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"🚀 Review service ready with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # === Uploads ===
+    def upload_path(self, upload):
+        return self.data_dir / "uploads" / f"{upload}.pdf"
+
+    def save_upload(self, data):
+        """Stores an uploaded PDF under its content hash and returns the hash."""
+        if not data.startswith(b"%PDF"):
+            raise JobError("Upload must be a PDF file")
+        upload = pdf_content_hash(data)
+        path = self.upload_path(upload)
+        if not path.exists():
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        return upload
+
+    # === Jobs ===
+    def _check(self, kind, params):
+        if kind not in JOB_TYPES:
+            raise JobError(f"Unknown job type {kind!r}, expected one of {JOB_TYPES}")
+        upload = params.get("upload")
+        if kind in ("review", "rebuttal") and not upload:
+            raise JobError(f"A {kind} job needs an upload")
+        # Upload IDs are content hashes; anything else could point outside uploads/.
+        if upload and not (
+            isinstance(upload, str)
+            and re.fullmatch(r"[0-9a-f]{64}", upload)
+            and self.upload_path(upload).exists()
+        ):
+            raise JobError(f"Unknown upload {upload!r}")
+        if kind == "review":
+            journal = params.setdefault("journal", "NeurIPS")
+            if journal not in JOURNAL_STYLES:
+                raise JobError(
+                    f"Unknown journal {journal!r}, expected one of {list(JOURNAL_STYLES)}"
+                )
+        if kind == "rebuttal" or (kind == "arxiv" and params.get("session")):
+            try:
+                self.store.session_info(params.get("session"))
+            except KeyError as exc:
+                raise JobError(exc.args[0]) from None
+        if kind == "arxiv" and not params.get("query"):
+            raise JobError("An arxiv job needs a query")
+
+    def submit(self, kind, params):
+        """Queues a job; raises JobError for bad requests, asyncio.QueueFull when busy."""
+        self._check(kind, params)
+        job = Job(kind, params)
+        self._queue.put_nowait(job)
+        self.jobs[job.id] = job
+        self.counts["submitted"] += 1
+        job.emit("status", status="queued")
+        self._forget_old_jobs()
+        return job
+
+    def _forget_old_jobs(self):
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].status in FINISHED:
+                del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self.running += 1
+            job.set_status("running")
+            try:
+                with stage("service_job", type=job.kind):
+                    job.result = await asyncio.to_thread(self._run, job)
+                job.set_status("done")
+            except Exception as exc:
+                job.error = f"{type(exc).__name__}: {exc}"
+                print(f"⚠️ Job {job.id} ({job.kind}) failed: {job.error}")
+                job.set_status("failed")
+            finally:
+                self.running -= 1
+                self.counts[job.status] += 1
+                self._queue.task_done()
+
+    def _run(self, job):
+        """Runs a job on a worker thread; events are handed back to the loop."""
+
+        def on_token(reviewer, text):
+            if text is STREAM_RESTART:  # clients drop the reviewer's tokens so far
+                self._loop.call_soon_threadsafe(
+                    lambda: job.emit("restart", reviewer=reviewer)
+                )
+                return
+            self._loop.call_soon_threadsafe(
+                lambda: job.emit("token", reviewer=reviewer, text=text)
+            )
+
+        runners = {
+            "review": self._review,
+            "rebuttal": self._rebuttal,
+            "arxiv": self._arxiv_search,
+        }
+        return runners[job.kind](job.params, on_token)
+
+    def _review(self, params, on_token):
+        journal = params["journal"]
+        structured = structure_output(
+            self.upload_path(params["upload"]),
+            self.data_dir / "images" / params["upload"],
+            extract_images=False,
+        )
+        errors = {}
+        with reviewer_lease(journal, stream=True, errors=errors) as reviewers:
+            responses = run_reviews(
+                reviewers, structured, errors=errors, on_token=on_token
+            )
+
+        manuscript_hash = structured["metadata"]["content_hash"]
+        session = session_id(manuscript_hash, journal)
+        self.store.add_manuscript(manuscript_hash, structured["text"])
+        self.store.add_round(
+            session,
+            0,
+            journal,
+            manuscript_hash,
+            {name: text for name, text in responses.items() if name not in errors},
+        )
+        result = {"session": session, "journal": journal, "reviews": responses}
+        if errors:
+            result["failed"] = list(errors)
+        if params.get("report"):
+            report_path = self.data_dir / "reports" / f"{session}.pdf"
+            save_reviews_to_pdf(responses, output_path=str(report_path))
+            result["report"] = str(report_path)
+        return result
+
+    def _rebuttal(self, params, on_token):
+        session = params["session"]
+        info = self.store.session_info(session)
+        paper_text = self.store.get_manuscript(info["manuscript_hash"])
+        if paper_text is None:
+            raise JobError(f"No manuscript text stored for session {session!r}")
+        rebuttal_text = extract_text_from_pdf(self.upload_path(params["upload"]))
+        errors = {}
+        with reviewer_lease(info["journal"], stream=True, errors=errors) as reviewers:
+            feedback = run_rebuttal_round(
+                paper_text,
+                None,
+                rebuttal_text,
+                reviewers,
+                store=self.store,
+                session=session,
+                on_token=on_token,
+                errors=errors,
+            )
+        return {"session": session, "round": info["round"] + 1, "reviews": feedback}
+
+    def _arxiv_search(self, params, on_token):
+        """
+        Searches arXiv (through the query cache) and, for a session, flags
+        manuscript paragraphs that overlap with the cached papers' abstracts.
+        """
+        max_results = int(params.get("max_results", 5))
+        ids = self._arxiv.search(params["query"], max_results=max_results)
+        result = {"papers": [self._arxiv.lookup(arxiv_id) for arxiv_id in ids]}
+
+        session = params.get("session")
+        if session:
+            from novelty import EmbeddingStore
+
+            info = self.store.session_info(session)
+            text = self.store.get_manuscript(info["manuscript_hash"]) or ""
+            embeddings = EmbeddingStore.sync_from_arxiv_cache(
+                self.data_dir / "arxiv" / "embeddings", self._arxiv
+            )
+            threshold = float(params.get("threshold", 0.3))
+            result["overlaps"] = [
+                {key: str(value) for key, value in hit.items()}
+                for hit in embeddings.find_overlaps(text, threshold=threshold)
+            ]
+        return result
+
+    def health(self):
+        registry = get_registry()
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "queue_size": self.queue_size,
+            "jobs": dict(self.counts),
+            "agents_created": registry.created,
+            "agents_reused": registry.reused,
+        }
+
+
+# === HTTP API ===
+def create_app(service=None):
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from starlette.routing import Route
+
+    service = service or ReviewService()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await service.start()
+        yield
+        await service.stop()
+
+    def get_job(request):
+        return service.jobs.get(request.path_params["job_id"])
+
+    async def upload(request):
+        too_large = JSONResponse(
+            {"error": f"Upload exceeds {service.max_upload_bytes} bytes"}, status_code=413
+        )
+        try:
+            if int(request.headers.get("content-length", 0)) > service.max_upload_bytes:
+                return too_large
+        except ValueError:
+            return JSONResponse({"error": "Invalid Content-Length"}, status_code=400)
+        # The header is optional (chunked uploads), so the body is counted too.
+        data = bytearray()
+        async for chunk in request.stream():
+            data += chunk
+            if len(data) > service.max_upload_bytes:
+                return too_large
+        try:
+            return JSONResponse({"upload": service.save_upload(bytes(data))})
+        except JobError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+
+    async def submit(request):
+        try:
+            params = await request.json()
+        except ValueError:
+            return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+        if not isinstance(params, dict):
+            return JSONResponse({"error": "Body must be a JSON object"}, status_code=400)
+        try:
+            job = service.submit(params.pop("type", "review"), params)
+        except JobError as exc:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+        except asyncio.QueueFull:
+            return JSONResponse(
+                {"error": "Job queue is full, try again later"},
+                status_code=503,
+                headers={"Retry-After": "5"},
+            )
+        return JSONResponse(job.to_dict(), status_code=202)
+
+    async def status(request):
+        job = get_job(request)
+        if job is None:
+            return JSONResponse({"error": "Unknown job"}, status_code=404)
+        return JSONResponse(job.to_dict())
+
+    async def events(request):
+        job = get_job(request)
+        if job is None:
+            return JSONResponse({"error": "Unknown job"}, status_code=404)
+
+        async def stream():
+            async for event in job.follow():
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            yield f"event: result\ndata: {json.dumps(job.to_dict())}\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def health(request):
+        return JSONResponse(service.health())
+
+    async def metrics(request):
+        if not enabled():
+            return PlainTextResponse(
+                "Metrics are disabled (set PEERLENS_METRICS=1)\n", status_code=404
+            )
+        return PlainTextResponse(get_metrics().to_prometheus())
+
+    return Starlette(
+        routes=[
+            Route("/uploads", upload, methods=["POST"]),
+            Route("/jobs", submit, methods=["POST"]),
+            Route("/jobs/{job_id}", status),
+            Route("/jobs/{job_id}/events", events),
+            Route("/health", health),
+            Route("/metrics", metrics),
+        ],
+        lifespan=lifespan,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PeerLens review service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_WORKERS)
+    parser.add_argument("--queue-size", type=int, default=SERVICE_QUEUE_SIZE)
+    parser.add_argument("--data-dir", default=SERVICE_DATA_DIR)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    service = ReviewService(args.workers, args.queue_size, args.data_dir)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import sys
+from functools import lru_cache
+
+# Rough characters-per-token ratio used when tiktoken is not available.
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        import tiktoken
+    except ImportError:  # optional dependency
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:
+        # tiktoken downloads its BPE files on first use, which fails offline.
+        print(f"⚠️ tiktoken unavailable ({exc}); estimating token counts", file=sys.stderr)
+        return None
+
+
+def count_tokens(text, model="gpt-4o-mini"):
+    """Counts prompt tokens with tiktoken, or estimates them if it is unavailable."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def chunk_text(text, max_tokens, overlap_tokens=0, model="gpt-4o-mini"):
+    """
+    Splits text into chunks of at most ``max_tokens`` tokens on paragraph boundaries.
+
+    Consecutive chunks share up to ``overlap_tokens`` tokens of trailing
+    paragraphs so that arguments spanning a boundary are seen in context.
+    Paragraphs longer than ``max_tokens`` are cut into pieces first.
+    """
+    paragraphs = []
+    for paragraph in text.split("\n\n"):
+        if not paragraph.strip():
+            continue
+        # +1 for the paragraph separator added back when chunks are joined.
+        size = count_tokens(paragraph, model) + 1
+        if size <= max_tokens:
+            paragraphs.append((paragraph, size))
+            continue
+        step = max(1, len(paragraph) * (max_tokens - 1) // size)
+        for start in range(0, len(paragraph), step):
+            piece = paragraph[start : start + step]
+            paragraphs.append((piece, count_tokens(piece, model) + 1))
+
+    chunks, current, current_size = [], [], 0
+    for paragraph, size in paragraphs:
+        if current and current_size + size > max_tokens:
+            chunks.append("\n\n".join(p for p, _ in current))
+            # Carry trailing paragraphs over as overlap.
+            carried, carried_size = [], 0
+            for p, s in reversed(current):
+                if carried_size + s > overlap_tokens or carried_size + s + size > max_tokens:
+                    break
+                carried.insert(0, (p, s))
+                carried_size += s
+            current, current_size = carried, carried_size
+        current.append((paragraph, size))
+        current_size += size
+    if current:
+        chunks.append("\n\n".join(p for p, _ in current))
+    return chunks
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules read their settings from the environment at import time, so point
+# every cache and store at a scratch directory before anything is imported.
+_SCRATCH = tempfile.mkdtemp(prefix="peerlens_tests_")
+os.environ.update(
+    {
+        "PEERLENS_CACHE_DIR": os.path.join(_SCRATCH, "cache"),
+        "PEERLENS_REVIEW_STORE": os.path.join(_SCRATCH, "reviews.sqlite"),
+        "PEERLENS_LLM_CACHE": "off",
+        "PEERLENS_LLM_RPM": "0",
+        "PEERLENS_LLM_TPM": "0",
+        "PEERLENS_METRICS": "0",
+    }
+)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import arxiv_cache
+from arxiv_cache import ArxivCache
+
+PAPERS = {
+    "2101.00001": "Attention Is Still All You Need",
+    "2101.00002": "Sparse Mixtures of Reviewers",
+}
+
+
+class FakeArxivClient:
+    """Local stand-in for ``arxiv.Client``; records every request."""
+
+    def __init__(self):
+        self.searches = []
+
+    def results(self, search):
+        self.searches.append(search)
+        ids = search.id_list or list(PAPERS)[: search.max_results]
+        for paper_id in ids:
+            base_id = paper_id.split("v")[0]
+            if base_id in PAPERS:
+                yield SimpleNamespace(
+                    entry_id=f"http://arxiv.org/abs/{base_id}v1",
+                    title=PAPERS[base_id],
+                    summary=f"Abstract of {PAPERS[base_id]}.",
+                    authors=["A. Author", "B. Author"],
+                    published=datetime(2021, 1, 1),
+                    pdf_url=f"http://arxiv.org/pdf/{base_id}v1",
+                )
+
+
+@pytest.fixture
+def client():
+    return FakeArxivClient()
+
+
+@pytest.fixture
+def cache(tmp_path, client):
+    return ArxivCache(tmp_path / "arxiv_cache.sqlite", query_ttl=60, client=client)
+
+
+def test_query_served_from_cache_within_ttl(cache, client):
+    assert cache.search("transformers", max_results=2) == ["2101.00001v1", "2101.00002v1"]
+    assert cache.search("transformers", max_results=2) == ["2101.00001v1", "2101.00002v1"]
+    assert len(client.searches) == 1
+
+
+def test_query_refetched_after_ttl(cache, client, monkeypatch):
+    cache.search("transformers")
+    later = arxiv_cache.time.time() + 61
+    monkeypatch.setattr(arxiv_cache.time, "time", lambda: later)
+    cache.search("transformers")
+    assert len(client.searches) == 2
+
+
+def test_lookup_after_search_makes_no_request(cache, client):
+    cache.search("transformers", max_results=1)
+    paper = cache.lookup("2101.00001v1")
+    assert paper["title"] == PAPERS["2101.00001"]
+    assert cache.get_paper("2101.00001v1") == paper
+    assert len(client.searches) == 1
+
+
+def test_unknown_ids_fetched_once_in_one_query(cache, client):
+    papers = cache.get_papers(["2101.00001", "2101.00002", "9999.99999"])
+    assert papers["9999.99999"] is None
+    assert papers["2101.00002"]["title"] == PAPERS["2101.00002"]
+    # Stored under the requested (versionless) ID as well.
+    cache.get_papers(["2101.00001", "2101.00002"])
+    assert len(client.searches) == 1
+
+
+def test_download_paper_skips_valid_pdf_on_disk(tmp_path, client):
+    mcp_arxiv = pytest.importorskip("mcp_arxiv")
+    mcp_arxiv.configure(tmp_path / "papers")
+    mcp_arxiv.cache = ArxivCache(tmp_path / "papers" / "cache.sqlite", client=client)
+    (tmp_path / "papers" / "2101.00001.pdf").write_bytes(b"%PDF-1.4\n...\n%%EOF\n")
+
+    message = asyncio.run(mcp_arxiv.download_paper("2101.00001"))
+    assert message.startswith("Already downloaded")
+    assert client.searches == []
+    assert mcp_arxiv._http_client is None
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+mcp_arxiv = pytest.importorskip("mcp_arxiv")
+from fake_backend import write_synthetic_manuscript  # noqa: E402
+
+
+def test_local_search_does_not_extract_pdfs(tmp_path, monkeypatch):
+    storage = tmp_path / "papers"
+    storage.mkdir()
+    write_synthetic_manuscript(storage / "2101.00001.pdf", pages=1, seed=1)
+    mcp_arxiv.configure(storage)
+    assert "2101.00001" in mcp_arxiv.index  # indexed once, at startup
+
+    def fail(path):
+        raise AssertionError(f"search extracted {path}")
+
+    monkeypatch.setattr(mcp_arxiv, "extract_text_from_pdf", fail)
+    hits = asyncio.run(mcp_arxiv.search_local_papers("methods results", k=3))
+    assert [hit["arxiv_id"] for hit in hits] == ["2101.00001"]
+
+
+def test_pdf_copied_in_later_is_indexed_on_request(tmp_path):
+    storage = tmp_path / "papers"
+    mcp_arxiv.configure(storage)
+    write_synthetic_manuscript(storage / "2101.00002.pdf", pages=1, seed=2)
+
+    message = asyncio.run(mcp_arxiv.download_paper("2101.00002"))
+    assert message.startswith("Already downloaded")
+    assert "2101.00002" in mcp_arxiv.index
@@ -0,0 +1,141 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("mcp")
+import mcp_pool  # noqa: E402
+from mcp_pool import MCPSessionPool  # noqa: E402
+
+
+class FakeConnection:
+    def __init__(self, index):
+        self.index = index
+        self.dead = False
+
+
+class FakeSession:
+    def __init__(self, connection, write):
+        self.connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def initialize(self):
+        pass
+
+    async def send_ping(self):
+        if self.connection.dead:
+            raise ConnectionError("server exited")
+
+
+async def fake_create_toolkit(session):
+    return SimpleNamespace(session=session)
+
+
+class StubPool(MCPSessionPool):
+    """Pool whose servers are in-process stubs; ``fail_starts`` makes every start fail."""
+
+    def __init__(self, size, fail_starts=False):
+        super().__init__(size, storage_path=None, url=None)
+        self.fail_starts = fail_starts
+        self.connections = []
+
+    @asynccontextmanager
+    async def _connect(self):
+        if self.fail_starts:
+            raise OSError("cannot start server")
+        connection = FakeConnection(len(self.connections))
+        self.connections.append(connection)
+        yield connection, None
+
+
+@pytest.fixture(autouse=True)
+def stub_mcp(monkeypatch):
+    monkeypatch.setattr("mcp.ClientSession", FakeSession)
+    monkeypatch.setattr("autogen.mcp.create_toolkit", fake_create_toolkit)
+    monkeypatch.setattr(mcp_pool, "RESTART_BACKOFF", 0)
+
+
+async def wait_for_connections(pool, count):
+    while len(pool.connections) < count:
+        await asyncio.sleep(0.01)
+
+
+def test_query_on_crashed_server_is_retried_on_a_live_one():
+    async def query(session, toolkit, item):
+        connection = session.connection
+        if connection.index == 0:  # the first server dies during its query
+            connection.dead = True
+            raise ConnectionError("broken pipe")
+        return item * 10
+
+    async def run():
+        async with StubPool(size=2) as pool:
+            results = await pool.run_all(query, [1, 2, 3, 4])
+            await asyncio.wait_for(wait_for_connections(pool, 3), 5)  # server 0 restarted
+            return results, pool
+
+    results, pool = asyncio.run(run())
+    assert results == [10, 20, 30, 40]
+    assert not any(server.failed for server in pool.servers)
+
+
+def test_run_all_raises_only_when_every_server_failed():
+    async def run():
+        async with StubPool(size=2, fail_starts=True) as pool:
+            return await pool.run_all(lambda session, toolkit, item: item, [1, 2])
+
+    with pytest.raises(RuntimeError, match="No MCP server"):
+        asyncio.run(run())
+
+
+def test_server_dying_while_idle_is_restarted_without_counting_failures(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "HEALTH_CHECK_INTERVAL", 0.01)
+
+    async def query(session, toolkit, item):
+        return session.connection.index
+
+    async def run():
+        async with StubPool(size=1) as pool:
+            await wait_for_connections(pool, 1)
+            # More idle crashes than MAX_START_FAILURES: none of them count.
+            for count in range(1, mcp_pool.MAX_START_FAILURES + 2):
+                pool.connections[-1].dead = True
+                await asyncio.wait_for(wait_for_connections(pool, count + 1), 5)
+            return await pool.run_all(query, ["q"]), pool
+
+    results, pool = asyncio.run(run())
+    assert results == [len(pool.connections) - 1]
+    assert pool.servers[0].failures == 0
+    assert not pool.servers[0].failed
+
+
+def test_two_servers_share_one_storage_directory(tmp_path, monkeypatch):
+    from fake_backend import write_synthetic_manuscript
+
+    monkeypatch.undo()  # real servers, sessions and toolkits
+    storage = tmp_path / "papers"
+    storage.mkdir()
+    for i in range(1, 7):  # enough PDFs that the two startup syncs overlap
+        write_synthetic_manuscript(storage / f"2101.0000{i}.pdf", pages=2, seed=i)
+
+    async def query(session, toolkit, item):
+        result = await session.call_tool("search_local_papers", {"query": "methods results"})
+        assert not result.isError, result.content
+        return result.content[0].text
+
+    async def run():
+        async with MCPSessionPool(size=2, storage_path=storage, url=None) as pool:
+            results = await asyncio.wait_for(pool.run_all(query, range(4)), 120)
+            return results, [(s.generation, s.failures) for s in pool.servers]
+
+    # Both servers sync the shared index at startup, then search it; neither
+    # may have needed a restart.
+    results, starts = asyncio.run(run())
+    assert all("2101.0000" in result for result in results), results
+    assert starts == [(1, 0), (1, 0)]
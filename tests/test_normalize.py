@@ -0,0 +1,34 @@
+from normalize import normalize_text
+
+
+WORDS = "alpha beta gamma delta epsilon zeta eta theta iota kappa".split()
+
+
+def page(lines, number):
+    filler = [f"The {WORDS[number]} run improves {WORDS[i]}." for i in range(8)]
+    return "\n".join(["Smith et al. | Workshop", *lines, *filler, str(number)])
+
+
+def test_hyphen_breaks_keep_compounds():
+    text, _ = normalize_text(
+        "We reach state-\nof-the-art accuracy with self-\nsupervised training.\n"
+        "The pro-\nposed method is proposed here."
+    )
+    assert "state-of-the-art" in text
+    assert "self-supervised" in text
+    assert "proposed method" in text
+
+
+def test_hyphen_kept_when_spelled_with_hyphen_elsewhere():
+    text, _ = normalize_text("A pay-as-you-go cross-\nvalidation.\nWe use cross-validation.")
+    assert text.count("cross-validation") == 2
+
+
+def test_bare_numbers_only_stripped_at_page_edges():
+    pages = [page([f"Results for {WORDS[n]}", "3", "14"], n) for n in range(1, 5)]
+    text, stats = normalize_text("\f".join(pages))
+    assert stats["page_number_lines"] == 4
+    assert stats["header_footer_lines"] == 4
+    for n, body in enumerate(text.split("\f"), start=1):
+        assert body.splitlines()[:3] == [f"Results for {WORDS[n]}", "3", "14"]
+        assert body.splitlines()[-1] == f"The {WORDS[n]} run improves {WORDS[7]}."
@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import novelty
+from novelty import EmbeddingStore
+
+
+def paper(i):
+    return {
+        "id": f"2101.{i:05d}",
+        "title": f"Paper {i}",
+        "abstract": f"topic{i} sparse attention reviewers benchmark {i}",
+    }
+
+
+class FakeCache:
+    def __init__(self, papers):
+        self.papers = papers
+
+    def all_papers(self):
+        return list(self.papers)
+
+
+def test_sync_appends_new_papers_without_reembedding(tmp_path, monkeypatch):
+    cache = FakeCache([paper(i) for i in range(4)])
+    store = EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64)
+    old_rows = np.array(store.vectors)
+    old_idf = store.idf.copy()
+
+    embedded = []
+    hash_counts = novelty._hash_counts
+
+    def counting_hash_counts(texts, dim):
+        embedded.append(len(texts))
+        return hash_counts(texts, dim)
+
+    monkeypatch.setattr(novelty, "_hash_counts", counting_hash_counts)
+    cache.papers.append(paper(4))
+    store = EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64)
+
+    assert embedded == [1]
+    assert [p["id"] for p in store.papers][-1] == "2101.00004"
+    np.testing.assert_array_equal(store.vectors[:4], old_rows)
+    np.testing.assert_array_equal(store.idf, old_idf)
+    assert not list(tmp_path.glob(".*.tmp*"))
+
+
+def test_sync_rebuilds_once_the_idf_is_stale(tmp_path):
+    cache = FakeCache([paper(i) for i in range(2)])
+    EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64)
+    cache.papers.extend(paper(i) for i in range(2, 5))
+    store = EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64)
+    assert store.idf_papers == 5
+    assert len(store.vectors) == 5
+
+
+def test_concurrent_syncs_leave_a_consistent_store(tmp_path):
+    cache = FakeCache([paper(i) for i in range(4)])
+    EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64)
+    cache.papers.extend(paper(i) for i in range(4, 7))
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        stores = list(
+            pool.map(
+                lambda _: EmbeddingStore.sync_from_arxiv_cache(tmp_path, cache, dim=64),
+                range(4),
+            )
+        )
+
+    store = EmbeddingStore(tmp_path)
+    assert [p["id"] for p in store.papers] == [p["id"] for p in cache.papers]
+    assert np.load(tmp_path / "vectors.npy").shape == (7, 64)
+    assert all(len(s.papers) == 7 for s in stores)
+    assert not list(tmp_path.glob(".*.tmp*"))
@@ -0,0 +1,26 @@
+from paper_index import BM25Index
+
+
+def test_two_processes_share_one_index(tmp_path):
+    # Pooled MCP servers open the same database from separate processes.
+    first = BM25Index(tmp_path / "bm25_index.sqlite")
+    second = BM25Index(tmp_path / "bm25_index.sqlite")
+    first.add("2101.00001", "sparse attention for peer review", mtime=1.0)
+    second.add("2101.00001", "sparse attention for peer review, revised", mtime=2.0)
+    second.add("2101.00002", "dense retrieval of prior work", mtime=1.0)
+
+    assert len(first) == 2 and "2101.00002" in first
+    assert [doc for doc, _ in first.search("attention")] == ["2101.00001"]
+    assert [doc for doc, _ in second.search("retrieval")] == ["2101.00002"]
+    assert first.mtimes() == {"2101.00001": 2.0, "2101.00002": 1.0}
+
+
+def test_sync_skips_documents_indexed_elsewhere(tmp_path):
+    storage = tmp_path / "papers"
+    storage.mkdir()
+    (storage / "2101.00001.pdf").write_bytes(b"%PDF-1.4")
+    first = BM25Index(tmp_path / "bm25_index.sqlite")
+    second = BM25Index(tmp_path / "bm25_index.sqlite")
+    assert first.sync_directory(storage, lambda path: "methods and results") == 1
+    assert second.sync_directory(storage, lambda path: "unused") == 0
+    assert second.search("methods")[0][0] == "2101.00001"
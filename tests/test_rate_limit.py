@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+
+from rate_limit import RateLimiter
+
+
+class SlowLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(rpm=0, tpm=0)
+        self.threads = []
+
+    def acquire(self, tokens=0):
+        self.threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return 0.2
+
+
+def make_agents(limiter):
+    from autogen import ConversableAgent
+
+    agent = ConversableAgent("agent", llm_config=False, human_input_mode="NEVER")
+    sender = ConversableAgent("sender", llm_config=False, human_input_mode="NEVER")
+    return limiter.throttle_agent(agent), sender
+
+
+def test_async_reply_waits_off_the_event_loop():
+    limiter = SlowLimiter()
+    agent, sender = make_agents(limiter)
+    messages = [{"role": "user", "content": "hello"}]
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        await asyncio.gather(
+            agent.a_generate_reply(messages, sender), agent.a_generate_reply(messages, sender)
+        )
+        ticker.cancel()
+        return ticks
+
+    ticks = asyncio.run(run())
+    assert len(limiter.threads) == 2
+    assert threading.main_thread() not in limiter.threads
+    assert ticks >= 5  # the loop kept running while both replies waited
+
+
+def test_sync_reply_waits_once():
+    limiter = SlowLimiter()
+    agent, sender = make_agents(limiter)
+    agent.generate_reply([{"role": "user", "content": "hello"}], sender)
+    assert limiter.threads == [threading.main_thread()]
@@ -0,0 +1,100 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import review_engine
+from review_engine import CallsFailed, call_with_timeout, run_concurrently
+
+
+def fail():
+    raise RuntimeError("boom")
+
+
+def test_results_keep_call_order():
+    calls = {"b": lambda: 2, "a": lambda: 1}
+    assert list(run_concurrently(calls, max_workers=2)) == ["b", "a"]
+
+
+def test_failures_raise_without_errors_dict():
+    with pytest.raises(CallsFailed) as excinfo:
+        run_concurrently({"ok": lambda: "review", "bad": fail}, max_workers=2)
+    assert excinfo.value.results == {"ok": "review"}
+    assert list(excinfo.value.errors) == ["bad"]
+
+
+def test_failures_reported_in_errors_dict():
+    errors = {}
+    results = run_concurrently({"ok": lambda: "review", "bad": fail}, errors=errors)
+    assert results["ok"] == "review"
+    assert isinstance(errors["bad"], RuntimeError)
+
+
+def test_timeout_counts_as_failure():
+    errors = {}
+    run_concurrently({"slow": lambda: time.sleep(1)}, timeout=0.1, errors=errors)
+    assert isinstance(errors["slow"], TimeoutError)
+
+
+def test_call_with_timeout():
+    assert call_with_timeout(lambda: "done", timeout=1) == "done"
+    with pytest.raises(TimeoutError):
+        call_with_timeout(lambda: time.sleep(1), timeout=0.05)
+
+
+def test_chunked_review_fails_instead_of_merging_partial_notes(monkeypatch):
+    agent = SimpleNamespace(name="Methodologist", llm_config=None)
+    clones, released, prompts = [], [], []
+
+    def fake_clone(original):
+        clone = SimpleNamespace(name=original.name)
+        clones.append(clone)
+        return clone
+
+    def fake_run_agent(agent, prompt, on_token=None):
+        prompts.append(prompt)
+        if "part 2 of" in prompt:
+            raise RuntimeError("provider error")
+        return "notes"
+
+    monkeypatch.setattr(review_engine, "clone_reviewer", fake_clone)
+    monkeypatch.setattr(review_engine, "release_reviewers", released.extend)
+    monkeypatch.setattr(review_engine, "run_agent", fake_run_agent)
+
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 50 for i in range(12))
+    with pytest.raises(CallsFailed) as excinfo:
+        review_engine.review_in_chunks(agent, text, chunk_tokens=200, overlap_tokens=0)
+    assert list(excinfo.value.errors) == ["part 2"]
+    assert not any(p.startswith("You reviewed a long manuscript") for p in prompts)
+    # Every clone goes back to the pool, including the one whose call failed.
+    assert sorted(map(id, released)) == sorted(map(id, clones))
+
+
+def test_retried_stream_signals_restart(monkeypatch):
+    class RetryOnce:
+        def call(self, fn, tokens=0):
+            try:
+                return fn()
+            except TimeoutError:
+                return fn()
+
+    class StreamingAgent:
+        runs = 0
+
+        def run(self, message, max_turns, user_input):
+            self.runs += 1
+            chunks = ["Par", "tial"] if self.runs == 1 else ["Full ", "review"]
+
+            def events():
+                for chunk in chunks:
+                    yield SimpleNamespace(type="stream", content=SimpleNamespace(content=chunk))
+                if self.runs == 1:
+                    raise TimeoutError("stream stalled")
+
+            return SimpleNamespace(events=events(), messages=[{"content": "Full review"}])
+
+    monkeypatch.setattr(review_engine, "get_rate_limiter", lambda: RetryOnce())
+    streamed = []
+    reply = review_engine._run_agent_uncached(StreamingAgent(), "review", streamed.append)
+    assert reply == "Full review"
+    assert streamed == ["Par", "tial", review_engine.STREAM_RESTART, "Full ", "review"]
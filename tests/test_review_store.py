@@ -0,0 +1,9 @@
+from review_store import ReviewStore
+
+
+def test_latest_reviews_falls_back_to_last_good_round(tmp_path):
+    store = ReviewStore(tmp_path / "reviews.sqlite")
+    store.add_round("s", 0, "NeurIPS", "h", {"Methods": "m0", "Ethics": "e0"})
+    # Ethics failed in round 1 and was not stored.
+    store.add_round("s", 1, "NeurIPS", "h", {"Methods": "m1"})
+    assert store.latest_reviews("s") == {"Methods": "m1", "Ethics": "e0"}
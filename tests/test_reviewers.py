@@ -0,0 +1,43 @@
+import pytest
+
+from fake_backend import use_fake_llm
+from review_engine import CallsFailed, run_agent
+from reviewers import get_llm_config, reviewer_lease, set_llm_config
+
+
+@pytest.fixture
+def fake_llm():
+    server = use_fake_llm(latency=0.0, response_words=40)
+    yield server
+    set_llm_config(None)
+    server.stop()
+
+
+def test_override_follows_stream_flag(fake_llm):
+    assert [entry["stream"] for entry in get_llm_config(True).model_dump()["config_list"]] == [True]
+    assert [entry["stream"] for entry in get_llm_config(False).model_dump()["config_list"]] == [False]
+
+
+def test_streaming_reviewer_streams_from_fake_backend(fake_llm):
+    chunks = []
+    with reviewer_lease("NeurIPS", stream=True) as reviewers:
+        reply = run_agent(reviewers[0], "Review this.", on_token=chunks.append)
+    assert len(chunks) > 1
+    assert "".join(chunks) == reply
+
+
+def test_agents_leased_before_config_change_are_not_pooled(fake_llm):
+    with reviewer_lease("NeurIPS") as old:
+        set_llm_config(get_llm_config())
+    with reviewer_lease("NeurIPS") as new:
+        assert not {id(agent) for agent in old} & {id(agent) for agent in new}
+
+
+def test_lease_keeps_agents_of_failed_calls_out_of_the_pool(fake_llm):
+    with pytest.raises(CallsFailed):
+        with reviewer_lease("NeurIPS") as first:
+            failed = first[0].name
+            raise CallsFailed({}, {failed: TimeoutError()})
+    with reviewer_lease("NeurIPS") as second:
+        reused = {id(agent) for agent in first} & {id(agent) for agent in second}
+    assert reused == {id(agent) for agent in first[1:]}
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("starlette")
+from starlette.testclient import TestClient  # noqa: E402
+
+from review_store import ReviewStore  # noqa: E402
+from service import Job, JobError, ReviewService, create_app  # noqa: E402
+
+PDF = b"%PDF-1.4\n...\n%%EOF\n"
+
+
+@pytest.fixture
+def service(tmp_path):
+    # Set up by hand instead of start(), which loads every backend and agent.
+    service = ReviewService(workers=1, queue_size=1, data_dir=tmp_path, max_upload_bytes=1024)
+    (tmp_path / "uploads").mkdir()
+    service.store = ReviewStore(tmp_path / "reviews.sqlite")
+    service._queue = asyncio.Queue(maxsize=1)
+    return service
+
+
+@pytest.fixture
+def client(service):
+    return TestClient(create_app(service))  # not entered: no lifespan
+
+
+def test_check_rejects_paths_outside_uploads(service):
+    for upload in ("../../etc/passwd", "/etc/passwd", "0" * 64):
+        with pytest.raises(JobError, match="Unknown upload"):
+            service._check("review", {"upload": upload})
+
+
+def test_unknown_journal_or_session_is_a_bad_request(client):
+    upload = client.post("/uploads", content=PDF).json()["upload"]
+    response = client.post("/jobs", json={"upload": upload, "journal": "Tabloid"})
+    assert response.status_code == 400
+    assert "Unknown journal" in response.json()["error"]
+    response = client.post("/jobs", json={"type": "rebuttal", "upload": upload, "session": "x"})
+    assert response.status_code == 400
+    assert "session" in response.json()["error"]
+
+
+def test_full_queue_returns_503(client):
+    upload = client.post("/uploads", content=PDF).json()["upload"]
+    assert client.post("/jobs", json={"upload": upload}).status_code == 202
+    response = client.post("/jobs", json={"upload": upload})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+def test_oversized_upload_returns_413(client, service):
+    response = client.post("/uploads", content=PDF + b"0" * 2048)
+    assert response.status_code == 413
+    assert not list((service.data_dir / "uploads").iterdir())
+
+
+def test_finished_job_keeps_only_status_events():
+    async def run():
+        job = Job("review", {})
+        seen = []
+
+        async def follow():
+            async for event in job.follow():
+                seen.append(event["event"])
+
+        follower = asyncio.create_task(follow())
+        job.set_status("running")
+        await asyncio.sleep(0)
+        for _ in range(3):
+            job.emit("token", reviewer="Methods", text="x")
+        job.set_status("done")
+        await follower
+        return job, seen
+
+    job, seen = asyncio.run(run())
+    assert seen == ["status", "token", "token", "token", "status"]
+    assert [event["status"] for event in job.events] == ["running", "done"]
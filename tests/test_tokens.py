@@ -0,0 +1,18 @@
+import pytest
+
+import tokens
+
+tiktoken = pytest.importorskip("tiktoken")
+
+
+def test_offline_tiktoken_falls_back_to_estimate(monkeypatch):
+    def offline(*args, **kwargs):
+        raise ConnectionError("no network")
+
+    monkeypatch.setattr(tiktoken, "encoding_for_model", offline)
+    monkeypatch.setattr(tiktoken, "get_encoding", offline)
+    tokens._encoding.cache_clear()
+    try:
+        assert tokens.count_tokens("x" * 10, model="offline-test") == 3
+    finally:
+        tokens._encoding.cache_clear()
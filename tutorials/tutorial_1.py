@@ -28,40 +28,53 @@ from reviewers import get_all_reviewers
 from review_engine import run_reviews, print_reviews
 from report import save_reviews_to_pdf
 
-# Step 1: Configure Environment
-# If you do not need Docker for AutoGen, disable it here
-os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
-
-# Step 2: Load and Extract Manuscript
-# Provide the path to your research paper (PDF)
-pdf_file = "/Users/taramurphy/Downloads/example.pdf"
-
-# Choose where the extracted text and data should be stored
-output_folder = "example_extracted"
-
-# Use OCR and layout parsing to extract structured text from the manuscript
-print(f"🔍 Extracting text from {pdf_file}...")
-structured = structure_output(pdf_file, output_folder)
-manuscript_text = structured["text"]
-
-# Step 3: Select Journal
-# Choose a journal (e.g., NeurIPS, Nature, Science) to tailor reviewer behavior
-journal = "NeurIPS"
-print(f"📚 Setting up reviewers for journal: {journal}")
-reviewers = get_all_reviewers(journal=journal)
-
-# Step 4: Run the Simulated Reviews
-# Each reviewer will evaluate the manuscript and provide comments and scores
-print("🧠 Running reviews...")
-responses = run_reviews(reviewers, manuscript_text)
-
-# Display the results in the terminal
-print("📄 Review Responses:")
-print_reviews(responses)
-
-# Step 5: Export Reviews to PDF
-# Save the entire review session to a formatted PDF file
-print("💾 Saving reviews to PDF...")
-save_reviews_to_pdf(responses)
-
-print("✅ Review workflow complete!")
+
+# Keep the workflow under the __main__ guard: long PDFs are extracted in
+# worker processes that import this script again (see pdf_utils.py).
+def main():
+    # Step 1: Configure Environment
+    # If you do not need Docker for AutoGen, disable it here
+    os.environ["AUTOGEN_USE_DOCKER"] = str(AUTOGEN_USE_DOCKER)
+
+    # Step 2: Load and Extract Manuscript
+    # Provide the path to your research paper (PDF)
+    pdf_file = "/Users/taramurphy/Downloads/example.pdf"
+
+    # Choose where the extracted text and data should be stored
+    output_folder = "example_extracted"
+
+    # Use OCR and layout parsing to extract structured text from the manuscript
+    print(f"🔍 Extracting text from {pdf_file}...")
+    structured = structure_output(pdf_file, output_folder)
+
+    # Step 3: Select Journal
+    # Choose a journal (e.g., NeurIPS, Nature, Science) to tailor reviewer behavior
+    journal = "NeurIPS"
+    print(f"📚 Setting up reviewers for journal: {journal}")
+    reviewers = get_all_reviewers(journal=journal)
+
+    # Step 4: Run the Simulated Reviews
+    # Each reviewer will evaluate the manuscript and provide comments and scores.
+    # Reviewers only receive the sections they need; references are left out.
+    print("🧠 Running reviews...")
+    # A reviewer that fails is reported instead of aborting the whole run.
+    errors = {}
+    responses = run_reviews(reviewers, structured, errors=errors)
+    responses = {name: review for name, review in responses.items() if name not in errors}
+    for name, exc in errors.items():
+        print(f"⚠️ {name} failed: {exc}")
+
+    # Display the results in the terminal
+    print("📄 Review Responses:")
+    print_reviews(responses)
+
+    # Step 5: Export Reviews to PDF
+    # Save the entire review session to a formatted PDF file
+    print("💾 Saving reviews to PDF...")
+    save_reviews_to_pdf(responses)
+
+    print("✅ Review workflow complete!")
+
+
+if __name__ == "__main__":
+    main()